@@ -0,0 +1,57 @@
+"""Add integer-cent money columns and bookings.currency
+
+Revision ID: 4a7c2e9b1d05
+Revises: 9d2e6a4f1b83
+Create Date: 2026-10-17 16:40:27.905113
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4a7c2e9b1d05'
+down_revision = '9d2e6a4f1b83'
+branch_labels = None
+depends_on = None
+
+# (tabla, columna Float antigua, columna en céntimos). Los céntimos se
+# rellenan después con `flask backfill-money`, por lotes.
+MONEY_COLUMNS = (
+    ('experiences', 'price', 'price_cents'),
+    ('rooms', 'price_per_night', 'price_per_night_cents'),
+    ('extras', 'price', 'price_cents'),
+    ('packages', 'price', 'price_cents'),
+    ('bookings', 'total_price', 'total_price_cents'),
+    ('booking_rooms', 'price', 'price_cents'),
+    ('booking_extras', 'price', 'price_cents'),
+    ('booking_items', 'unit_price', 'unit_price_cents'),
+    ('booking_items', 'subtotal', 'subtotal_cents'),
+)
+
+
+def upgrade():
+    for table_name, legacy_name, cents_name in MONEY_COLUMNS:
+        with op.batch_alter_table(table_name, schema=None) as batch_op:
+            batch_op.add_column(sa.Column(cents_name, sa.BigInteger(), nullable=True))
+            batch_op.alter_column(legacy_name, existing_type=sa.Float(), nullable=True)
+
+    with op.batch_alter_table('bookings', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('currency', sa.String(length=3), nullable=False, server_default='EUR'))
+
+
+def downgrade():
+    with op.batch_alter_table('bookings', schema=None) as batch_op:
+        batch_op.drop_column('currency')
+
+    for table_name, legacy_name, cents_name in reversed(MONEY_COLUMNS):
+        # Las filas creadas después de la migración solo tienen céntimos
+        table = sa.table(table_name, sa.column(legacy_name), sa.column(cents_name))
+        op.execute(
+            table.update()
+            .where(table.c[legacy_name].is_(None))
+            .values({legacy_name: table.c[cents_name] / 100.0})
+        )
+        with op.batch_alter_table(table_name, schema=None) as batch_op:
+            batch_op.alter_column(legacy_name, existing_type=sa.Float(), nullable=False)
+            batch_op.drop_column(cents_name)
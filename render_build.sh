@@ -7,4 +7,16 @@ npm run build
 
 pipenv install
 
+# .br/.gz del frontend compilado para servirlos sin comprimir en cada petición
+pipenv run flask precompress-static
+
 pipenv run upgrade
+
+# Importes en céntimos de las filas anteriores a la migración (idempotente)
+pipenv run flask backfill-money
+
+# Contadores de plazas (ExperienceAvailability) y ledger de noches
+# (RoomNight) desde las reservas activas: una fecha sin contador se lee
+# como libre y una noche sin fila se puede reservar dos veces (idempotentes)
+pipenv run flask rebuild-experience-availability --from-date "$(date +%F)"
+pipenv run flask rebuild-room-nights
@@ -2,9 +2,77 @@ import os
 import inspect
 from flask_admin import Admin
 from . import models
-from .models import db
+from .models import db, Booking, BookingStatus
+from .availability import ACTIVE_BOOKING_STATUSES
+from .inventory import set_booking_status, release_inventory, InventoryConflict
 from flask_admin.contrib.sqla import ModelView
 from flask_admin.theme import Bootstrap4Theme
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.ext.hybrid import hybrid_property
+from wtforms import DecimalField
+from wtforms.validators import ValidationError, InputRequired, NumberRange
+
+
+class BookingView(ModelView):
+    """Reservas: los cambios de estado ocupan o liberan inventario vía set_booking_status"""
+
+    def on_model_change(self, form, model, is_created):
+        status = model.status
+        if is_created:
+            # Insertar sin ocupar inventario; hold_inventory necesita el id
+            previous = BookingStatus.CART
+        else:
+            history = sa_inspect(model).attrs.status.history
+            if history.deleted:
+                previous = history.deleted[0]
+            elif history.added:
+                # Atributo expirado antes de editarlo: leer el estado guardado
+                with db.session.no_autoflush:
+                    previous = db.session.query(Booking.status).filter_by(id=model.id).scalar()
+            else:
+                return
+            if previous == status:
+                return
+
+        model.status = previous
+        db.session.flush()
+        try:
+            set_booking_status(model, status)
+        except InventoryConflict as e:
+            raise ValidationError(e.message)
+
+    def on_model_delete(self, model):
+        if model.status in ACTIVE_BOOKING_STATUSES:
+            release_inventory(model)
+
+
+def money_fields(model):
+    """{atributo en euros: columna *_cents} de los money_property del modelo"""
+    return {
+        name: descriptor.cents_attr
+        for name, descriptor in sa_inspect(model).all_orm_descriptors.items()
+        if isinstance(descriptor, hybrid_property) and getattr(descriptor, 'cents_attr', None)
+    }
+
+
+def money_view(model, base=ModelView):
+    """
+    Vista de `base` que edita los importes en euros (vía money_property) y
+    no las columnas *_cents, con el importe obligatorio.
+    """
+    fields = money_fields(model)
+    if not fields:
+        return base
+    return type(f"{model.__name__}View", (base,), {
+        'form_excluded_columns': list(fields.values()),
+        'form_extra_fields': {
+            name: DecimalField(
+                name.replace('_', ' ').capitalize(), places=2,
+                validators=[InputRequired(), NumberRange(min=0)]
+            )
+            for name in fields
+        }
+    })
 
 
 def setup_admin(app):
@@ -15,4 +83,5 @@ def setup_admin(app):
     for name, obj in inspect.getmembers(models):
         # Verify that the object is a SQLAlchemy model before adding it to the admin. 
         if inspect.isclass(obj) and issubclass(obj, db.Model):
-            admin.add_view(ModelView(obj, db.session))
\ No newline at end of file
+            view = money_view(obj, BookingView if obj is Booking else ModelView)
+            admin.add_view(view(obj, db.session))
@@ -0,0 +1,54 @@
+# src/api/allocation.py
+"""
+Reparto de un grupo entre habitaciones.
+
+Busca las combinaciones de habitaciones libres que alojan a todo el grupo
+al menor precio total con una programación dinámica 0/1 sobre la capacidad
+acumulada (recortada al tamaño del grupo). Cada estado guarda solo las k
+mejores combinaciones, así que el coste es O(habitaciones × huéspedes × k)
+en lugar de probar todos los subconjuntos.
+"""
+import heapq
+
+# Candidatas extra por estado para poder descartar combinaciones redundantes
+_OVERSAMPLE = 4
+
+
+def _is_minimal(capacities, guests):
+    """True si al quitar cualquier habitación el grupo ya no cabe"""
+    return sum(capacities) - min(capacities) < guests
+
+
+def rank_room_combinations(rooms, guests, nights, limit=5):
+    """
+    Las `limit` combinaciones más baratas de `rooms` con capacidad >= `guests`.
+
+    Devuelve una lista de (total en céntimos, [rooms]) ordenada por precio
+    y, a igual precio, por número de habitaciones. Solo incluye
+    combinaciones sin habitaciones sobrantes.
+    """
+    if guests <= 0:
+        return []
+
+    rooms = [room for room in rooms if room.capacity > 0]
+    keep = limit * _OVERSAMPLE
+
+    # states[capacidad] = [(precio, nº habitaciones, índices), ...]
+    states = {0: [(0, 0, ())]}
+    for index, room in enumerate(rooms):
+        price = room.price_per_night_cents * nights
+        for capacity, combos in list(states.items()):
+            if capacity >= guests:
+                continue
+            reached = min(guests, capacity + room.capacity)
+            extended = [(cost + price, count + 1, indexes + (index,)) for cost, count, indexes in combos]
+            states[reached] = heapq.nsmallest(keep, states.get(reached, []) + extended)
+
+    ranked = []
+    for cost, _, indexes in states.get(guests, []):
+        chosen = [rooms[i] for i in indexes]
+        if _is_minimal([room.capacity for room in chosen], guests):
+            ranked.append((cost, chosen))
+        if len(ranked) == limit:
+            break
+    return ranked
@@ -0,0 +1,204 @@
+# src/api/availability.py
+"""
+Motor de disponibilidad de habitaciones.
+
+Responde "qué habitaciones están libres para [check_in, check_out)" con un
+número fijo de consultas de solapamiento de rangos, sin importar cuántas
+noches dure la estancia ni cuántas habitaciones existan.
+
+Las noches de las reservas activas se reclaman además en RoomNight, con
+una restricción única por (habitación, noche): dos checkouts que compiten
+por la misma noche se serializan en ese índice y solo uno la obtiene.
+"""
+from datetime import timedelta
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from api.models import db, Room, Booking, BookingRoom, RoomAvailability, RoomNight, BookingStatus
+
+# Estados de reserva que ocupan inventario
+ACTIVE_BOOKING_STATUSES = (BookingStatus.CONFIRMED, BookingStatus.PENDING)
+
+
+def _overlapping_booking_rooms(check_in, check_out, exclude_booking_ids=None):
+    """Query de BookingRoom activos que se solapan con [check_in, check_out)"""
+    query = db.session.query(BookingRoom.room_id).join(Booking).filter(
+        BookingRoom.check_in < check_out,
+        BookingRoom.check_out > check_in,
+        Booking.status.in_(ACTIVE_BOOKING_STATUSES)
+    )
+    if exclude_booking_ids:
+        query = query.filter(~Booking.id.in_(exclude_booking_ids))
+    return query
+
+
+def _blocked_nights(check_in, check_out):
+    """Query de bloqueos manuales (RoomAvailability) dentro de [check_in, check_out)"""
+    return db.session.query(RoomAvailability.room_id).filter(
+        RoomAvailability.date >= check_in,
+        RoomAvailability.date < check_out,
+        RoomAvailability.is_available.is_(False)
+    )
+
+
+def get_unavailable_room_ids(check_in, check_out, exclude_booking_ids=None):
+    """IDs de habitaciones ocupadas o bloqueadas en alguna noche de [check_in, check_out)"""
+    booked = _overlapping_booking_rooms(check_in, check_out, exclude_booking_ids)
+    blocked = _blocked_nights(check_in, check_out)
+    return {room_id for (room_id,) in booked.union(blocked).all()}
+
+
+def find_available_rooms(check_in, check_out):
+    """Habitaciones activas libres para todas las noches de [check_in, check_out)"""
+    booked = _overlapping_booking_rooms(check_in, check_out).filter(
+        BookingRoom.room_id == Room.id
+    )
+    blocked = _blocked_nights(check_in, check_out).filter(
+        RoomAvailability.room_id == Room.id
+    )
+    return Room.query.filter(
+        Room.is_active.is_(True),
+        ~booked.exists(),
+        ~blocked.exists()
+    ).order_by(Room.id).all()
+
+
+def get_taken_room_nights(room_ids, start_date, end_date):
+    """
+    {(room_id, noche)} reclamadas en RoomNight o bloqueadas en [start_date, end_date).
+
+    Una sola consulta (UNION) sobre el ledger y los bloqueos manuales.
+    """
+    if not room_ids:
+        return set()
+
+    claimed = db.session.query(RoomNight.room_id, RoomNight.night).filter(
+        RoomNight.room_id.in_(room_ids),
+        RoomNight.night >= start_date,
+        RoomNight.night < end_date
+    )
+    blocked = db.session.query(RoomAvailability.room_id, RoomAvailability.date).filter(
+        RoomAvailability.room_id.in_(room_ids),
+        RoomAvailability.date >= start_date,
+        RoomAvailability.date < end_date,
+        RoomAvailability.is_available.is_(False)
+    )
+    return {(room_id, night) for room_id, night in claimed.union(blocked).all()}
+
+
+def build_room_calendar(room_ids, start_date, end_date):
+    """
+    Disponibilidad por noche {room_id: [bool, ...]} para [start_date, end_date].
+
+    Una sola pasada sobre las reservas activas y los bloqueos manuales del
+    rango (dos consultas) en lugar de una consulta por habitación y noche.
+    """
+    end_exclusive = end_date + timedelta(days=1)
+    total_nights = (end_exclusive - start_date).days
+    calendar = {room_id: [True] * total_nights for room_id in room_ids}
+    if not room_ids:
+        return calendar
+
+    booked_rows = db.session.query(
+        BookingRoom.room_id, BookingRoom.check_in, BookingRoom.check_out
+    ).join(Booking).filter(
+        BookingRoom.room_id.in_(room_ids),
+        BookingRoom.check_in < end_exclusive,
+        BookingRoom.check_out > start_date,
+        Booking.status.in_(ACTIVE_BOOKING_STATUSES)
+    ).all()
+    for room_id, check_in, check_out in booked_rows:
+        first = max((check_in - start_date).days, 0)
+        last = min((check_out - start_date).days, total_nights)
+        calendar[room_id][first:last] = [False] * (last - first)
+
+    blocked_rows = db.session.query(
+        RoomAvailability.room_id, RoomAvailability.date
+    ).filter(
+        RoomAvailability.room_id.in_(room_ids),
+        RoomAvailability.date >= start_date,
+        RoomAvailability.date < end_exclusive,
+        RoomAvailability.is_available.is_(False)
+    ).all()
+    for room_id, day in blocked_rows:
+        calendar[room_id][(day - start_date).days] = False
+
+    return calendar
+
+
+def stay_nights(check_in, check_out):
+    """Noches de una estancia [check_in, check_out)"""
+    return [check_in + timedelta(days=i) for i in range((check_out - check_in).days)]
+
+
+def claim_room_nights(booking_rooms, booking_id):
+    """
+    Reclamar en RoomNight todas las noches de `booking_rooms` para la reserva.
+
+    Es un único INSERT dentro de un savepoint: si otra reserva ya tiene
+    alguna de esas noches la restricción única lo rechaza, no se reclama
+    nada y se devuelve el BookingRoom en conflicto (None si todo fue bien).
+    """
+    rows = [
+        {'room_id': br.room_id, 'night': night, 'booking_id': booking_id}
+        for br in booking_rooms
+        for night in stay_nights(br.check_in, br.check_out)
+    ]
+    if not rows:
+        return None
+
+    try:
+        with db.session.begin_nested():
+            db.session.execute(insert(RoomNight), rows)
+    except IntegrityError:
+        taken = {
+            (room_id, night) for room_id, night in db.session.query(
+                RoomNight.room_id, RoomNight.night
+            ).filter(
+                RoomNight.room_id.in_({row['room_id'] for row in rows}),
+                RoomNight.night.in_({row['night'] for row in rows})
+            ).all()
+        }
+        for br in booking_rooms:
+            if any((br.room_id, night) in taken for night in stay_nights(br.check_in, br.check_out)):
+                return br
+        return booking_rooms[0]
+    return None
+
+
+def release_room_nights(booking_id):
+    """Liberar las noches reclamadas por una reserva"""
+    db.session.query(RoomNight).filter(
+        RoomNight.booking_id == booking_id
+    ).delete(synchronize_session=False)
+
+
+def rebuild_room_nights():
+    """
+    Regenerar RoomNight desde las reservas activas.
+
+    Para reservas anteriores al ledger o si se desincroniza. Si dos reservas
+    activas comparten una noche se conserva la primera y se informa del resto.
+    Devuelve (noches escritas, ids de reservas en conflicto).
+    """
+    db.session.query(RoomNight).delete(synchronize_session=False)
+
+    rows = db.session.query(
+        BookingRoom.room_id, BookingRoom.check_in, BookingRoom.check_out, BookingRoom.booking_id
+    ).join(Booking).filter(
+        Booking.status.in_(ACTIVE_BOOKING_STATUSES)
+    ).order_by(Booking.created_at, Booking.id).all()
+
+    claimed = {}
+    conflicts = set()
+    for room_id, check_in, check_out, booking_id in rows:
+        for night in stay_nights(check_in, check_out):
+            if claimed.setdefault((room_id, night), booking_id) != booking_id:
+                conflicts.add(booking_id)
+
+    if claimed:
+        db.session.execute(insert(RoomNight), [
+            {'room_id': room_id, 'night': night, 'booking_id': booking_id}
+            for (room_id, night), booking_id in claimed.items()
+        ])
+    db.session.commit()
+    return len(claimed), sorted(conflicts)
@@ -0,0 +1,212 @@
+# src/api/cache.py
+"""
+Cachés de respuestas en memoria.
+
+AvailabilityCache guarda el resultado de /rooms/available y
+/experiences/available por (recurso, rango de fechas, huéspedes). Las
+entradas se invalidan con los cambios que publica api.changes tras cada
+commit: solo caen las búsquedas cuyo rango incluye las fechas modificadas.
+
+CatalogCache guarda los bytes ya serializados de los endpoints de catálogo
+con su ETag y Last-Modified, y los invalida por tabla.
+
+En ambas el TTL acota lo desactualizada que puede quedar una entrada cuando
+hay varios procesos.
+"""
+import hashlib
+import threading
+import time as _time
+from collections import OrderedDict, namedtuple
+from datetime import datetime, timezone
+from api.changes import subscribe, RoomChange, ExperienceChange, CatalogChange
+
+ROOMS = 'rooms'
+EXPERIENCES = 'experiences'
+
+# Tablas de catálogo que forman parte de cada respuesta
+CATALOG_TABLES = {
+    'rooms': ROOMS,
+    'experiences': EXPERIENCES,
+    'experience_schedules': EXPERIENCES
+}
+
+
+class AvailabilityCache:
+
+    def __init__(self, max_entries=1024, ttl=60):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(resource, start_date, end_date, guests=None):
+        return (resource, start_date, end_date, guests)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or _time.monotonic() - entry[0] > self.ttl:
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (_time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, predicate):
+        """Eliminar las entradas cuya clave cumple `predicate(key)`"""
+        with self._lock:
+            stale = [key for key in self._entries if predicate(key)]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+
+    def clear(self):
+        self.invalidate(lambda key: True)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+                'invalidations': self.invalidations
+            }
+
+
+availability_cache = AvailabilityCache()
+
+# Etiquetas de dependencia para respuestas de catálogo que incluyen disponibilidad
+ROOM_AVAILABILITY_TAG = 'rooms:availability'
+EXPERIENCE_AVAILABILITY_TAG = 'experiences:availability'
+
+CatalogEntry = namedtuple('CatalogEntry', ['body', 'etag', 'last_modified', 'tags', 'stored_at'])
+
+
+class CatalogCache:
+
+    def __init__(self, ttl=3600):
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._generation = 0
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    @property
+    def generation(self):
+        """Cambia con cada invalidación; evita guardar respuestas construidas antes de ella"""
+        return self._generation
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or _time.monotonic() - entry.stored_at > self.ttl:
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry
+
+    def set(self, key, body, tags, generation):
+        """Guardar `body` (bytes) dependiente de `tags`; devuelve la entrada"""
+        entry = CatalogEntry(
+            body=body,
+            etag=hashlib.sha256(body).hexdigest()[:32],
+            last_modified=datetime.now(timezone.utc).replace(microsecond=0),
+            tags=frozenset(tags),
+            stored_at=_time.monotonic()
+        )
+        with self._lock:
+            if generation == self._generation:
+                self._entries[key] = entry
+        return entry
+
+    def invalidate_tags(self, tags):
+        """Eliminar las entradas que dependen de alguna de `tags`"""
+        with self._lock:
+            self._generation += 1
+            stale = [key for key, entry in self._entries.items() if entry.tags & tags]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+                'invalidations': self.invalidations
+            }
+
+
+catalog_cache = CatalogCache()
+
+
+def _is_affected(key, changes):
+    resource, start_date, end_date, _ = key
+    for change in changes:
+        if isinstance(change, CatalogChange):
+            if resource == CATALOG_TABLES.get(change.table):
+                return True
+        elif isinstance(change, RoomChange):
+            # Búsqueda de noches [start_date, end_date)
+            if resource == ROOMS and change.start < end_date and change.end > start_date:
+                return True
+        elif isinstance(change, ExperienceChange):
+            # Búsqueda de fechas [start_date, end_date]
+            if resource == EXPERIENCES and start_date <= change.date <= end_date:
+                return True
+    return False
+
+
+@subscribe
+def _on_inventory_changes(changes):
+    availability_cache.invalidate(lambda key: _is_affected(key, changes))
+
+
+@subscribe
+def _on_catalog_changes(changes):
+    tags = set()
+    for change in changes:
+        if isinstance(change, CatalogChange):
+            tags.add(change.table)
+        elif isinstance(change, RoomChange):
+            tags.add(ROOM_AVAILABILITY_TAG)
+        elif isinstance(change, ExperienceChange):
+            tags.add(EXPERIENCE_AVAILABILITY_TAG)
+    if tags:
+        catalog_cache.invalidate_tags(tags)
+
+
+def init_availability_cache(app):
+    """Configurar tamaño y TTL de las cachés desde la config de la app"""
+    availability_cache.max_entries = int(app.config.get('AVAILABILITY_CACHE_SIZE', 1024))
+    availability_cache.ttl = int(app.config.get('AVAILABILITY_CACHE_TTL', 60))
+    catalog_cache.ttl = int(app.config.get('CATALOG_CACHE_TTL', 3600))
@@ -0,0 +1,186 @@
+# src/api/capacity.py
+"""
+Cálculo de capacidad de experiencias.
+
+ExperienceAvailability funciona como contador mantenido: cada fila guarda
+las plazas libres de una experiencia en una fecha y se actualiza con UPDATE
+condicionales al ocupar o liberar plazas. Las lecturas son una consulta
+indexada; la suma agrupada sobre Booking solo se usa para inicializar o
+reconstruir los contadores.
+"""
+from datetime import timedelta
+from sqlalchemy import func, update
+from sqlalchemy.exc import IntegrityError
+from api.models import db, Booking, Experience, ExperienceAvailability, DayOfWeek
+from api.availability import ACTIVE_BOOKING_STATUSES
+
+# DayOfWeek está declarado de lunes a domingo, igual que date.weekday()
+WEEKDAYS = list(DayOfWeek)
+
+
+def expand_schedules(schedules, start_date, end_date):
+    """
+    {fecha: schedule} para cada fecha de [start_date, end_date] con horario.
+
+    Si hay varios horarios el mismo día de la semana se usa el primero.
+    """
+    dates = {}
+    for schedule in schedules:
+        weekday = WEEKDAYS.index(schedule.day_of_week)
+        current = start_date + timedelta(days=(weekday - start_date.weekday()) % 7)
+        while current <= end_date:
+            dates.setdefault(current, schedule)
+            current += timedelta(days=7)
+    return dict(sorted(dates.items()))
+
+
+def get_booked_spots(experience_ids=None, start_date=None, end_date=None, exclude_booking_ids=None):
+    """{(experience_id, fecha): plazas ocupadas} con un único SUM agrupado"""
+    if experience_ids is not None and not experience_ids:
+        return {}
+
+    query = db.session.query(
+        Booking.experience_id,
+        Booking.experience_date,
+        func.sum(Booking.number_of_guests)
+    ).filter(
+        Booking.experience_id.isnot(None),
+        Booking.experience_date.isnot(None),
+        Booking.status.in_(ACTIVE_BOOKING_STATUSES)
+    )
+    if experience_ids is not None:
+        query = query.filter(Booking.experience_id.in_(experience_ids))
+    if start_date:
+        query = query.filter(Booking.experience_date >= start_date)
+    if end_date:
+        query = query.filter(Booking.experience_date <= end_date)
+    if exclude_booking_ids:
+        query = query.filter(~Booking.id.in_(exclude_booking_ids))
+
+    rows = query.group_by(Booking.experience_id, Booking.experience_date).all()
+    return {(experience_id, day): int(spots or 0) for experience_id, day, spots in rows}
+
+
+def get_counters(experience_ids, start_date, end_date):
+    """{(experience_id, fecha): plazas libres} leídos de ExperienceAvailability"""
+    if not experience_ids:
+        return {}
+
+    rows = db.session.query(
+        ExperienceAvailability.experience_id,
+        ExperienceAvailability.date,
+        ExperienceAvailability.available_spots
+    ).filter(
+        ExperienceAvailability.experience_id.in_(experience_ids),
+        ExperienceAvailability.date >= start_date,
+        ExperienceAvailability.date <= end_date
+    ).all()
+    return {(experience_id, day): spots for experience_id, day, spots in rows}
+
+
+def build_capacity_matrix(experiences, start_date, end_date):
+    """
+    Matriz de capacidad {experience_id: {fecha: (plazas_libres, schedule)}}.
+
+    Solo incluye las fechas en las que la experiencia tiene horario. Una
+    fecha sin contador todavía no tiene reservas: está a capacidad máxima.
+    """
+    counters = get_counters([e.id for e in experiences], start_date, end_date)
+
+    matrix = {}
+    for experience in experiences:
+        row = {}
+        for day, schedule in expand_schedules(experience.schedules, start_date, end_date).items():
+            row[day] = (counters.get((experience.id, day), experience.max_capacity), schedule)
+        matrix[experience.id] = row
+    return matrix
+
+
+def _ensure_counter(experience, day, exclude_booking_ids=None):
+    """Crear el contador de (experiencia, fecha) a partir de Booking si aún no existe"""
+    exists = db.session.query(ExperienceAvailability.id).filter_by(
+        experience_id=experience.id,
+        date=day
+    ).first()
+    if exists:
+        return
+
+    booked = get_booked_spots([experience.id], day, day, exclude_booking_ids)
+    try:
+        with db.session.begin_nested():
+            db.session.add(ExperienceAvailability(
+                experience_id=experience.id,
+                date=day,
+                available_spots=experience.max_capacity - booked.get((experience.id, day), 0)
+            ))
+    except IntegrityError:
+        # Otra transacción creó el contador primero
+        pass
+
+
+def reserve_spots(experience, day, guests, exclude_booking_ids=None):
+    """
+    Descontar `guests` plazas con un UPDATE condicional.
+
+    Devuelve False (sin modificar nada) si no quedan suficientes plazas.
+    """
+    _ensure_counter(experience, day, exclude_booking_ids)
+    result = db.session.execute(
+        update(ExperienceAvailability)
+        .where(
+            ExperienceAvailability.experience_id == experience.id,
+            ExperienceAvailability.date == day,
+            ExperienceAvailability.available_spots >= guests
+        )
+        .values(available_spots=ExperienceAvailability.available_spots - guests)
+    )
+    return result.rowcount == 1
+
+
+def release_spots(experience_id, day, guests):
+    """Devolver `guests` plazas al contador (si existe)"""
+    db.session.execute(
+        update(ExperienceAvailability)
+        .where(
+            ExperienceAvailability.experience_id == experience_id,
+            ExperienceAvailability.date == day
+        )
+        .values(available_spots=ExperienceAvailability.available_spots + guests)
+    )
+
+
+def rebuild_counters(start_date=None):
+    """
+    Recalcular todos los contadores desde Booking.
+
+    Corrige la deriva (cambios de max_capacity, ediciones manuales, reservas
+    anteriores a los contadores). Devuelve el número de filas escritas.
+    """
+    booked = get_booked_spots(start_date=start_date)
+    experiences = {e.id: e for e in Experience.query.all()}
+
+    query = ExperienceAvailability.query
+    if start_date:
+        query = query.filter(ExperienceAvailability.date >= start_date)
+
+    written = 0
+    for counter in query.all():
+        experience = experiences.get(counter.experience_id)
+        if not experience:
+            continue
+        counter.available_spots = experience.max_capacity - booked.pop((counter.experience_id, counter.date), 0)
+        written += 1
+
+    for (experience_id, day), spots in booked.items():
+        experience = experiences.get(experience_id)
+        if not experience:
+            continue
+        db.session.add(ExperienceAvailability(
+            experience_id=experience_id,
+            date=day,
+            available_spots=experience.max_capacity - spots
+        ))
+        written += 1
+
+    db.session.commit()
+    return written
@@ -0,0 +1,150 @@
+# src/api/cart_store.py
+"""
+Almacén efímero de carritos.
+
+Los items del carrito no se guardan en `bookings`: viven en un CartStore
+con TTL hasta el checkout, que los convierte en reservas de una vez. Cada
+carrito es un mapa {item_id: item} por usuario y toda escritura renueva
+su caducidad (CART_TTL segundos).
+
+- MemoryCartStore: dict en el proceso, para un solo nodo.
+- RedisCartStore: un hash de Redis por usuario con EXPIRE nativo, para
+  varios nodos (requiere el paquete `redis`).
+
+CART_STORE_URL elige el backend: 'memory://' o 'redis://host:puerto/db'.
+"""
+import json
+import threading
+import time
+from flask import current_app
+
+try:
+    import redis
+except ImportError:  # pragma: no cover - depende del entorno
+    redis = None
+
+DEFAULT_CART_TTL = 30 * 60
+
+
+class MemoryCartStore:
+    """Carritos en memoria del proceso; caducan al leerlos o con purge()"""
+
+    def __init__(self, ttl=DEFAULT_CART_TTL):
+        self.ttl = ttl
+        self._carts = {}
+        self._lock = threading.Lock()
+
+    def _live(self, user_id):
+        entry = self._carts.get(user_id)
+        if entry is None:
+            return None
+        expires_at, items = entry
+        if expires_at <= time.monotonic():
+            del self._carts[user_id]
+            return None
+        return items
+
+    def items(self, user_id):
+        with self._lock:
+            return list((self._live(user_id) or {}).values())
+
+    def get(self, user_id, item_id):
+        with self._lock:
+            return (self._live(user_id) or {}).get(item_id)
+
+    def put(self, user_id, *items):
+        with self._lock:
+            cart = self._live(user_id) or {}
+            for item in items:
+                cart[item['id']] = item
+            self._carts[user_id] = (time.monotonic() + self.ttl, cart)
+
+    def remove(self, user_id, *item_ids):
+        with self._lock:
+            cart = self._live(user_id) or {}
+            removed = sum(1 for item_id in item_ids if cart.pop(item_id, None) is not None)
+            if not cart:
+                self._carts.pop(user_id, None)
+            return removed
+
+    def clear(self, user_id):
+        with self._lock:
+            cart = self._live(user_id) or {}
+            self._carts.pop(user_id, None)
+            return len(cart)
+
+    def purge(self):
+        """Eliminar los carritos caducados; devuelve cuántos había"""
+        now = time.monotonic()
+        with self._lock:
+            expired = [user_id for user_id, (expires_at, _) in self._carts.items() if expires_at <= now]
+            for user_id in expired:
+                del self._carts[user_id]
+        return len(expired)
+
+
+class RedisCartStore:
+    """Carritos en Redis: HSET/HDEL sobre cart:<user_id> y EXPIRE en la misma transacción"""
+
+    def __init__(self, url, ttl=DEFAULT_CART_TTL, prefix='cart:'):
+        if redis is None:
+            raise RuntimeError("CART_STORE_URL points to Redis but the 'redis' package is not installed")
+        self.client = redis.Redis.from_url(url)
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def _key(self, user_id):
+        return f"{self.prefix}{user_id}"
+
+    def items(self, user_id):
+        values = self.client.hvals(self._key(user_id))
+        return sorted((json.loads(value) for value in values), key=lambda item: item['created_at'])
+
+    def get(self, user_id, item_id):
+        value = self.client.hget(self._key(user_id), item_id)
+        return json.loads(value) if value is not None else None
+
+    def put(self, user_id, *items):
+        key = self._key(user_id)
+        pipe = self.client.pipeline()
+        pipe.hset(key, mapping={item['id']: json.dumps(item) for item in items})
+        pipe.expire(key, self.ttl)
+        pipe.execute()
+
+    def remove(self, user_id, *item_ids):
+        if not item_ids:
+            return 0
+        return self.client.hdel(self._key(user_id), *item_ids)
+
+    def clear(self, user_id):
+        key = self._key(user_id)
+        pipe = self.client.pipeline()
+        pipe.hlen(key)
+        pipe.delete(key)
+        return pipe.execute()[0]
+
+    def purge(self):
+        # Redis elimina las claves caducadas por sí mismo
+        return 0
+
+
+def create_cart_store(url, ttl=DEFAULT_CART_TTL):
+    if url.startswith(('redis://', 'rediss://', 'unix://')):
+        return RedisCartStore(url, ttl)
+    if url.startswith('memory://'):
+        return MemoryCartStore(ttl)
+    raise ValueError(f"Unsupported CART_STORE_URL: {url}")
+
+
+def get_cart_store():
+    """El almacén de carritos de la aplicación actual"""
+    return current_app.extensions['cart_store']
+
+
+def init_cart_store(app):
+    store = create_cart_store(
+        app.config.get('CART_STORE_URL', 'memory://'),
+        int(app.config.get('CART_TTL', DEFAULT_CART_TTL))
+    )
+    app.extensions['cart_store'] = store
+    return store
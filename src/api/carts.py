@@ -0,0 +1,259 @@
+# src/api/carts.py
+"""
+Items del carrito y su conversión en reservas.
+
+Un item del carrito es un dict JSON (fechas en ISO, importes en céntimos
+del motor de api.pricing con su price_version) guardado en el CartStore
+(api.cart_store), no una fila de `bookings`: navegar y llenar el carrito
+no escribe en la base de datos. El checkout convierte los items en
+reservas con materialize_cart_items(), que las inserta juntas en un mismo
+flush.
+
+Las reservas en CART que queden de antes (o de otros clientes) las sigue
+borrando el reaper en segundo plano (o `flask reap-carts`) con DELETE
+masivos por lotes acotados, sin cargar objetos ORM. Un carrito no ocupa
+inventario, así que borrarlo no afecta a la disponibilidad.
+"""
+import secrets
+import threading
+import time as _time
+from datetime import datetime
+from sqlalchemy import delete
+from api.cart_store import get_cart_store
+from api.pricing import price_line_item, price_book
+from api.models import (
+    db, Booking, BookingRoom, BookingExtra, BookingItem, EmailLog, RoomNight, BookingStatus,
+    PaymentStatus, Experience, Room, DEFAULT_CURRENCY, from_cents
+)
+
+# Tablas con FK a bookings que se borran antes que la reserva
+BOOKING_CHILDREN = (BookingRoom, BookingExtra, BookingItem, EmailLog, RoomNight)
+
+DEFAULT_BATCH_SIZE = 500
+
+
+def _parse_date(value):
+    return datetime.strptime(value, '%Y-%m-%d').date() if value else None
+
+
+def _parse_time(value):
+    return datetime.strptime(value, '%H:%M').time() if value else None
+
+
+def _format_time(value):
+    return value.strftime('%H:%M') if value else None
+
+
+def build_cart_item(data, item_id=None, snapshot=None):
+    """
+    Validar y tasar un item del carrito a partir del JSON de la petición
+    (mismo formato que POST /cart) con el motor de precios (api.pricing).
+    Lanza ValueError si algo no es válido.
+    """
+    quote = price_line_item(data, snapshot)
+
+    experience_date = _parse_date(data.get('experience_date'))
+    experience_time = _parse_time(data.get('experience_time')) if experience_date else None
+
+    check_in = check_out = check_in_time = check_out_time = None
+    if data.get('check_in') and data.get('check_out'):
+        check_in = _parse_date(data['check_in'])
+        check_out = _parse_date(data['check_out'])
+        check_in_time = _parse_time(data.get('check_in_time'))
+        check_out_time = _parse_time(data.get('check_out_time'))
+
+    experience = quote['experience']
+    package = quote['package']
+    return {
+        'id': item_id or secrets.token_hex(8),
+        'experience_id': experience['id'] if experience else None,
+        'experience_name': experience['name'] if experience else None,
+        'package_id': package['id'] if package else None,
+        'package_name': package['name'] if package else None,
+        'experience_date': experience_date.isoformat() if experience_date else None,
+        'experience_time': _format_time(experience_time),
+        'check_in': check_in.isoformat() if check_in else None,
+        'check_out': check_out.isoformat() if check_out else None,
+        'check_in_time': _format_time(check_in_time),
+        'check_out_time': _format_time(check_out_time),
+        'number_of_guests': int(data['number_of_guests']),
+        'special_requests': data.get('special_requests'),
+        'rooms': [{key: room[key] for key in ('room_id', 'room_name', 'nights', 'price_cents')} for room in quote['rooms']],
+        'extras': [{key: extra[key] for key in ('extra_id', 'extra_name', 'quantity', 'price_cents')} for extra in quote['extras']],
+        'total_price_cents': quote['total_price_cents'],
+        'currency': DEFAULT_CURRENCY,
+        'price_version': quote['price_version'],
+        'created_at': data.get('created_at') or datetime.utcnow().isoformat()
+    }
+
+
+def serialize_cart_item(item):
+    """Item del carrito con los importes en unidades de display (para las respuestas)"""
+    data = {key: value for key, value in item.items() if key != 'total_price_cents'}
+    data['total_price'] = from_cents(item['total_price_cents'])
+    data['rooms'] = [
+        {**{k: v for k, v in room.items() if k != 'price_cents'}, 'price': from_cents(room['price_cents'])}
+        for room in item['rooms']
+    ]
+    data['extras'] = [
+        {**{k: v for k, v in extra.items() if k != 'price_cents'}, 'price': from_cents(extra['price_cents'])}
+        for extra in item['extras']
+    ]
+    return data
+
+
+def reprice_cart_items(items):
+    """Volver a tasar los items cuyo price_version no es el del snapshot vigente"""
+    snapshot = price_book.snapshot()
+    return [
+        item if item.get('price_version') == snapshot.version else build_cart_item(item, item['id'], snapshot)
+        for item in items
+    ]
+
+
+def materialize_cart_items(user_id, items, status=BookingStatus.PENDING):
+    """
+    Items del carrito -> reservas nuevas (con habitaciones y extras) aún
+    fuera de la sesión. Las experiencias y habitaciones se cargan con una
+    consulta cada una; al añadirlas a la sesión se insertan en un solo
+    flush (un INSERT por tabla). Solo se asignan los ids: asignar las
+    relaciones añadiría la reserva a room.booking_rooms / experience.bookings.
+    Lanza ValueError si algo ya no existe.
+    """
+    experience_ids = {item['experience_id'] for item in items if item['experience_id']}
+    room_ids = {room['room_id'] for item in items for room in item['rooms']}
+    experiences = {e.id: e for e in Experience.query.filter(Experience.id.in_(experience_ids))} if experience_ids else {}
+    rooms = {r.id: r for r in Room.query.filter(Room.id.in_(room_ids))} if room_ids else {}
+
+    bookings = []
+    for item in items:
+        if item['experience_id'] and item['experience_id'] not in experiences:
+            raise ValueError("Invalid experience")
+        check_in = _parse_date(item['check_in'])
+        check_out = _parse_date(item['check_out'])
+
+        booking = Booking(
+            user_id=user_id,
+            confirmation_number=Booking.generate_confirmation_number(),
+            experience_id=item['experience_id'],
+            package_id=item['package_id'],
+            experience_date=_parse_date(item['experience_date']),
+            experience_time=_parse_time(item['experience_time']),
+            check_in=check_in,
+            check_out=check_out,
+            check_in_time=_parse_time(item['check_in_time']),
+            check_out_time=_parse_time(item['check_out_time']),
+            number_of_guests=item['number_of_guests'],
+            status=status,
+            payment_status=PaymentStatus.PENDING,
+            total_price_cents=item['total_price_cents'],
+            currency=item['currency'],
+            special_requests=item['special_requests']
+        )
+        for room in item['rooms']:
+            if room['room_id'] not in rooms:
+                raise ValueError(f"Invalid room {room['room_id']}")
+            booking.rooms.append(BookingRoom(
+                room_id=room['room_id'],
+                check_in=check_in,
+                check_out=check_out,
+                nights=room['nights'],
+                price_cents=room['price_cents']
+            ))
+        for extra in item['extras']:
+            booking.extras.append(BookingExtra(
+                extra_id=extra['extra_id'],
+                quantity=extra['quantity'],
+                price_cents=extra['price_cents']
+            ))
+        bookings.append(booking)
+    return bookings
+
+
+def delete_bookings(booking_ids):
+    """
+    Borrar reservas y sus filas hijas con un DELETE por tabla (sin commit).
+    Las reservas activas se liberan antes con release_inventory(), que
+    anota los cambios de inventario.
+    """
+    if not booking_ids:
+        return 0
+    for model in BOOKING_CHILDREN:
+        db.session.execute(
+            delete(model).where(model.booking_id.in_(booking_ids)),
+            execution_options={'synchronize_session': False}
+        )
+    result = db.session.execute(
+        delete(Booking).where(Booking.id.in_(booking_ids)),
+        execution_options={'synchronize_session': False}
+    )
+    return result.rowcount
+
+
+def reap_expired_carts(batch_size=DEFAULT_BATCH_SIZE, now=None):
+    """
+    Borrar los carritos caducados en lotes de `batch_size`, con un commit por
+    lote para no mantener bloqueos largos. Devuelve el total borrado.
+    """
+    now = now or datetime.utcnow()
+    total = 0
+    while True:
+        booking_ids = [booking_id for (booking_id,) in db.session.query(Booking.id).filter(
+            Booking.status == BookingStatus.CART,
+            Booking.cart_expires_at < now
+        ).order_by(Booking.cart_expires_at).limit(batch_size).all()]
+        if not booking_ids:
+            return total
+        total += delete_bookings(booking_ids)
+        db.session.commit()
+        if len(booking_ids) < batch_size:
+            return total
+
+
+class CartReaper:
+    """Hilo que ejecuta reap_expired_carts() y purga el CartStore cada `interval` segundos"""
+
+    def __init__(self, app, interval=60, batch_size=DEFAULT_BATCH_SIZE):
+        self.app = app
+        self.interval = interval
+        self.batch_size = batch_size
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name='cart-reaper', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self.app.app_context():
+                try:
+                    reap_expired_carts(self.batch_size)
+                    get_cart_store().purge()
+                except Exception as e:
+                    db.session.rollback()
+                    print(f"Cart reaper error: {str(e)}")
+                finally:
+                    db.session.remove()
+            _time.sleep(self.interval)
+
+
+def init_cart_reaper(app):
+    """
+    Arrancar el reaper con la primera petición (no en comandos de la CLI).
+    CART_REAPER_INTERVAL=0 lo desactiva (p. ej. si se usa `flask reap-carts` desde cron).
+    """
+    interval = int(app.config.get('CART_REAPER_INTERVAL', 60))
+    if interval <= 0:
+        return None
+
+    reaper = CartReaper(app, interval, int(app.config.get('CART_REAPER_BATCH_SIZE', DEFAULT_BATCH_SIZE)))
+
+    @app.before_request
+    def start_cart_reaper():
+        reaper.start()
+
+    return reaper
@@ -0,0 +1,130 @@
+# src/api/changes.py
+"""
+Seguimiento de cambios de inventario.
+
+Escucha los eventos de sesión de SQLAlchemy, anota qué habitaciones y
+experiencias (y qué fechas) o qué tablas de catálogo se ven afectadas por
+cada flush y, tras el commit, avisa a los suscriptores (índices y cachés en memoria). Si la
+transacción hace rollback los cambios anotados se descartan.
+
+Los savepoints (begin_nested) también disparan after_commit/after_rollback:
+solo se publica o descarta en la transacción de nivel superior, así los
+suscriptores nunca ven estado anterior al COMMIT real. Los cambios de un
+savepoint deshecho se conservan; invalidar de más no es un problema.
+"""
+from collections import namedtuple
+from datetime import timedelta
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from api.models import (
+    Booking, BookingRoom, RoomAvailability, ExperienceAvailability,
+    Room, Experience, ExperienceSchedule, Extra, Package, PackageExtra
+)
+from api.availability import ACTIVE_BOOKING_STATUSES
+
+# Noches [start, end) de una habitación
+RoomChange = namedtuple('RoomChange', ['room_id', 'start', 'end'])
+# Fecha de una experiencia
+ExperienceChange = namedtuple('ExperienceChange', ['experience_id', 'date'])
+# Alta, baja o edición de un modelo de catálogo (nombre de la tabla)
+CatalogChange = namedtuple('CatalogChange', ['table'])
+
+CATALOG_MODELS = (Room, Experience, ExperienceSchedule, Extra, Package, PackageExtra)
+
+_SESSION_KEY = 'inventory_changes'
+_subscribers = []
+
+
+def subscribe(callback):
+    """Registrar `callback(changes)`; recibe una lista de RoomChange/ExperienceChange/CatalogChange"""
+    _subscribers.append(callback)
+    return callback
+
+
+def record_change(session, change):
+    """Anotar un cambio que no pasa por el flush (UPDATE o DELETE masivos)"""
+    session.info.setdefault(_SESSION_KEY, set()).add(change)
+
+
+def pending_changes(session):
+    """Cambios anotados en la transacción en curso que aún no se han publicado"""
+    return set(session.info.get(_SESSION_KEY, ()))
+
+
+def _values(obj, attr):
+    """Valor actual y valores anteriores (si se modificó) de un atributo"""
+    history = inspect(obj).attrs[attr].history
+    values = list(history.added) + list(history.unchanged) + list(history.deleted)
+    return [v for v in values if v is not None] or [getattr(obj, attr)]
+
+
+def _holds_inventory(booking):
+    """True si la reserva ocupa (u ocupaba antes del flush) inventario"""
+    history = inspect(booking).attrs.status.history
+    if history.added and not history.deleted and inspect(booking).persistent:
+        # Estado anterior desconocido (atributo expirado): asumir que cambia
+        return True
+    return any(status in ACTIVE_BOOKING_STATUSES for status in _values(booking, 'status'))
+
+
+def _booking_changes(booking, is_modified):
+    if is_modified and not inspect(booking).attrs.status.history.has_changes():
+        return []
+    if not _holds_inventory(booking):
+        return []
+    changes = []
+    if booking.experience_id and booking.experience_date:
+        changes.append(ExperienceChange(booking.experience_id, booking.experience_date))
+    for booking_room in booking.rooms:
+        changes.append(RoomChange(booking_room.room_id, booking_room.check_in, booking_room.check_out))
+    return changes
+
+
+def _collect_changes(session, flush_context):
+    changes = []
+    for objects, is_modified in ((session.new, False), (session.dirty, True), (session.deleted, False)):
+        for obj in objects:
+            if isinstance(obj, Booking):
+                changes.extend(_booking_changes(obj, is_modified))
+            elif isinstance(obj, BookingRoom):
+                booking = obj.booking or session.get(Booking, obj.booking_id)
+                if booking is not None and not _holds_inventory(booking):
+                    continue
+                for room_id in _values(obj, 'room_id'):
+                    changes.append(RoomChange(room_id, min(_values(obj, 'check_in')), max(_values(obj, 'check_out'))))
+            elif isinstance(obj, RoomAvailability):
+                for room_id in _values(obj, 'room_id'):
+                    for day in _values(obj, 'date'):
+                        changes.append(RoomChange(room_id, day, day + timedelta(days=1)))
+            elif isinstance(obj, ExperienceAvailability):
+                for experience_id in _values(obj, 'experience_id'):
+                    for day in _values(obj, 'date'):
+                        changes.append(ExperienceChange(experience_id, day))
+            elif isinstance(obj, CATALOG_MODELS):
+                # Solo cuentan las columnas: añadir una reserva a room.bookings no cambia el catálogo
+                if is_modified and not session.is_modified(obj, include_collections=False):
+                    continue
+                changes.append(CatalogChange(obj.__tablename__))
+    for change in changes:
+        record_change(session, change)
+
+
+def _dispatch_changes(session):
+    if session.in_nested_transaction():
+        return
+    changes = session.info.pop(_SESSION_KEY, None)
+    if not changes:
+        return
+    for callback in _subscribers:
+        callback(list(changes))
+
+
+def _discard_changes(session):
+    if session.in_nested_transaction():
+        return
+    session.info.pop(_SESSION_KEY, None)
+
+
+event.listen(Session, 'after_flush', _collect_changes)
+event.listen(Session, 'after_commit', _dispatch_changes)
+event.listen(Session, 'after_rollback', _discard_changes)
@@ -38,4 +38,58 @@ def setup_commands(app):
     def seed_data():
         """Poblar la base de datos con datos de CaliaFarm"""
         from api.seed import seed_database
-        seed_database()
\ No newline at end of file
+        seed_database()
+
+    @app.cli.command("precompute-availability")
+    @click.option("--days", default=None, type=int, help="Días del horizonte (por defecto AVAILABILITY_SNAPSHOT_DAYS)")
+    def precompute_availability_command(days):
+        """Precalcular la disponibilidad de habitaciones y experiencias (cron nocturno)"""
+        from api.snapshots import precompute_availability
+        days = days or int(app.config.get('AVAILABILITY_SNAPSHOT_DAYS', 90))
+        room_rows, experience_rows = precompute_availability(days)
+        print(f"✅ Disponibilidad precalculada para {days} días: {room_rows} filas de habitaciones, {experience_rows} de experiencias")
+
+    @app.cli.command("precompress-static")
+    @click.option("--directory", default=None, help="Directorio del build (por defecto dist/)")
+    def precompress_static_command(directory):
+        """Generar los .br/.gz del frontend compilado (se ejecuta en el build)"""
+        import os
+        from api.compression import precompress_directory
+        directory = directory or os.path.join(os.path.dirname(app.root_path), 'dist')
+        written = precompress_directory(directory)
+        print(f"✅ {written} archivos precomprimidos en {directory}")
+
+    @app.cli.command("backfill-money")
+    @click.option("--batch-size", default=1000, type=int, help="Filas actualizadas por lote")
+    def backfill_money_command(batch_size):
+        """Rellenar las columnas *_cents desde los importes Float antiguos (se puede repetir)"""
+        from api.money import backfill_money_columns
+        for column, written in backfill_money_columns(batch_size).items():
+            print(f"✅ {column}: {written} filas")
+
+    @app.cli.command("reap-carts")
+    @click.option("--batch-size", default=500, type=int, help="Reservas borradas por lote")
+    def reap_carts_command(batch_size):
+        """Borrar los carritos caducados (alternativa al reaper en segundo plano)"""
+        from api.carts import reap_expired_carts
+        deleted = reap_expired_carts(batch_size)
+        print(f"✅ {deleted} items de carrito caducados eliminados")
+
+    @app.cli.command("rebuild-experience-availability")
+    @click.option("--from-date", default=None, help="Solo fechas desde YYYY-MM-DD")
+    def rebuild_experience_availability(from_date):
+        """Reconstruir los contadores de plazas de experiencias desde Booking"""
+        from datetime import datetime
+        from api.capacity import rebuild_counters
+        start_date = datetime.strptime(from_date, '%Y-%m-%d').date() if from_date else None
+        written = rebuild_counters(start_date)
+        print(f"✅ {written} contadores de disponibilidad reconstruidos")
+
+    @app.cli.command("rebuild-room-nights")
+    def rebuild_room_nights_command():
+        """Regenerar las noches reclamadas (RoomNight) desde las reservas activas"""
+        from api.availability import rebuild_room_nights
+        written, conflicts = rebuild_room_nights()
+        print(f"✅ {written} noches de habitación reclamadas")
+        if conflicts:
+            print(f"⚠️  Reservas con noches solapadas: {conflicts}")
@@ -0,0 +1,127 @@
+# src/api/compression.py
+"""
+Compresión de respuestas (gzip y, si está instalado, brotli).
+
+Las respuestas dinámicas (JSON, HTML, texto) se comprimen en after_request
+según Accept-Encoding, a partir de COMPRESS_MIN_SIZE bytes y con el nivel
+configurado. Las respuestas en streaming y los archivos estáticos no se
+tocan: para dist/ se generan en el build hermanos .br/.gz
+(`flask precompress-static`) que se sirven tal cual.
+"""
+import gzip
+import mimetypes
+import os
+from flask import request, send_from_directory
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depende del entorno
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = {
+    'application/json', 'application/javascript', 'application/xml',
+    'image/svg+xml', 'text/html', 'text/css', 'text/plain', 'text/javascript', 'text/xml'
+}
+
+# Extensiones de dist/ que vale la pena precomprimir
+PRECOMPRESS_EXTENSIONS = ('.html', '.js', '.mjs', '.css', '.json', '.svg', '.txt', '.map', '.xml', '.ico')
+
+# Codificación -> extensión del archivo precomprimido
+PRECOMPRESSED_SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+
+
+def _available_encodings():
+    return ['br', 'gzip'] if brotli is not None else ['gzip']
+
+
+def negotiate_encoding(encodings=None):
+    """Mejor codificación aceptada por el cliente entre las disponibles (o None)"""
+    return request.accept_encodings.best_match(encodings or _available_encodings())
+
+
+def compress(data, encoding, level):
+    if encoding == 'br':
+        return brotli.compress(data, quality=level)
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def _compress_response(app, response):
+    if any((
+        response.direct_passthrough,
+        response.is_streamed,
+        response.status_code < 200,
+        response.status_code in (204, 206, 304),
+        'Content-Encoding' in response.headers,
+        response.mimetype not in COMPRESSIBLE_MIMETYPES
+    )):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    data = response.get_data()
+    if len(data) < app.config['COMPRESS_MIN_SIZE']:
+        return response
+
+    encoding = negotiate_encoding()
+    if encoding is None:
+        return response
+
+    level = app.config['COMPRESS_BR_LEVEL' if encoding == 'br' else 'COMPRESS_LEVEL']
+    response.set_data(compress(data, encoding, level))
+    response.headers['Content-Encoding'] = encoding
+    # La representación comprimida no es byte a byte la misma: ETag débil
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def send_precompressed(directory, path):
+    """send_from_directory() usando el hermano .br/.gz de `path` si existe y el cliente lo acepta"""
+    available = [
+        encoding for encoding, suffix in PRECOMPRESSED_SUFFIXES.items()
+        if os.path.isfile(os.path.join(directory, path + suffix))
+    ]
+    encoding = negotiate_encoding(available) if available else None
+    if encoding is None:
+        response = send_from_directory(directory, path)
+    else:
+        mimetype = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        response = send_from_directory(directory, path + PRECOMPRESSED_SUFFIXES[encoding], mimetype=mimetype)
+        response.headers['Content-Encoding'] = encoding
+    if available:
+        response.vary.add('Accept-Encoding')
+    return response
+
+
+def precompress_directory(directory, gzip_level=9, br_level=11):
+    """Generar hermanos .gz (y .br si hay brotli) de los archivos estáticos; devuelve cuántos"""
+    written = 0
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if not name.endswith(PRECOMPRESS_EXTENSIONS):
+                continue
+            path = os.path.join(root, name)
+            with open(path, 'rb') as f:
+                data = f.read()
+            for encoding, suffix in PRECOMPRESSED_SUFFIXES.items():
+                if encoding == 'br' and brotli is None:
+                    continue
+                compressed = compress(data, encoding, br_level if encoding == 'br' else gzip_level)
+                # Si no ahorra nada no vale la pena servirlo
+                if len(compressed) >= len(data):
+                    continue
+                with open(path + suffix, 'wb') as f:
+                    f.write(compressed)
+                written += 1
+    return written
+
+
+def init_compression(app):
+    """Registrar la compresión de respuestas dinámicas con la config de la app"""
+    app.config.setdefault('COMPRESS_MIN_SIZE', 500)
+    app.config.setdefault('COMPRESS_LEVEL', 6)
+    app.config.setdefault('COMPRESS_BR_LEVEL', 4)
+
+    @app.after_request
+    def compress_response(response):
+        return _compress_response(app, response)
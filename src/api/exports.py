@@ -0,0 +1,92 @@
+# src/api/exports.py
+"""
+Exportación de reservas en streaming (CSV / NDJSON).
+
+Se consulta una proyección plana de columnas (sin objetos ORM ni
+serialize_admin()) y se leen las filas por lotes con yield_per, que usa un
+cursor del lado del servidor cuando el driver lo permite. Cada lote se
+convierte en texto y se envía antes de leer el siguiente, así que la
+memoria no depende del número de reservas exportadas.
+"""
+import csv
+import io
+import json
+from api.models import db, Booking, User, Experience, Package
+
+EXPORT_BATCH_SIZE = 1000
+
+EXPORT_COLUMNS = (
+    ('id', Booking.id),
+    ('confirmation_number', Booking.confirmation_number),
+    ('status', Booking.status),
+    ('payment_status', Booking.payment_status),
+    ('user_email', User.email),
+    ('user_name', User.name),
+    ('experience', Experience.name),
+    ('experience_date', Booking.experience_date),
+    ('package', Package.name),
+    ('check_in', Booking.check_in),
+    ('check_out', Booking.check_out),
+    ('number_of_guests', Booking.number_of_guests),
+    ('total_price', Booking.total_price),
+    ('currency', Booking.currency),
+    ('stripe_payment_intent_id', Booking.stripe_payment_intent_id),
+    ('created_at', Booking.created_at),
+)
+
+EXPORT_HEADERS = [name for name, _ in EXPORT_COLUMNS]
+
+
+def export_query():
+    """Proyección plana de reservas con sus nombres relacionados (sin cargar objetos)"""
+    return db.session.query(
+        *[column.label(name) for name, column in EXPORT_COLUMNS]
+    ).select_from(Booking).join(
+        User, Booking.user_id == User.id
+    ).outerjoin(
+        Experience, Booking.experience_id == Experience.id
+    ).outerjoin(
+        Package, Booking.package_id == Package.id
+    )
+
+
+def _plain(value):
+    if value is None:
+        return None
+    if hasattr(value, 'value'):
+        return value.value
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+def _rows(query):
+    ordered = query.order_by(Booking.created_at, Booking.id)
+    for row in ordered.execution_options(yield_per=EXPORT_BATCH_SIZE):
+        yield [_plain(value) for value in row]
+
+
+def stream_csv(query):
+    """Generador de líneas CSV (con cabecera), un bloque de texto por lote"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_HEADERS)
+    for count, row in enumerate(_rows(query), 1):
+        writer.writerow(row)
+        if count % EXPORT_BATCH_SIZE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def stream_ndjson(query):
+    """Generador de un objeto JSON por línea, un bloque de texto por lote"""
+    chunk = []
+    for row in _rows(query):
+        chunk.append(json.dumps(dict(zip(EXPORT_HEADERS, row))))
+        if len(chunk) == EXPORT_BATCH_SIZE:
+            yield '\n'.join(chunk) + '\n'
+            chunk = []
+    if chunk:
+        yield '\n'.join(chunk) + '\n'
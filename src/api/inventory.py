@@ -0,0 +1,153 @@
+# src/api/inventory.py
+"""
+Transiciones de estado de reservas que ocupan o liberan inventario.
+
+Una reserva ocupa inventario mientras está en PENDING o CONFIRMED. Todo
+cambio de estado debe pasar por set_booking_status() para que los
+contadores de plazas y las noches reclamadas (RoomNight) se mantengan al
+día. Ambas reservas son atómicas (UPDATE condicional e INSERT con
+restricción única), así que checkouts concurrentes solo compiten por la
+misma experiencia y fecha o la misma habitación y noche.
+"""
+from api.availability import (
+    ACTIVE_BOOKING_STATUSES, claim_room_nights, release_room_nights, get_taken_room_nights,
+    stay_nights
+)
+from api.capacity import reserve_spots, release_spots, get_counters
+from api.models import db, Experience, Room
+from api.changes import record_change, RoomChange, ExperienceChange
+
+
+class InventoryConflict(Exception):
+    """No queda inventario para la reserva"""
+
+    def __init__(self, message, booking=None):
+        Exception.__init__(self, message)
+        self.message = message
+        self.booking = booking
+
+
+def hold_inventory(booking, exclude_booking_ids=None):
+    """
+    Ocupar plazas y noches de la reserva; lanza InventoryConflict si no quedan.
+
+    `exclude_booking_ids` son las reservas ya guardadas que aún no han
+    ocupado inventario (el resto del carrito en checkout); no cuentan al
+    crear un contador que falta. Por defecto, solo la propia reserva.
+    """
+    if booking.experience_id and booking.experience_date:
+        held = reserve_spots(
+            booking.experience,
+            booking.experience_date,
+            booking.number_of_guests,
+            exclude_booking_ids=exclude_booking_ids or [booking.id]
+        )
+        if not held:
+            raise InventoryConflict(
+                f"Experience '{booking.experience.name}' no longer has enough spots available",
+                booking
+            )
+
+    conflict = claim_room_nights(booking.rooms, booking.id)
+    if conflict is not None:
+        if booking.experience_id and booking.experience_date:
+            release_spots(booking.experience_id, booking.experience_date, booking.number_of_guests)
+        raise InventoryConflict(
+            f"Room '{conflict.room.name}' is no longer available for selected dates",
+            booking
+        )
+
+
+def release_inventory(booking):
+    """
+    Devolver las plazas y noches ocupadas por la reserva.
+
+    Son UPDATE/DELETE masivos que el flush no ve: se anotan en el change
+    feed para que índices y cachés se enteren tras el commit.
+    """
+    if booking.experience_id and booking.experience_date:
+        release_spots(booking.experience_id, booking.experience_date, booking.number_of_guests)
+        record_change(db.session, ExperienceChange(booking.experience_id, booking.experience_date))
+    for booking_room in booking.rooms:
+        record_change(db.session, RoomChange(booking_room.room_id, booking_room.check_in, booking_room.check_out))
+    release_room_nights(booking.id)
+
+
+def set_booking_status(booking, status):
+    """
+    Cambiar el estado de una reserva ocupando o liberando inventario.
+
+    Lanza InventoryConflict (sin cambiar el estado) si la reserva pasa a
+    ocupar inventario y ya no hay disponibilidad.
+    """
+    was_active = booking.status in ACTIVE_BOOKING_STATUSES
+    is_active = status in ACTIVE_BOOKING_STATUSES
+
+    if is_active and not was_active:
+        hold_inventory(booking)
+    elif was_active and not is_active:
+        release_inventory(booking)
+
+    booking.status = status
+
+
+def find_cart_conflicts(bookings, item_ids=None):
+    """
+    Validar todo el carrito de una vez y devolver todos los conflictos.
+
+    Una consulta para las plazas de experiencias (contadores) y otra para
+    las noches de habitaciones (ledger + bloqueos). También detecta items
+    del mismo carrito que compiten entre sí: se atienden en orden y se
+    marcan los que ya no caben. Las reservas pueden no estar guardadas
+    todavía; `item_ids` (paralelo a `bookings`) identifica cada conflicto.
+    Experiencias y habitaciones se leen del identity map por id.
+    """
+    conflicts = []
+    item_for = dict(zip(map(id, bookings), item_ids or [b.id for b in bookings]))
+
+    experience_items = [b for b in bookings if b.experience_id and b.experience_date]
+    if experience_items:
+        counters = get_counters(
+            {b.experience_id for b in experience_items},
+            min(b.experience_date for b in experience_items),
+            max(b.experience_date for b in experience_items)
+        )
+        for booking in experience_items:
+            key = (booking.experience_id, booking.experience_date)
+            experience = db.session.get(Experience, booking.experience_id)
+            available = counters.get(key, experience.max_capacity)
+            if available < booking.number_of_guests:
+                conflicts.append({
+                    'item_id': item_for[id(booking)],
+                    'type': 'experience',
+                    'experience_id': booking.experience_id,
+                    'date': booking.experience_date.isoformat(),
+                    'requested': booking.number_of_guests,
+                    'available': max(available, 0),
+                    'message': f"Experience '{experience.name}' no longer has enough spots available"
+                })
+            else:
+                counters[key] = available - booking.number_of_guests
+
+    room_items = [(b, br) for b in bookings for br in b.rooms]
+    if room_items:
+        taken = get_taken_room_nights(
+            {br.room_id for _, br in room_items},
+            min(br.check_in for _, br in room_items),
+            max(br.check_out for _, br in room_items)
+        )
+        for booking, br in room_items:
+            nights = {(br.room_id, night) for night in stay_nights(br.check_in, br.check_out)}
+            if nights & taken:
+                conflicts.append({
+                    'item_id': item_for[id(booking)],
+                    'type': 'room',
+                    'room_id': br.room_id,
+                    'check_in': br.check_in.isoformat(),
+                    'check_out': br.check_out.isoformat(),
+                    'message': f"Room '{db.session.get(Room, br.room_id).name}' is no longer available for selected dates"
+                })
+            else:
+                taken |= nights
+
+    return conflicts
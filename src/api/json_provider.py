@@ -0,0 +1,66 @@
+# src/api/json_provider.py
+"""
+Proveedor JSON de la app.
+
+Usa orjson si está instalado (serializa en C y entiende date, datetime,
+time y Enum de forma nativa); si no, el json de la librería estándar con un
+`default` que produce la misma salida. Así los serializadores pueden
+devolver fechas y enums sin convertirlos a texto.
+"""
+import dataclasses
+from datetime import date, time
+from enum import Enum
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depende del entorno
+    orjson = None
+
+
+def _default(o):
+    """Tipos que el json estándar no conoce, con el mismo formato que orjson"""
+    if isinstance(o, Enum):
+        return o.value
+    if isinstance(o, (date, time)):
+        return o.isoformat()
+    if dataclasses.is_dataclass(o) and not isinstance(o, type):
+        return dataclasses.asdict(o)
+    if hasattr(o, '__html__'):
+        return str(o.__html__())
+    if hasattr(o, 'hex') and hasattr(o, 'urn'):  # uuid.UUID
+        return str(o)
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+class FastJSONProvider(DefaultJSONProvider):
+
+    default = staticmethod(_default)
+
+    def _orjson_options(self, indent=False):
+        options = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if indent:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def dumps(self, obj, **kwargs):
+        # Con argumentos propios del json estándar (cls, separators, ...) se usa este
+        if orjson is None or set(kwargs) - {'default'}:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=kwargs.get('default', self.default), option=self._orjson_options()).decode()
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        if orjson is None:
+            return super().response(*args, **kwargs)
+
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        body = orjson.dumps(obj, default=self.default, option=self._orjson_options(indent))
+        return self._app.response_class(body + b"\n", mimetype=self.mimetype)
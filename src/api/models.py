@@ -1,7 +1,9 @@
 # models.py (ACTUALIZACIONES)
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import String, Boolean, Integer, Float, Text, Date, Time, DateTime, Enum as SQLEnum, JSON
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import String, Boolean, Integer, BigInteger, Text, Date, Time, DateTime, Enum as SQLEnum, JSON
+from sqlalchemy.orm import Mapped, mapped_column, relationship, selectinload, joinedload
+from sqlalchemy.ext.hybrid import hybrid_property
+from decimal import Decimal, ROUND_HALF_UP
 from datetime import datetime, time
 from enum import Enum
 from typing import List, Optional
@@ -9,6 +11,77 @@ import secrets
 
 db = SQLAlchemy()
 
+# ============= IMPORTES =============
+# Los importes se guardan como enteros en unidades menores (céntimos) en
+# columnas *_cents; la moneda de una reserva va en Booking.currency. Los
+# atributos sin sufijo (price, total_price...) son el valor de display y
+# solo deben usarse al serializar.
+DEFAULT_CURRENCY = 'EUR'
+
+
+def to_cents(amount):
+    """Importe en unidades (float, str o Decimal) -> céntimos, redondeando al céntimo"""
+    if amount is None:
+        return None
+    return int((Decimal(str(amount)) * 100).quantize(Decimal('1'), rounding=ROUND_HALF_UP))
+
+
+def from_cents(cents):
+    """Céntimos -> importe de display"""
+    return cents / 100 if cents is not None else None
+
+
+def money_property(cents_attr):
+    """Atributo en unidades de display respaldado por la columna entera `cents_attr`"""
+    def fget(self):
+        return from_cents(getattr(self, cents_attr))
+
+    def fset(self, value):
+        setattr(self, cents_attr, to_cents(value))
+
+    def expr(cls):
+        return getattr(cls, cents_attr) / 100.0
+
+    prop = hybrid_property(fget, fset, expr=expr)
+    prop.cents_attr = cents_attr  # para los formularios del admin
+    return prop
+
+
+# ============= SERIALIZACIÓN =============
+# serialize(fields, expand): `fields` es un set de claves (None = todas) y
+# `expand` un árbol {relación: sub-árbol} de relaciones a anidar (None = las
+# de siempre). Una relación sin expandir se devuelve como su id y no se carga.
+
+
+def _only(fields, data):
+    """Quedarse con las claves pedidas"""
+    if fields is None:
+        return data
+    return {key: value for key, value in data.items() if key in fields}
+
+
+def _expands(fields, expand, name):
+    """True si la relación `name` se serializa anidada"""
+    return (fields is None or name in fields) and (expand is None or name in expand)
+
+
+def _sub_expand(expand, name):
+    return None if expand is None else expand[name]
+
+
+def _add_relations(data, fields, expand, relations):
+    """
+    Añadir a `data` las relaciones {nombre: (build(sub_expand), clave_id, id)}.
+    Las no expandidas solo aportan su id, sin acceder a la relación.
+    """
+    for name, (build, id_key, related_id) in relations.items():
+        if _expands(fields, expand, name):
+            data[name] = build(_sub_expand(expand, name))
+        elif id_key and (fields is None or name in fields or id_key in fields):
+            data[id_key] = related_id
+    return data
+
+
 # ============= ENUMS =============
 
 
@@ -99,19 +172,19 @@ class User(db.Model):
     bookings: Mapped[List["Booking"]] = relationship(
         back_populates='user', lazy='dynamic')
 
-    def serialize(self):
-        return {
+    def serialize(self, fields=None, expand=None):
+        return _only(fields, {
             "id": self.id,
             "email": self.email,
             "is_active": self.is_active,
-            "role": self.role.value,
+            "role": self.role,
             "name": self.name,
             "phone": self.phone,
             "email_verified": self.email_verified,
             "is_guest": self.is_guest,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-            "last_login": self.last_login.isoformat() if self.last_login else None
-        }
+            "created_at": self.created_at,
+            "last_login": self.last_login
+        })
 
     def is_admin(self):
         return self.role == UserRole.ADMIN
@@ -137,7 +210,9 @@ class Experience(db.Model):
     id: Mapped[int] = mapped_column(primary_key=True)
     name: Mapped[str] = mapped_column(String(200), nullable=False)
     description: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
-    price: Mapped[float] = mapped_column(Float, nullable=False)
+    # NOT NULL una vez ejecutado `flask backfill-money`
+    price_cents: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)
+    price = money_property('price_cents')
     max_capacity: Mapped[int] = mapped_column(
         Integer, default=20, nullable=False)
     duration_hours: Mapped[Optional[int]] = mapped_column(
@@ -153,8 +228,15 @@ class Experience(db.Model):
     bookings: Mapped[List["Booking"]] = relationship(
         back_populates='experience')
 
-    def serialize(self):
-        return {
+    @classmethod
+    def serialize_options(cls, fields=None, expand=None):
+        """Opciones de carga de las relaciones que usa serialize()"""
+        if not _expands(fields, expand, 'schedules'):
+            return []
+        return [selectinload(cls.schedules)]
+
+    def serialize(self, fields=None, expand=None):
+        data = _only(fields, {
             'id': self.id,
             'name': self.name,
             'description': self.description,
@@ -162,9 +244,11 @@ class Experience(db.Model):
             'max_capacity': self.max_capacity,
             'duration_hours': self.duration_hours,
             'image_url': self.image_url,
-            'is_active': self.is_active,
-            'schedules': [schedule.serialize() for schedule in self.schedules]
-        }
+            'is_active': self.is_active
+        })
+        return _add_relations(data, fields, expand, {
+            'schedules': (lambda sub: [schedule.serialize() for schedule in self.schedules], None, None)
+        })
 
 
 class ExperienceSchedule(db.Model):
@@ -196,7 +280,9 @@ class Room(db.Model):
     name: Mapped[str] = mapped_column(String(100), nullable=False)
     description: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     capacity: Mapped[int] = mapped_column(Integer, nullable=False)
-    price_per_night: Mapped[float] = mapped_column(Float, nullable=False)
+    # NOT NULL una vez ejecutado `flask backfill-money`
+    price_per_night_cents: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)
+    price_per_night = money_property('price_per_night_cents')
     image_url: Mapped[Optional[str]] = mapped_column(
         String(500), nullable=True)
     amenities: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)
@@ -211,8 +297,8 @@ class Room(db.Model):
     booking_rooms: Mapped[List["BookingRoom"]
                           ] = relationship(back_populates='room')
 
-    def serialize(self):
-        return {
+    def serialize(self, fields=None, expand=None):
+        return _only(fields, {
             'id': self.id,
             'name': self.name,
             'description': self.description,
@@ -223,7 +309,7 @@ class Room(db.Model):
             'is_active': self.is_active,
             'check_in_time': self.check_in_time.strftime('%H:%M'),
             'check_out_time': self.check_out_time.strftime('%H:%M')
-        }
+        })
 
 # ============= EXTRAS (sin cambios) =============
 
@@ -234,7 +320,9 @@ class Extra(db.Model):
     id: Mapped[int] = mapped_column(primary_key=True)
     name: Mapped[str] = mapped_column(String(100), nullable=False)
     description: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
-    price: Mapped[float] = mapped_column(Float, nullable=False)
+    # NOT NULL una vez ejecutado `flask backfill-money`
+    price_cents: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)
+    price = money_property('price_cents')
     type: Mapped[ExtraType] = mapped_column(SQLEnum(ExtraType), nullable=False)
     image_url: Mapped[Optional[str]] = mapped_column(
         String(500), nullable=True)
@@ -245,8 +333,8 @@ class Extra(db.Model):
     booking_extras: Mapped[List["BookingExtra"]
                            ] = relationship(back_populates='extra')
 
-    def serialize(self):
-        return {
+    def serialize(self, fields=None, expand=None):
+        return _only(fields, {
             'id': self.id,
             'name': self.name,
             'description': self.description,
@@ -254,7 +342,7 @@ class Extra(db.Model):
             'type': self.type.value,
             'image_url': self.image_url,
             'is_active': self.is_active
-        }
+        })
 
 # ============= PAQUETES (sin cambios) =============
 
@@ -265,7 +353,9 @@ class Package(db.Model):
     id: Mapped[int] = mapped_column(primary_key=True)
     name: Mapped[str] = mapped_column(String(200), nullable=False)
     description: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
-    price: Mapped[float] = mapped_column(Float, nullable=False)
+    # NOT NULL una vez ejecutado `flask backfill-money`
+    price_cents: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)
+    price = money_property('price_cents')
     image_url: Mapped[Optional[str]] = mapped_column(
         String(500), nullable=True)
     is_active: Mapped[bool] = mapped_column(Boolean(), default=True)
@@ -282,18 +372,37 @@ class Package(db.Model):
         back_populates='package', cascade='all, delete-orphan')
     bookings: Mapped[List["Booking"]] = relationship(back_populates='package')
 
-    def serialize(self):
-        return {
+    @classmethod
+    def serialize_options(cls, fields=None, expand=None):
+        """Opciones de carga de las relaciones que usa serialize()"""
+        options = []
+        if _expands(fields, expand, 'room'):
+            options.append(joinedload(cls.room))
+        if _expands(fields, expand, 'experience'):
+            options.append(joinedload(cls.experience).options(
+                *Experience.serialize_options(expand=_sub_expand(expand, 'experience'))))
+        if _expands(fields, expand, 'included_extras'):
+            options.append(selectinload(cls.included_extras).options(
+                *PackageExtra.serialize_options(expand=_sub_expand(expand, 'included_extras'))))
+        return options
+
+    def serialize(self, fields=None, expand=None):
+        data = _only(fields, {
             'id': self.id,
             'name': self.name,
             'description': self.description,
             'price': self.price,
             'image_url': self.image_url,
-            'room': self.room.serialize() if self.room else None,
-            'experience': self.experience.serialize() if self.experience else None,
-            'included_extras': [pe.serialize() for pe in self.included_extras],
             'is_active': self.is_active
-        }
+        })
+        return _add_relations(data, fields, expand, {
+            'room': (lambda sub: self.room.serialize(expand=sub) if self.room else None,
+                     'room_id', self.room_id),
+            'experience': (lambda sub: self.experience.serialize(expand=sub) if self.experience else None,
+                           'experience_id', self.experience_id),
+            'included_extras': (lambda sub: [pe.serialize(expand=sub) for pe in self.included_extras],
+                                None, None)
+        })
 
 
 class PackageExtra(db.Model):
@@ -309,12 +418,21 @@ class PackageExtra(db.Model):
     package: Mapped["Package"] = relationship(back_populates='included_extras')
     extra: Mapped["Extra"] = relationship()
 
-    def serialize(self):
-        return {
+    @classmethod
+    def serialize_options(cls, fields=None, expand=None):
+        """Opciones de carga de las relaciones que usa serialize()"""
+        if not _expands(fields, expand, 'extra'):
+            return []
+        return [joinedload(cls.extra)]
+
+    def serialize(self, fields=None, expand=None):
+        data = _only(fields, {
             'id': self.id,
-            'extra': self.extra.serialize(),
             'quantity': self.quantity
-        }
+        })
+        return _add_relations(data, fields, expand, {
+            'extra': (lambda sub: self.extra.serialize(expand=sub), 'extra_id', self.extra_id)
+        })
 
 # ============= RESERVAS =============
 
@@ -349,7 +467,11 @@ class Booking(db.Model):
 
     status: Mapped[BookingStatus] = mapped_column(
         SQLEnum(BookingStatus), default=BookingStatus.CART)
-    total_price: Mapped[float] = mapped_column(Float, nullable=False)
+    # NOT NULL una vez ejecutado `flask backfill-money`
+    total_price_cents: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)
+    total_price = money_property('total_price_cents')
+    currency: Mapped[str] = mapped_column(
+        String(3), nullable=False, default=DEFAULT_CURRENCY, server_default=DEFAULT_CURRENCY)
 
     stripe_payment_intent_id: Mapped[Optional[str]] = mapped_column(
         String(200), nullable=True)
@@ -380,41 +502,77 @@ class Booking(db.Model):
         back_populates='booking', cascade='all, delete-orphan')
     email_logs: Mapped[List["EmailLog"]] = relationship(
         back_populates='booking', cascade='all, delete-orphan')
+    room_nights: Mapped[List["RoomNight"]] = relationship(
+        back_populates='booking', cascade='all, delete-orphan')
 
-    def serialize(self):
-        return {
+    __table_args__ = (
+        # Paginación por keyset de los listados (api.pagination)
+        db.Index('ix_bookings_created_at_id', 'created_at', 'id'),
+        db.Index('ix_bookings_user_id_created_at_id', 'user_id', 'created_at', 'id'),
+        # Reaper de carritos caducados (api.carts)
+        db.Index('ix_bookings_status_cart_expires_at', 'status', 'cart_expires_at'),
+    )
+
+    @classmethod
+    def serialize_options(cls, fields=None, expand=None):
+        """Opciones de carga de las relaciones que usan serialize() y serialize_admin()"""
+        options = []
+        if _expands(fields, expand, 'user'):
+            options.append(joinedload(cls.user))
+        if _expands(fields, expand, 'experience'):
+            options.append(joinedload(cls.experience).options(
+                *Experience.serialize_options(expand=_sub_expand(expand, 'experience'))))
+        if _expands(fields, expand, 'package'):
+            options.append(joinedload(cls.package).options(
+                *Package.serialize_options(expand=_sub_expand(expand, 'package'))))
+        if _expands(fields, expand, 'rooms'):
+            options.append(selectinload(cls.rooms).options(
+                *BookingRoom.serialize_options(expand=_sub_expand(expand, 'rooms'))))
+        if _expands(fields, expand, 'extras'):
+            options.append(selectinload(cls.extras).options(
+                *BookingExtra.serialize_options(expand=_sub_expand(expand, 'extras'))))
+        return options
+
+    def serialize(self, fields=None, expand=None):
+        data = _only(fields, {
             'id': self.id,
             'confirmation_number': self.confirmation_number,
-            'user': self.user.serialize(),
-            'experience': self.experience.serialize() if self.experience else None,
-            'package': self.package.serialize() if self.package else None,
-            'experience_date': self.experience_date.isoformat() if self.experience_date else None,
+            'experience_date': self.experience_date,
             'experience_time': self.experience_time.strftime('%H:%M') if self.experience_time else None,
-            'check_in': self.check_in.isoformat() if self.check_in else None,
-            'check_out': self.check_out.isoformat() if self.check_out else None,
+            'check_in': self.check_in,
+            'check_out': self.check_out,
             'check_in_time': self.check_in_time.strftime('%H:%M') if self.check_in_time else None,
             'check_out_time': self.check_out_time.strftime('%H:%M') if self.check_out_time else None,
             'number_of_guests': self.number_of_guests,
-            'status': self.status.value,
-            'payment_status': self.payment_status.value,
+            'status': self.status,
+            'payment_status': self.payment_status,
             'total_price': self.total_price,
-            'rooms': [br.serialize() for br in self.rooms],
-            'extras': [be.serialize() for be in self.extras],
+            'currency': self.currency,
             'special_requests': self.special_requests,
             'admin_notes': self.admin_notes,
             'stripe_payment_intent_id': self.stripe_payment_intent_id,
-            'created_at': self.created_at.isoformat(),
-            'updated_at': self.updated_at.isoformat(),
-            'cart_expires_at': self.cart_expires_at.isoformat() if self.cart_expires_at else None
-        }
-
-    def serialize_admin(self):
-        data = self.serialize()
-        data['stripe_details'] = {
-            'payment_intent_id': self.stripe_payment_intent_id,
-            'payment_status': self.stripe_payment_status,
-            'payment_status_enum': self.payment_status.value
-        }
+            'created_at': self.created_at,
+            'updated_at': self.updated_at,
+            'cart_expires_at': self.cart_expires_at
+        })
+        return _add_relations(data, fields, expand, {
+            'user': (lambda sub: self.user.serialize(expand=sub), 'user_id', self.user_id),
+            'experience': (lambda sub: self.experience.serialize(expand=sub) if self.experience else None,
+                           'experience_id', self.experience_id),
+            'package': (lambda sub: self.package.serialize(expand=sub) if self.package else None,
+                        'package_id', self.package_id),
+            'rooms': (lambda sub: [br.serialize(expand=sub) for br in self.rooms], None, None),
+            'extras': (lambda sub: [be.serialize(expand=sub) for be in self.extras], None, None)
+        })
+
+    def serialize_admin(self, fields=None, expand=None):
+        data = self.serialize(fields, expand)
+        if fields is None or 'stripe_details' in fields:
+            data['stripe_details'] = {
+                'payment_intent_id': self.stripe_payment_intent_id,
+                'payment_status': self.stripe_payment_status,
+                'payment_status_enum': self.payment_status.value
+            }
         return data
 
     @staticmethod
@@ -439,20 +597,31 @@ class BookingRoom(db.Model):
     check_in: Mapped[datetime] = mapped_column(Date, nullable=False)
     check_out: Mapped[datetime] = mapped_column(Date, nullable=False)
     nights: Mapped[int] = mapped_column(Integer, nullable=False)
-    price: Mapped[float] = mapped_column(Float, nullable=False)
+    # NOT NULL una vez ejecutado `flask backfill-money`
+    price_cents: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)
+    price = money_property('price_cents')
 
     booking: Mapped["Booking"] = relationship(back_populates='rooms')
     room: Mapped["Room"] = relationship(back_populates='booking_rooms')
 
-    def serialize(self):
-        return {
+    @classmethod
+    def serialize_options(cls, fields=None, expand=None):
+        """Opciones de carga de las relaciones que usa serialize()"""
+        if not _expands(fields, expand, 'room'):
+            return []
+        return [joinedload(cls.room)]
+
+    def serialize(self, fields=None, expand=None):
+        data = _only(fields, {
             'id': self.id,
-            'room': self.room.serialize(),
-            'check_in': self.check_in.isoformat(),
-            'check_out': self.check_out.isoformat(),
+            'check_in': self.check_in,
+            'check_out': self.check_out,
             'nights': self.nights,
             'price': self.price
-        }
+        })
+        return _add_relations(data, fields, expand, {
+            'room': (lambda sub: self.room.serialize(expand=sub), 'room_id', self.room_id)
+        })
 
 
 class BookingExtra(db.Model):
@@ -464,18 +633,29 @@ class BookingExtra(db.Model):
     extra_id: Mapped[int] = mapped_column(
         Integer, db.ForeignKey('extras.id'), nullable=False)
     quantity: Mapped[int] = mapped_column(Integer, default=1)
-    price: Mapped[float] = mapped_column(Float, nullable=False)
+    # NOT NULL una vez ejecutado `flask backfill-money`
+    price_cents: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)
+    price = money_property('price_cents')
 
     booking: Mapped["Booking"] = relationship(back_populates='extras')
     extra: Mapped["Extra"] = relationship(back_populates='booking_extras')
 
-    def serialize(self):
-        return {
+    @classmethod
+    def serialize_options(cls, fields=None, expand=None):
+        """Opciones de carga de las relaciones que usa serialize()"""
+        if not _expands(fields, expand, 'extra'):
+            return []
+        return [joinedload(cls.extra)]
+
+    def serialize(self, fields=None, expand=None):
+        data = _only(fields, {
             'id': self.id,
-            'extra': self.extra.serialize(),
             'quantity': self.quantity,
             'price': self.price
-        }
+        })
+        return _add_relations(data, fields, expand, {
+            'extra': (lambda sub: self.extra.serialize(expand=sub), 'extra_id', self.extra_id)
+        })
 
 # ============= EMAIL LOG =============
 
@@ -542,6 +722,32 @@ class RoomAvailability(db.Model):
         }
 
 
+class RoomNight(db.Model):
+    """Noche de habitación ocupada por una reserva activa (una fila por noche)"""
+    __tablename__ = 'room_nights'
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    room_id: Mapped[int] = mapped_column(
+        Integer, db.ForeignKey('rooms.id'), nullable=False)
+    night: Mapped[datetime] = mapped_column(Date, nullable=False)
+    booking_id: Mapped[int] = mapped_column(
+        Integer, db.ForeignKey('bookings.id'), nullable=False, index=True)
+
+    booking: Mapped["Booking"] = relationship(back_populates='room_nights')
+
+    __table_args__ = (
+        db.UniqueConstraint('room_id', 'night', name='_room_night_uc'),
+    )
+
+    def serialize(self):
+        return {
+            'id': self.id,
+            'room_id': self.room_id,
+            'night': self.night.isoformat(),
+            'booking_id': self.booking_id
+        }
+
+
 class ExperienceAvailability(db.Model):
     __tablename__ = 'experience_availability'
 
@@ -566,6 +772,42 @@ class ExperienceAvailability(db.Model):
         }
 
 
+class AvailabilitySnapshot(db.Model):
+    """
+    Disponibilidad precalculada por recurso y fecha (flask precompute-availability).
+
+    Habitaciones: available_spots es 1 (libre) o 0. Experiencias: plazas
+    libres, o None si ese día no hay sesión. is_stale se activa en la misma
+    transacción que modifica las reservas o el catálogo del recurso.
+    """
+    __tablename__ = 'availability_snapshots'
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    resource_type: Mapped[str] = mapped_column(String(20), nullable=False)  # 'room' o 'experience'
+    resource_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    date: Mapped[datetime] = mapped_column(Date, nullable=False)
+    available_spots: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    next_available_date: Mapped[Optional[datetime]] = mapped_column(Date, nullable=True)
+    is_stale: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
+    computed_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        db.UniqueConstraint('resource_type', 'resource_id', 'date', name='_snapshot_resource_date_uc'),
+    )
+
+    def serialize(self):
+        return {
+            'id': self.id,
+            'resource_type': self.resource_type,
+            'resource_id': self.resource_id,
+            'date': self.date.isoformat(),
+            'available_spots': self.available_spots,
+            'next_available_date': self.next_available_date.isoformat() if self.next_available_date else None,
+            'is_stale': self.is_stale,
+            'computed_at': self.computed_at.isoformat() if self.computed_at else None
+        }
+
+
 class BookingItem(db.Model):
     __tablename__ = 'booking_items'
 
@@ -587,8 +829,11 @@ class BookingItem(db.Model):
     check_out = db.Column(db.Date, nullable=True)
     nights = db.Column(db.Integer)
 
-    unit_price = db.Column(db.Float, nullable=False)
-    subtotal = db.Column(db.Float, nullable=False)
+    # NOT NULL una vez ejecutado `flask backfill-money`
+    unit_price_cents = db.Column(db.BigInteger, nullable=True)
+    subtotal_cents = db.Column(db.BigInteger, nullable=True)
+    unit_price = money_property('unit_price_cents')
+    subtotal = money_property('subtotal_cents')
 
     extras = db.Column(db.JSON)  # [{id, name, price}, ...]
 
@@ -0,0 +1,75 @@
+# src/api/money.py
+"""
+Backfill de los importes en céntimos.
+
+La migración 4a7c2e9b1d05 añade las columnas enteras *_cents junto a las
+Float antiguas, que pasan a ser opcionales y el modelo deja de usar.
+backfill_money_columns() copia ROUND(valor * 100) por lotes de ids, con un
+commit por lote y solo en las filas que aún no tienen céntimos, así que se
+puede repetir sin riesgo (`flask backfill-money`). Cuando haya terminado,
+una migración posterior puede marcar *_cents como NOT NULL y eliminar las
+columnas Float.
+"""
+import sqlalchemy as sa
+from api.models import db
+
+DEFAULT_BATCH_SIZE = 1000
+
+# (tabla, columna Float antigua, columna en céntimos)
+MONEY_COLUMNS = (
+    ('experiences', 'price', 'price_cents'),
+    ('rooms', 'price_per_night', 'price_per_night_cents'),
+    ('extras', 'price', 'price_cents'),
+    ('packages', 'price', 'price_cents'),
+    ('bookings', 'total_price', 'total_price_cents'),
+    ('booking_rooms', 'price', 'price_cents'),
+    ('booking_extras', 'price', 'price_cents'),
+    ('booking_items', 'unit_price', 'unit_price_cents'),
+    ('booking_items', 'subtotal', 'subtotal_cents'),
+)
+
+
+def backfill_money_column(table_name, legacy_name, cents_name, batch_size=DEFAULT_BATCH_SIZE):
+    """Rellenar `cents_name` desde `legacy_name` en lotes; devuelve las filas escritas"""
+    table = sa.table(table_name, sa.column('id'), sa.column(legacy_name), sa.column(cents_name))
+    legacy = table.c[legacy_name]
+    cents = table.c[cents_name]
+
+    written = 0
+    last_id = 0
+    while True:
+        ids = db.session.execute(
+            sa.select(table.c.id)
+            .where(table.c.id > last_id, cents.is_(None), legacy.isnot(None))
+            .order_by(table.c.id)
+            .limit(batch_size)
+        ).scalars().all()
+        if not ids:
+            return written
+
+        result = db.session.execute(
+            sa.update(table)
+            .where(table.c.id.in_(ids), cents.is_(None))
+            .values({cents_name: sa.cast(sa.func.round(legacy * 100), sa.BigInteger)})
+        )
+        db.session.commit()
+        written += result.rowcount
+        last_id = ids[-1]
+
+
+def backfill_money_columns(batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Rellenar todas las columnas de MONEY_COLUMNS. Las tablas sin la columna
+    Float (bases creadas ya con céntimos) se saltan. Devuelve
+    {'tabla.columna': filas escritas}.
+    """
+    inspector = sa.inspect(db.engine)
+    results = {}
+    for table_name, legacy_name, cents_name in MONEY_COLUMNS:
+        columns = {column['name'] for column in inspector.get_columns(table_name)}
+        if legacy_name not in columns:
+            continue
+        results[f"{table_name}.{cents_name}"] = backfill_money_column(
+            table_name, legacy_name, cents_name, batch_size
+        )
+    return results
@@ -0,0 +1,207 @@
+# src/api/occupancy.py
+"""
+Índice de ocupación de habitaciones en memoria.
+
+Cada habitación con reservas o bloqueos tiene un bitmap (un entero de
+Python) donde el bit i indica que la noche `origin + i` está ocupada por una
+reserva activa o bloqueada manualmente en RoomAvailability. Saber si una
+habitación está libre para un rango es un AND de bits, sin ir a la base de
+datos.
+
+El índice se construye al arrancar, se reconstruye cada día (o al superar
+ROOM_INDEX_MAX_AGE segundos) y recalcula solo las habitaciones afectadas
+tras cada commit que cambie reservas o bloqueos.
+"""
+import threading
+import time as _time
+from datetime import date, timedelta
+from api.models import db, Booking, BookingRoom, RoomAvailability
+from api.availability import ACTIVE_BOOKING_STATUSES, build_room_calendar
+from api.changes import subscribe, RoomChange
+
+
+class RoomOccupancyIndex:
+
+    def __init__(self, horizon_days=730, max_age=300):
+        self.horizon_days = horizon_days
+        self.max_age = max_age
+        self.origin = None
+        self.bitmaps = {}
+        self.built_at = None
+        self._dirty = set()
+        self._lock = threading.Lock()
+
+    # ----- construcción -----
+
+    def _mask(self, start, end):
+        """Bits de las noches [start, end) recortadas al horizonte"""
+        first = max((start - self.origin).days, 0)
+        last = min((end - self.origin).days, self.horizon_days)
+        if last <= first:
+            return 0
+        return ((1 << (last - first)) - 1) << first
+
+    def _load(self, room_ids=None):
+        """Bitmaps de las habitaciones indicadas (todas si room_ids es None)"""
+        horizon_end = self.origin + timedelta(days=self.horizon_days)
+
+        booked_query = db.session.query(
+            BookingRoom.room_id, BookingRoom.check_in, BookingRoom.check_out
+        ).join(Booking).filter(
+            BookingRoom.check_in < horizon_end,
+            BookingRoom.check_out > self.origin,
+            Booking.status.in_(ACTIVE_BOOKING_STATUSES)
+        )
+        blocked_query = db.session.query(
+            RoomAvailability.room_id, RoomAvailability.date
+        ).filter(
+            RoomAvailability.date >= self.origin,
+            RoomAvailability.date < horizon_end,
+            RoomAvailability.is_available.is_(False)
+        )
+        if room_ids is not None:
+            booked_query = booked_query.filter(BookingRoom.room_id.in_(room_ids))
+            blocked_query = blocked_query.filter(RoomAvailability.room_id.in_(room_ids))
+
+        bitmaps = {}
+        for room_id, check_in, check_out in booked_query.all():
+            bitmaps[room_id] = bitmaps.get(room_id, 0) | self._mask(check_in, check_out)
+        for room_id, day in blocked_query.all():
+            bitmaps[room_id] = bitmaps.get(room_id, 0) | self._mask(day, day + timedelta(days=1))
+        return bitmaps
+
+    def build(self):
+        """Construir el índice completo desde la base de datos"""
+        with self._lock:
+            self.origin = date.today()
+            self.bitmaps = self._load()
+            self._dirty.clear()
+            self.built_at = _time.monotonic()
+
+    def mark_dirty(self, room_ids):
+        """Marcar habitaciones para recalcular en la próxima consulta"""
+        with self._lock:
+            self._dirty.update(room_ids)
+
+    def _ensure_fresh(self):
+        expired = self.built_at is None or self.origin != date.today()
+        if expired or _time.monotonic() - self.built_at > self.max_age:
+            self.build()
+            return
+
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+        if dirty:
+            loaded = self._load(dirty)
+            with self._lock:
+                bitmaps = dict(self.bitmaps)
+                for room_id in dirty:
+                    bitmaps[room_id] = loaded.get(room_id, 0)
+                self.bitmaps = bitmaps
+
+    # ----- consultas -----
+
+    def covers(self, check_in, check_out):
+        if self.origin is None or check_in < self.origin:
+            return False
+        return (check_out - self.origin).days <= self.horizon_days
+
+    def busy_room_ids(self, check_in, check_out):
+        """
+        IDs de habitaciones ocupadas o bloqueadas en alguna noche de [check_in, check_out).
+
+        Devuelve None si el rango cae fuera del horizonte del índice.
+        """
+        self._ensure_fresh()
+        if not self.covers(check_in, check_out):
+            return None
+        mask = self._mask(check_in, check_out)
+        return {room_id for room_id, bitmap in self.bitmaps.items() if bitmap & mask}
+
+    def window_bitmaps(self, room_ids, start_date, end_date):
+        """
+        {room_id: bitmap} de [start_date, end_date) con el bit 0 en start_date.
+
+        Devuelve None si el rango cae fuera del horizonte del índice.
+        """
+        self._ensure_fresh()
+        if not self.covers(start_date, end_date):
+            return None
+        first = (start_date - self.origin).days
+        mask = self._mask(start_date, end_date)
+        bitmaps = self.bitmaps
+        return {room_id: (bitmaps.get(room_id, 0) & mask) >> first for room_id in room_ids}
+
+
+room_index = RoomOccupancyIndex()
+
+
+def calendar_bitmaps(calendar):
+    """Convertir {room_id: [libre, ...]} de build_room_calendar a bitmaps de ocupación"""
+    return {
+        room_id: sum(1 << i for i, free in enumerate(nights) if not free)
+        for room_id, nights in calendar.items()
+    }
+
+
+def free_check_ins(busy, total_nights, nights):
+    """
+    Bitmap de llegadas posibles: el bit i indica que las noches [i, i + nights)
+    están libres y caben en la ventana de `total_nights` noches.
+
+    Se desplaza el bitmap de noches libres sobre sí mismo, así que el coste
+    depende de `nights` y no de cuántas llegadas se prueban.
+    """
+    if nights > total_nights:
+        return 0
+    free = ~busy & ((1 << total_nights) - 1)
+    starts = free
+    for shift in range(1, nights):
+        starts &= free >> shift
+    return starts & ((1 << (total_nights - nights + 1)) - 1)
+
+
+def find_flexible_stays(rooms, start_date, end_date, min_nights, max_nights):
+    """
+    Todas las estancias libres (room, check_in, nights) dentro de [start_date, end_date).
+
+    Usa los bitmaps del índice (o un calendario de la base de datos si la
+    ventana cae fuera del horizonte) y calcula cada duración con operaciones
+    de bits por habitación.
+    """
+    room_ids = [room.id for room in rooms]
+    total_nights = (end_date - start_date).days
+    bitmaps = room_index.window_bitmaps(room_ids, start_date, end_date)
+    if bitmaps is None:
+        bitmaps = calendar_bitmaps(build_room_calendar(room_ids, start_date, end_date - timedelta(days=1)))
+
+    stays = []
+    for room in rooms:
+        busy = bitmaps.get(room.id, 0)
+        for nights in range(min_nights, max_nights + 1):
+            starts = free_check_ins(busy, total_nights, nights)
+            offset = 0
+            while starts:
+                if starts & 1:
+                    stays.append((room, start_date + timedelta(days=offset), nights))
+                starts >>= 1
+                offset += 1
+    return stays
+
+
+@subscribe
+def _on_inventory_changes(changes):
+    room_index.mark_dirty({c.room_id for c in changes if isinstance(c, RoomChange)})
+
+
+def init_room_index(app):
+    """Configurar y construir el índice al arrancar la app"""
+    room_index.horizon_days = int(app.config.get('ROOM_INDEX_HORIZON_DAYS', 730))
+    room_index.max_age = int(app.config.get('ROOM_INDEX_MAX_AGE', 300))
+    with app.app_context():
+        try:
+            room_index.build()
+        except Exception as e:
+            # Sin tablas todavía (p. ej. antes de `flask db upgrade`): se construye en la primera consulta
+            db.session.rollback()
+            print(f"Room index not built at startup: {str(e)}")
@@ -0,0 +1,62 @@
+# src/api/pagination.py
+"""
+Paginación por keyset (seek) sobre (created_at, id).
+
+En lugar de OFFSET, cada página continúa después de la última fila de la
+anterior: `WHERE (created_at, id) < (:created_at, :id) ORDER BY created_at
+DESC, id DESC LIMIT n`. Con un índice compuesto sobre esas columnas una
+página profunda cuesta lo mismo que la primera. El cursor es opaco para el
+cliente (base64 de la última clave devuelta).
+"""
+import base64
+import json
+from datetime import datetime
+from sqlalchemy import tuple_
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(created_at, row_id):
+    raw = json.dumps([created_at.isoformat(), row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """(created_at, id) de un cursor; lanza ValueError si no es válido"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        created_at, row_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+
+
+def parse_page_args(args):
+    """(cursor decodificado o None, tamaño de página) de ?cursor=&limit="""
+    try:
+        limit = int(args.get('limit', DEFAULT_PAGE_SIZE))
+    except ValueError:
+        raise ValueError("limit must be an integer")
+    if limit < 1:
+        raise ValueError("limit must be positive")
+
+    cursor = args.get('cursor')
+    return (decode_cursor(cursor) if cursor else None), min(limit, MAX_PAGE_SIZE)
+
+
+def paginate_keyset(query, model, cursor, limit):
+    """
+    Una página de `query` ordenada por (created_at, id) descendente.
+
+    Devuelve (filas, next_cursor); next_cursor es None en la última página.
+    """
+    if cursor is not None:
+        query = query.filter(tuple_(model.created_at, model.id) < tuple_(*cursor))
+
+    rows = query.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1].created_at, rows[-1].id)
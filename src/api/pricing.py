@@ -0,0 +1,234 @@
+# src/api/pricing.py
+"""
+Motor de precios.
+
+Todo lo que calcula importes (carrito, guest checkout, Stripe Checkout)
+pasa por price_line_item(): experiencia × huéspedes, precio del paquete,
+noches × price_per_night y extras PER_BOOKING / PER_GUEST. Todos los
+importes son enteros en céntimos (*_cents); el paso a unidades de display
+se hace al serializar.
+
+Los precios se leen de un PriceSnapshot en memoria con las columnas de
+precio y validación de Room, Extra, Package y Experience (una consulta
+por tabla al cargarlo). El snapshot se descarta cuando el change feed
+publica un cambio en alguna de esas tablas o al pasar PRICE_SNAPSHOT_TTL
+segundos; con el snapshot caliente tarificar no hace ninguna consulta.
+Su versión es un hash de los precios, igual en todos los nodos.
+"""
+import hashlib
+import threading
+import time as _time
+from collections import namedtuple
+from datetime import datetime
+from api.models import db, Room, Extra, Package, Experience, ExtraType
+from api.changes import subscribe, CatalogChange
+
+RoomPrice = namedtuple('RoomPrice', ['id', 'name', 'price_per_night_cents', 'is_active'])
+ExtraPrice = namedtuple('ExtraPrice', ['id', 'name', 'price_cents', 'type', 'is_active'])
+PackagePrice = namedtuple('PackagePrice', ['id', 'name', 'price_cents', 'is_active'])
+ExperiencePrice = namedtuple('ExperiencePrice', ['id', 'name', 'price_cents', 'is_active'])
+
+PRICED_MODELS = {
+    Room: (RoomPrice, (Room.id, Room.name, Room.price_per_night_cents, Room.is_active)),
+    Extra: (ExtraPrice, (Extra.id, Extra.name, Extra.price_cents, Extra.type, Extra.is_active)),
+    Package: (PackagePrice, (Package.id, Package.name, Package.price_cents, Package.is_active)),
+    Experience: (ExperiencePrice, (Experience.id, Experience.name, Experience.price_cents, Experience.is_active)),
+}
+PRICED_TABLES = frozenset(model.__tablename__ for model in PRICED_MODELS)
+
+
+class PriceSnapshot:
+    """Precios de catálogo {Modelo: {id: *Price}} y su versión"""
+
+    def __init__(self, prices):
+        self.prices = prices
+        digest = hashlib.sha256()
+        for model in PRICED_MODELS:
+            for entry in sorted(prices[model].values()):
+                digest.update(repr(entry).encode())
+        self.version = digest.hexdigest()[:12]
+        self.loaded_at = _time.monotonic()
+
+    @classmethod
+    def load(cls):
+        prices = {}
+        for model, (row_type, columns) in PRICED_MODELS.items():
+            prices[model] = {row[0]: row_type(*row) for row in db.session.query(*columns).all()}
+        return cls(prices)
+
+    def get(self, model, obj_id):
+        """Entrada activa de `model` o None"""
+        try:
+            entry = self.prices[model].get(int(obj_id))
+        except (TypeError, ValueError):
+            return None
+        return entry if entry is not None and entry.is_active else None
+
+
+class PriceBook:
+
+    def __init__(self, ttl=300):
+        self.ttl = ttl
+        self.loads = 0
+        self.invalidations = 0
+        self._generation = 0
+        self._snapshot = None
+        self._lock = threading.Lock()
+
+    def snapshot(self):
+        """Snapshot vigente; lo carga si no hay o ha caducado"""
+        with self._lock:
+            snapshot = self._snapshot
+            generation = self._generation
+        if snapshot is not None and _time.monotonic() - snapshot.loaded_at <= self.ttl:
+            return snapshot
+
+        snapshot = PriceSnapshot.load()
+        with self._lock:
+            self.loads += 1
+            # No guardar un snapshot leído antes de una invalidación
+            if generation == self._generation:
+                self._snapshot = snapshot
+        return snapshot
+
+    def invalidate(self):
+        with self._lock:
+            self._generation += 1
+            if self._snapshot is not None:
+                self.invalidations += 1
+            self._snapshot = None
+
+    def stats(self):
+        with self._lock:
+            return {
+                'loaded': self._snapshot is not None,
+                'version': self._snapshot.version if self._snapshot else None,
+                'ttl': self.ttl,
+                'loads': self.loads,
+                'invalidations': self.invalidations
+            }
+
+
+price_book = PriceBook()
+
+
+def _parse_date(value):
+    return datetime.strptime(value, '%Y-%m-%d').date() if value else None
+
+
+def price_line_item(data, snapshot=None):
+    """
+    Tarificar un item (formato de POST /cart) y devolver el desglose en
+    céntimos: {experience, package, rooms, extras, total_price_cents, price_version}.
+    Lanza ValueError si el item no es válido (huéspedes, noches o cantidades
+    menores que 1) o referencia algo inactivo.
+    """
+    snapshot = snapshot or price_book.snapshot()
+    if not isinstance(data, dict):
+        raise ValueError("Invalid cart item")
+    if not data.get('number_of_guests'):
+        raise ValueError("number_of_guests is required")
+
+    number_of_guests = int(data['number_of_guests'])
+    if number_of_guests < 1:
+        raise ValueError("number_of_guests must be at least 1")
+    total_cents = 0
+
+    experience = None
+    if data.get('experience_id'):
+        entry = snapshot.get(Experience, data['experience_id'])
+        if entry is None:
+            raise ValueError("Invalid experience")
+        experience = {
+            'id': entry.id,
+            'name': entry.name,
+            'unit_price_cents': entry.price_cents,
+            'price_cents': entry.price_cents * number_of_guests
+        }
+        total_cents += experience['price_cents']
+
+    package = None
+    if data.get('package_id'):
+        entry = snapshot.get(Package, data['package_id'])
+        if entry is None:
+            raise ValueError("Invalid package")
+        package = {'id': entry.id, 'name': entry.name, 'price_cents': entry.price_cents}
+        total_cents += package['price_cents']
+
+    rooms = []
+    check_in = _parse_date(data.get('check_in'))
+    check_out = _parse_date(data.get('check_out'))
+    if data.get('rooms') and check_in and check_out:
+        if not isinstance(data['rooms'], list):
+            raise ValueError("rooms must be a list")
+        nights = (check_out - check_in).days
+        if nights < 1:
+            raise ValueError("check_out must be after check_in")
+        for room_data in data['rooms']:
+            room_id = room_data.get('room_id') if isinstance(room_data, dict) else room_data
+            entry = snapshot.get(Room, room_id)
+            if entry is None:
+                raise ValueError(f"Invalid room {room_id}")
+            rooms.append({
+                'room_id': entry.id,
+                'room_name': entry.name,
+                'nights': nights,
+                'price_per_night_cents': entry.price_per_night_cents,
+                'price_cents': entry.price_per_night_cents * nights
+            })
+            total_cents += rooms[-1]['price_cents']
+
+    extras = []
+    if not isinstance(data.get('extras') or [], list):
+        raise ValueError("extras must be a list")
+    for extra_data in data.get('extras') or []:
+        if not isinstance(extra_data, dict):
+            raise ValueError("Invalid extra")
+        entry = snapshot.get(Extra, extra_data.get('extra_id'))
+        if entry is None:
+            raise ValueError(f"Invalid extra {extra_data.get('extra_id')}")
+        quantity = int(extra_data.get('quantity', 1))
+        if quantity < 1:
+            raise ValueError("Extra quantity must be at least 1")
+        if entry.type == ExtraType.PER_BOOKING:
+            extra_cents = entry.price_cents
+        else:
+            extra_cents = entry.price_cents * number_of_guests * quantity
+        extras.append({
+            'extra_id': entry.id,
+            'extra_name': entry.name,
+            'quantity': quantity,
+            'unit_price_cents': entry.price_cents,
+            'price_cents': extra_cents
+        })
+        total_cents += extra_cents
+
+    return {
+        'experience': experience,
+        'package': package,
+        'rooms': rooms,
+        'extras': extras,
+        'total_price_cents': total_cents,
+        'price_version': snapshot.version
+    }
+
+
+def price_line_items(entries):
+    """Tarificar varios items con el mismo snapshot: {items, total_price_cents, price_version}"""
+    snapshot = price_book.snapshot()
+    quotes = [price_line_item(entry, snapshot) for entry in entries]
+    return {
+        'items': quotes,
+        'total_price_cents': sum(quote['total_price_cents'] for quote in quotes),
+        'price_version': snapshot.version
+    }
+
+
+@subscribe
+def _on_price_changes(changes):
+    if any(isinstance(change, CatalogChange) and change.table in PRICED_TABLES for change in changes):
+        price_book.invalidate()
+
+
+def init_pricing(app):
+    price_book.ttl = int(app.config.get('PRICE_SNAPSHOT_TTL', 300))
@@ -1,13 +1,31 @@
 """
 This module takes care of starting the API Server, Loading the DB and Adding the endpoints
 """
-from flask import Flask, request, jsonify, url_for, Blueprint
+from flask import Flask, request, jsonify, url_for, Blueprint, current_app, Response, stream_with_context
 from api.models import (
     db, User, Experience, ExperienceSchedule, Room, Extra, Package, PackageExtra,
-    Booking, BookingRoom, BookingExtra, RoomAvailability, ExperienceAvailability,
-    BookingStatus, PaymentStatus, EmailStatus, EmailLog, UserRole, ExtraType, DayOfWeek
+    Booking, ExperienceAvailability, BookingStatus, PaymentStatus, EmailStatus, EmailLog,
+    UserRole, from_cents
 )
 from api.utils import generate_sitemap, APIException
+from api.availability import find_available_rooms
+from api.inventory import hold_inventory, release_inventory, set_booking_status, find_cart_conflicts, InventoryConflict
+from api.occupancy import room_index, find_flexible_stays
+from api.cache import (
+    availability_cache, catalog_cache, ROOMS, EXPERIENCES, ROOM_AVAILABILITY_TAG, EXPERIENCE_AVAILABILITY_TAG
+)
+from api.allocation import rank_room_combinations
+from api.pagination import parse_page_args, paginate_keyset
+from api.exports import export_query, stream_csv, stream_ndjson
+from api.summaries import booking_summary_query, summarize_bookings
+from api.carts import (
+    build_cart_item, serialize_cart_item, reprice_cart_items, materialize_cart_items, delete_bookings
+)
+from api.pricing import price_book, price_line_items
+from api.cart_store import get_cart_store
+from api.snapshots import (
+    snapshot_room_calendar, snapshot_capacity_matrix, get_next_available_dates, ROOM, EXPERIENCE
+)
 from api.email_service import (
     send_verification_email, 
     send_password_reset_email, 
@@ -19,6 +37,7 @@ from flask_jwt_extended import jwt_required, get_jwt_identity, create_access_tok
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime, timedelta, date, time
 from sqlalchemy import and_, or_, func
+from sqlalchemy.orm import selectinload
 import stripe
 import random
 import os
@@ -46,24 +65,85 @@ def admin_required():
     return wrapper
 
 # ============= HELPER: LIMPIAR CARRITOS EXPIRADOS =============
-def clean_expired_carts():
-    """Eliminar carritos que hayan expirado (más de 30 minutos)"""
-    expired_bookings = Booking.query.filter(
-        Booking.status == BookingStatus.CART,
-        Booking.cart_expires_at < datetime.utcnow()
-    ).all()
-    
-    for booking in expired_bookings:
-        db.session.delete(booking)
-    
-    if expired_bookings:
-        db.session.commit()
-
 def generate_temporary_password(length=12):
     """Generar contraseña temporal segura"""
     characters = string.ascii_letters + string.digits + "!@#$%^&*()"
     return ''.join(secrets.choice(characters) for _ in range(length))
 
+
+# ============= HELPER: PARÁMETROS DE CALENDARIO =============
+MAX_CALENDAR_DAYS = 92
+
+EXPERIENCE_TABLES = ('experiences', 'experience_schedules')
+PACKAGE_TABLES = ('packages', 'package_extras', 'rooms', 'extras') + EXPERIENCE_TABLES
+
+def catalog_response(key, tags, build):
+    """
+    Respuesta JSON de catálogo servida desde catalog_cache con ETag y
+    Last-Modified (304 si el cliente ya la tiene). `build()` devuelve los
+    datos a serializar, o None si el recurso no existe (no se cachea).
+    """
+    # La forma del payload (?fields=&expand=) también forma parte de la clave
+    key = key + (request.args.get('fields'), request.args.get('expand'))
+    entry = catalog_cache.get(key)
+    if entry is None:
+        generation = catalog_cache.generation
+        data = build()
+        if data is None:
+            return None
+        entry = catalog_cache.set(key, current_app.json.dumps(data).encode(), tags, generation)
+    
+    response = Response(entry.body, mimetype='application/json')
+    response.set_etag(entry.etag)
+    response.last_modified = entry.last_modified
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+def parse_shape_args(args):
+    """
+    ?fields=id,total_price&expand=user,package.room -> (fields, expand).
+    
+    fields: set de claves de primer nivel (None = todas). expand: árbol
+    {relación: sub-árbol} de relaciones a anidar (None = las de siempre);
+    las no expandidas se devuelven como su id y no se cargan.
+    """
+    fields = None
+    if 'fields' in args:
+        fields = {name.strip() for name in args['fields'].split(',') if name.strip()}
+    
+    expand = None
+    if 'expand' in args:
+        expand = {}
+        for path in args['expand'].split(','):
+            node = expand
+            for name in path.strip().split('.'):
+                if name:
+                    node = node.setdefault(name, {})
+    
+    return fields, expand
+
+def wants_field(fields, name):
+    return fields is None or name in fields
+
+def iso_or_none(value):
+    return value.isoformat() if value else None
+
+def parse_calendar_args(args, ids_param):
+    """Leer ?from=&to=&<ids_param>= (fechas YYYY-MM-DD, ids separados por comas)"""
+    try:
+        start_date = datetime.strptime(args['from'], '%Y-%m-%d').date()
+        end_date = datetime.strptime(args['to'], '%Y-%m-%d').date()
+        ids = [int(x) for x in args.get(ids_param, '').split(',') if x.strip()]
+    except (KeyError, ValueError):
+        raise ValueError("Invalid date format or missing parameters")
+    
+    if end_date < start_date:
+        raise ValueError("'to' must be on or after 'from'")
+    if (end_date - start_date).days >= MAX_CALENDAR_DAYS:
+        raise ValueError(f"Calendar range cannot exceed {MAX_CALENDAR_DAYS} days")
+    
+    return start_date, end_date, ids
+
 # ============= AUTENTICACIÓN COMPLETA =============
 @api.route('/register', methods=['POST'])
 def register():
@@ -354,16 +434,42 @@ def update_profile():
 # ============= EXPERIENCIAS (sin cambios del código anterior) =============
 @api.route('/experiences', methods=['GET'])
 def get_experiences():
-    experiences = Experience.query.filter_by(is_active=True).all()
-    return jsonify([exp.serialize() for exp in experiences]), 200
+    fields, expand = parse_shape_args(request.args)
+    
+    def build():
+        experiences = Experience.query.options(
+            *Experience.serialize_options(fields, expand)
+        ).filter_by(is_active=True).all()
+        data = [exp.serialize(fields, expand) for exp in experiences]
+        if wants_field(fields, 'next_available_date'):
+            next_dates = get_next_available_dates(
+                EXPERIENCE, [exp.id for exp in experiences], current_app.config['AVAILABILITY_SNAPSHOT_DAYS']
+            )
+            for exp, exp_data in zip(experiences, data):
+                exp_data['next_available_date'] = iso_or_none(next_dates.get(exp.id))
+        return data
+    
+    # next_available_date depende de las reservas y del día
+    return catalog_response(
+        ('experiences', date.today()),
+        EXPERIENCE_TABLES + (EXPERIENCE_AVAILABILITY_TAG,),
+        build
+    )
 
 @api.route('/experiences/<int:experience_id>', methods=['GET'])
 def get_experience(experience_id):
-    experience = Experience.query.get(experience_id)
-    if not experience:
-        return jsonify({"error": "Experience not found"}), 404
+    fields, expand = parse_shape_args(request.args)
+    
+    def build():
+        experience = Experience.query.options(
+            *Experience.serialize_options(fields, expand)
+        ).get(experience_id)
+        return experience.serialize(fields, expand) if experience else None
     
-    return jsonify(experience.serialize()), 200
+    response = catalog_response(('experience', experience_id), EXPERIENCE_TABLES, build)
+    if response is None:
+        return jsonify({"error": "Experience not found"}), 404
+    return response
 
 @api.route('/experiences/available', methods=['POST'])
 def get_available_experiences():
@@ -376,66 +482,127 @@ def get_available_experiences():
     except (KeyError, ValueError):
         return jsonify({"error": "Invalid date format or missing parameters"}), 400
     
-    experiences = Experience.query.filter_by(is_active=True).all()
+    cache_key = availability_cache.key(EXPERIENCES, start_date, end_date, guests)
+    cached = availability_cache.get(cache_key)
+    if cached is not None:
+        return jsonify(cached), 200
+    
+    experiences = Experience.query.options(
+        selectinload(Experience.schedules)
+    ).filter_by(is_active=True).all()
+    capacity = snapshot_capacity_matrix(experiences, start_date, end_date)
     available_experiences = []
     
     for experience in experiences:
-        schedule_days = [schedule.day_of_week for schedule in experience.schedules]
         available_dates = []
-        current_date = start_date
-        
-        while current_date <= end_date:
-            day_name = current_date.strftime('%A').upper()
-            try:
-                day_enum = DayOfWeek[day_name]
-            except KeyError:
-                current_date += timedelta(days=1)
-                continue
-            
-            if day_enum in schedule_days:
-                confirmed_bookings = Booking.query.filter(
-                    Booking.experience_id == experience.id,
-                    Booking.experience_date == current_date,
-                    Booking.status.in_([BookingStatus.CONFIRMED, BookingStatus.PENDING])
-                ).all()
-                
-                booked_spots = sum([b.number_of_guests for b in confirmed_bookings])
-                available_spots = experience.max_capacity - booked_spots
-                
-                if available_spots >= guests:
-                    schedule = next((s for s in experience.schedules if s.day_of_week == day_enum), None)
-                    available_dates.append({
-                        'date': current_date.isoformat(),
-                        'available_spots': available_spots,
-                        'day_of_week': day_name.lower(),
-                        'start_time': schedule.start_time.strftime('%H:%M') if schedule else None
-                    })
-            
-            current_date += timedelta(days=1)
+        
+        for current_date, (available_spots, schedule) in capacity[experience.id].items():
+            if available_spots >= guests:
+                available_dates.append({
+                    'date': current_date.isoformat(),
+                    'available_spots': available_spots,
+                    'day_of_week': schedule.day_of_week.value,
+                    'start_time': schedule.start_time.strftime('%H:%M') if schedule.start_time else None
+                })
         
         if available_dates:
             exp_data = experience.serialize()
             exp_data['available_dates'] = available_dates
             available_experiences.append(exp_data)
     
+    availability_cache.set(cache_key, available_experiences)
     return jsonify(available_experiences), 200
 
+@api.route('/experiences/calendar', methods=['GET'])
+def get_experiences_calendar():
+    """
+    Plazas libres por fecha programada
+    Query params: ?from=2024-01-01&to=2024-03-31&experience_ids=1,2
+    """
+    try:
+        start_date, end_date, experience_ids = parse_calendar_args(request.args, 'experience_ids')
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    query = Experience.query.options(selectinload(Experience.schedules)).filter_by(is_active=True)
+    if experience_ids:
+        query = query.filter(Experience.id.in_(experience_ids))
+    experiences = query.order_by(Experience.id).all()
+    capacity = snapshot_capacity_matrix(experiences, start_date, end_date)
+    
+    return jsonify({
+        "from": start_date.isoformat(),
+        "to": end_date.isoformat(),
+        "experiences": [{
+            "experience_id": experience.id,
+            "name": experience.name,
+            "price": experience.price,
+            "max_capacity": experience.max_capacity,
+            "dates": {
+                day.isoformat(): {
+                    "available_spots": max(spots, 0),
+                    "start_time": schedule.start_time.strftime('%H:%M') if schedule.start_time else None
+                }
+                for day, (spots, schedule) in capacity[experience.id].items()
+            }
+        } for experience in experiences]
+    }), 200
+
 # ============= HABITACIONES (sin cambios) =============
 @api.route('/rooms', methods=['GET'])
 def get_rooms():
-    rooms = Room.query.filter_by(is_active=True).all()
-    return jsonify([room.serialize() for room in rooms]), 200
+    fields, expand = parse_shape_args(request.args)
+    
+    def build():
+        rooms = Room.query.filter_by(is_active=True).all()
+        data = [room.serialize(fields, expand) for room in rooms]
+        if wants_field(fields, 'next_available_date'):
+            next_dates = get_next_available_dates(
+                ROOM, [room.id for room in rooms], current_app.config['AVAILABILITY_SNAPSHOT_DAYS']
+            )
+            for room, room_data in zip(rooms, data):
+                room_data['next_available_date'] = iso_or_none(next_dates.get(room.id))
+        return data
+    
+    # next_available_date depende de las reservas y del día
+    return catalog_response(('rooms', date.today()), ('rooms', ROOM_AVAILABILITY_TAG), build)
 
 @api.route('/rooms/<int:room_id>', methods=['GET'])
 def get_room(room_id):
-    room = Room.query.get(room_id)
-    if not room:
-        return jsonify({"error": "Room not found"}), 404
+    fields, expand = parse_shape_args(request.args)
     
-    return jsonify(room.serialize()), 200
+    def build():
+        room = Room.query.get(room_id)
+        return room.serialize(fields, expand) if room else None
+    
+    response = catalog_response(('room', room_id), ('rooms',), build)
+    if response is None:
+        return jsonify({"error": "Room not found"}), 404
+    return response
+
+def load_available_rooms(check_in, check_out):
+    """Habitaciones activas libres para [check_in, check_out)"""
+    # Índice en memoria; fuera de su horizonte se consulta la base de datos
+    busy_room_ids = room_index.busy_room_ids(check_in, check_out)
+    if busy_room_ids is None:
+        return find_available_rooms(check_in, check_out)
+    return [
+        room for room in Room.query.filter_by(is_active=True).order_by(Room.id).all()
+        if room.id not in busy_room_ids
+    ]
 
 @api.route('/rooms/available', methods=['POST'])
 def get_available_rooms():
+    """
+    Habitaciones libres para un rango de fechas
+    Body: {
+        "check_in": "2024-01-01",
+        "check_out": "2024-01-05",
+        "mode": "party",      (opcional: combinaciones para alojar al grupo)
+        "guests": 7,          (requerido en modo party)
+        "limit": 5            (opcional, modo party)
+    }
+    """
     data = request.get_json()
     
     try:
@@ -447,303 +614,326 @@ def get_available_rooms():
     if check_in >= check_out:
         return jsonify({"error": "Check-out must be after check-in"}), 400
     
-    rooms = Room.query.filter_by(is_active=True).all()
+    if data.get('mode') == 'party':
+        return get_party_room_combinations(data, check_in, check_out)
+    
+    cache_key = availability_cache.key(ROOMS, check_in, check_out)
+    cached = availability_cache.get(cache_key)
+    if cached is not None:
+        return jsonify(cached), 200
+    
+    nights = (check_out - check_in).days
     available_rooms = []
     
-    for room in rooms:
-        is_available = True
-        current_date = check_in
-        
-        while current_date < check_out:
-            existing_bookings = BookingRoom.query.join(Booking).filter(
-                BookingRoom.room_id == room.id,
-                BookingRoom.check_in <= current_date,
-                BookingRoom.check_out > current_date,
-                Booking.status.in_([BookingStatus.CONFIRMED, BookingStatus.PENDING])
-            ).first()
-            
-            manual_block = RoomAvailability.query.filter_by(
-                room_id=room.id,
-                date=current_date,
-                is_available=False
-            ).first()
-            
-            if existing_bookings or manual_block:
-                is_available = False
-                break
-            
-            current_date += timedelta(days=1)
-        
-        if is_available:
-            nights = (check_out - check_in).days
-            room_data = room.serialize()
-            room_data['nights'] = nights
-            room_data['total_price'] = room.price_per_night * nights
-            available_rooms.append(room_data)
+    for room in load_available_rooms(check_in, check_out):
+        room_data = room.serialize()
+        room_data['nights'] = nights
+        room_data['total_price'] = from_cents(room.price_per_night_cents * nights)
+        available_rooms.append(room_data)
     
+    availability_cache.set(cache_key, available_rooms)
     return jsonify(available_rooms), 200
 
+
+MAX_PARTY_COMBINATIONS = 20
+
+def get_party_room_combinations(data, check_in, check_out):
+    """Combinaciones de habitaciones libres que alojan a todo el grupo, de menor a mayor precio"""
+    try:
+        guests = int(data['guests'])
+        limit = min(int(data.get('limit', 5)), MAX_PARTY_COMBINATIONS)
+    except (KeyError, ValueError, TypeError):
+        return jsonify({"error": "guests is required in party mode"}), 400
+    
+    if guests < 1 or limit < 1:
+        return jsonify({"error": "guests and limit must be positive"}), 400
+    
+    cache_key = availability_cache.key(ROOMS, check_in, check_out, (guests, limit))
+    cached = availability_cache.get(cache_key)
+    if cached is not None:
+        return jsonify(cached), 200
+    
+    nights = (check_out - check_in).days
+    combinations = rank_room_combinations(load_available_rooms(check_in, check_out), guests, nights, limit)
+    
+    result = {
+        "check_in": check_in.isoformat(),
+        "check_out": check_out.isoformat(),
+        "nights": nights,
+        "guests": guests,
+        "combinations": [{
+            "room_ids": [room.id for room in rooms],
+            "rooms": [{
+                "id": room.id,
+                "name": room.name,
+                "capacity": room.capacity,
+                "price_per_night": room.price_per_night
+            } for room in rooms],
+            "capacity": sum(room.capacity for room in rooms),
+            "total_price": from_cents(total_cents)
+        } for total_cents, rooms in combinations]
+    }
+    
+    availability_cache.set(cache_key, result)
+    return jsonify(result), 200
+
+
+MAX_FLEXIBLE_WINDOW_DAYS = 62
+
+@api.route('/rooms/flexible', methods=['POST'])
+def get_flexible_rooms():
+    """
+    Todas las estancias posibles dentro de una ventana de fechas
+    Body: {
+        "from": "2024-01-01",
+        "to": "2024-01-15",     (fecha de salida más tardía)
+        "min_nights": 3,
+        "max_nights": 5,        (opcional, por defecto min_nights)
+        "guests": 2             (opcional)
+    }
+    """
+    data = request.get_json()
+    
+    try:
+        start_date = datetime.strptime(data['from'], '%Y-%m-%d').date()
+        end_date = datetime.strptime(data['to'], '%Y-%m-%d').date()
+        min_nights = int(data.get('min_nights', 1))
+        max_nights = int(data.get('max_nights', min_nights))
+        guests = int(data.get('guests', 1))
+    except (KeyError, ValueError, TypeError):
+        return jsonify({"error": "Invalid date format or missing parameters"}), 400
+    
+    window = (end_date - start_date).days
+    if window < 1:
+        return jsonify({"error": "'to' must be after 'from'"}), 400
+    if window > MAX_FLEXIBLE_WINDOW_DAYS:
+        return jsonify({"error": f"Window cannot exceed {MAX_FLEXIBLE_WINDOW_DAYS} days"}), 400
+    if min_nights < 1 or max_nights < min_nights:
+        return jsonify({"error": "Invalid stay length"}), 400
+    
+    rooms = Room.query.filter(
+        Room.is_active.is_(True),
+        Room.capacity >= guests
+    ).order_by(Room.id).all()
+    stays = find_flexible_stays(rooms, start_date, end_date, min_nights, min(max_nights, window))
+    stays.sort(key=lambda stay: (stay[1], stay[2], stay[0].price_per_night, stay[0].id))
+    
+    return jsonify({
+        "from": start_date.isoformat(),
+        "to": end_date.isoformat(),
+        "rooms": {room.id: room.serialize() for room in rooms},
+        "stays": [{
+            "room_id": room.id,
+            "check_in": check_in.isoformat(),
+            "check_out": (check_in + timedelta(days=nights)).isoformat(),
+            "nights": nights,
+            "total_price": from_cents(room.price_per_night_cents * nights)
+        } for room, check_in, nights in stays]
+    }), 200
+
+@api.route('/rooms/calendar', methods=['GET'])
+def get_rooms_calendar():
+    """
+    Disponibilidad y precio por noche de varias habitaciones
+    Query params: ?from=2024-01-01&to=2024-01-31&room_ids=1,2
+    """
+    try:
+        start_date, end_date, room_ids = parse_calendar_args(request.args, 'room_ids')
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    query = Room.query.filter_by(is_active=True)
+    if room_ids:
+        query = query.filter(Room.id.in_(room_ids))
+    rooms = query.order_by(Room.id).all()
+    calendar = snapshot_room_calendar([room.id for room in rooms], start_date, end_date)
+    
+    return jsonify({
+        "from": start_date.isoformat(),
+        "to": end_date.isoformat(),
+        "rooms": [{
+            "room_id": room.id,
+            "name": room.name,
+            "capacity": room.capacity,
+            "available": calendar[room.id],
+            "price": [room.price_per_night if free else None for free in calendar[room.id]]
+        } for room in rooms]
+    }), 200
+
 # ============= EXTRAS =============
 @api.route('/extras', methods=['GET'])
 def get_extras():
-    extras = Extra.query.filter_by(is_active=True).all()
-    return jsonify([extra.serialize() for extra in extras]), 200
+    fields, expand = parse_shape_args(request.args)
+    
+    def build():
+        return [extra.serialize(fields, expand) for extra in Extra.query.filter_by(is_active=True).all()]
+    
+    return catalog_response(('extras',), ('extras',), build)
 
 # ============= PAQUETES =============
 @api.route('/packages', methods=['GET'])
 def get_packages():
-    packages = Package.query.filter_by(is_active=True).all()
-    return jsonify([package.serialize() for package in packages]), 200
+    fields, expand = parse_shape_args(request.args)
+    
+    def build():
+        packages = Package.query.options(
+            *Package.serialize_options(fields, expand)
+        ).filter_by(is_active=True).all()
+        return [package.serialize(fields, expand) for package in packages]
+    
+    return catalog_response(('packages',), PACKAGE_TABLES, build)
 
 @api.route('/packages/<int:package_id>', methods=['GET'])
 def get_package(package_id):
-    package = Package.query.get(package_id)
-    if not package:
+    fields, expand = parse_shape_args(request.args)
+    
+    def build():
+        package = Package.query.options(*Package.serialize_options(fields, expand)).get(package_id)
+        return package.serialize(fields, expand) if package else None
+    
+    response = catalog_response(('package', package_id), PACKAGE_TABLES, build)
+    if response is None:
         return jsonify({"error": "Package not found"}), 404
+    return response
+
+# ============= CATÁLOGO COMPLETO =============
+@api.route('/catalog', methods=['GET'])
+def get_catalog():
+    """
+    Experiencias, habitaciones, extras y paquetes activos en una sola
+    respuesta normalizada: los paquetes referencian habitación, experiencia
+    y extras por id. Solo datos de catálogo (sin disponibilidad), así que
+    se cachea como una unidad hasta que cambia alguna de sus tablas.
+    """
+    def build():
+        experiences = Experience.query.options(
+            *Experience.serialize_options()
+        ).filter_by(is_active=True).order_by(Experience.id).all()
+        rooms = Room.query.filter_by(is_active=True).order_by(Room.id).all()
+        extras = Extra.query.filter_by(is_active=True).order_by(Extra.id).all()
+        package_expand = {'included_extras': {}}
+        packages = Package.query.options(
+            *Package.serialize_options(expand=package_expand)
+        ).filter_by(is_active=True).order_by(Package.id).all()
+        
+        return {
+            "experiences": [experience.serialize() for experience in experiences],
+            "rooms": [room.serialize() for room in rooms],
+            "extras": [extra.serialize() for extra in extras],
+            "packages": [package.serialize(expand=package_expand) for package in packages]
+        }
     
-    return jsonify(package.serialize()), 200
+    return catalog_response(('catalog',), PACKAGE_TABLES, build)
+
 
 # ============= CARRITO DE COMPRAS =============
+# Los items viven en el CartStore (api.cart_store) hasta el checkout:
+# ninguna de estas rutas escribe en `bookings`.
+MAX_CART_BATCH_ITEMS = 50
+
 @api.route('/cart', methods=['POST'])
 @jwt_required()
 def add_to_cart():
     """Agregar item al carrito"""
     user_id = get_jwt_identity()
-    clean_expired_carts()
     
     data = request.get_json()
     
     try:
-        number_of_guests = int(data['number_of_guests'])
-        total_price = 0
-        
-        # Parsear fechas y horarios
-        experience_date = None
-        experience_time = None
-        if data.get('experience_date'):
-            experience_date = datetime.strptime(data['experience_date'], '%Y-%m-%d').date()
-            if data.get('experience_time'):
-                experience_time = datetime.strptime(data['experience_time'], '%H:%M').time()
-        
-        check_in = None
-        check_out = None
-        check_in_time = None
-        check_out_time = None
-        
-        if data.get('check_in') and data.get('check_out'):
-            check_in = datetime.strptime(data['check_in'], '%Y-%m-%d').date()
-            check_out = datetime.strptime(data['check_out'], '%Y-%m-%d').date()
-            
-            if data.get('check_in_time'):
-                check_in_time = datetime.strptime(data['check_in_time'], '%H:%M').time()
-            if data.get('check_out_time'):
-                check_out_time = datetime.strptime(data['check_out_time'], '%H:%M').time()
-        
-        # Validar experiencia
-        experience = None
-        if data.get('experience_id'):
-            experience = Experience.query.get(data['experience_id'])
-            if not experience or not experience.is_active:
-                return jsonify({"error": "Invalid experience"}), 400
-            total_price += experience.price * number_of_guests
-        
-        # Validar paquete
-        package = None
-        if data.get('package_id'):
-            package = Package.query.get(data['package_id'])
-            if not package or not package.is_active:
-                return jsonify({"error": "Invalid package"}), 400
-            total_price += package.price
-        
-        # Generar número de confirmación
-        confirmation_number = Booking.generate_confirmation_number()
-        
-        # Crear booking en carrito
-        booking = Booking(
-            user_id=user_id,
-            confirmation_number=confirmation_number,
-            experience_id=data.get('experience_id'),
-            package_id=data.get('package_id'),
-            experience_date=experience_date,
-            experience_time=experience_time,
-            check_in=check_in,
-            check_out=check_out,
-            check_in_time=check_in_time,
-            check_out_time=check_out_time,
-            number_of_guests=number_of_guests,
-            status=BookingStatus.CART,
-            payment_status=PaymentStatus.PENDING,
-            total_price=0,
-            special_requests=data.get('special_requests'),
-            cart_expires_at=datetime.utcnow() + timedelta(minutes=30)
-        )
-        
-        db.session.add(booking)
-        db.session.flush()
-        
-        # Agregar habitaciones
-        if data.get('rooms') and check_in and check_out:
-            nights = (check_out - check_in).days
-            
-            for room_data in data['rooms']:
-                room = Room.query.get(room_data['room_id'])
-                if not room or not room.is_active:
-                    db.session.rollback()
-                    return jsonify({"error": f"Invalid room {room_data['room_id']}"}), 400
-                
-                room_price = room.price_per_night * nights
-                total_price += room_price
-                
-                booking_room = BookingRoom(
-                    booking_id=booking.id,
-                    room_id=room.id,
-                    check_in=check_in,
-                    check_out=check_out,
-                    nights=nights,
-                    price=room_price
-                )
-                db.session.add(booking_room)
-        
-        # Agregar extras
-        if data.get('extras'):
-            for extra_data in data['extras']:
-                extra = Extra.query.get(extra_data['extra_id'])
-                if not extra or not extra.is_active:
-                    db.session.rollback()
-                    return jsonify({"error": f"Invalid extra {extra_data['extra_id']}"}), 400
-                
-                quantity = extra_data.get('quantity', 1)
-                
-                if extra.type == ExtraType.PER_BOOKING:
-                    extra_price = extra.price
-                else:
-                    extra_price = extra.price * number_of_guests * quantity
-                
-                total_price += extra_price
-                
-                booking_extra = BookingExtra(
-                    booking_id=booking.id,
-                    extra_id=extra.id,
-                    quantity=quantity,
-                    price=extra_price
-                )
-                db.session.add(booking_extra)
-        
-        booking.total_price = total_price
-        db.session.commit()
-        
-        return jsonify({
-            "message": "Item added to cart",
-            "booking": booking.serialize()
-        }), 201
-        
-    except Exception as e:
-        db.session.rollback()
-        return jsonify({"error": str(e)}), 500
+        item = build_cart_item(data)
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+    
+    get_cart_store().put(user_id, item)
+    
+    return jsonify({
+        "message": "Item added to cart",
+        "item": serialize_cart_item(item)
+    }), 201
 
-@api.route('/cart', methods=['GET'])
+@api.route('/cart/batch', methods=['POST'])
 @jwt_required()
-def get_cart():
+def add_to_cart_batch():
+    """
+    Agregar varios items al carrito de una vez
+    Body: {"items": [{...mismo formato que POST /cart...}, ...]}
+    Tarifica todos los items con el mismo snapshot de precios y guarda los
+    válidos juntos. Los items rechazados se devuelven en "errors" con su
+    posición en la lista.
+    """
     user_id = get_jwt_identity()
-    clean_expired_carts()
     
-    cart_items = Booking.query.filter_by(
-        user_id=user_id,
-        status=BookingStatus.CART
-    ).all()
+    data = request.get_json() or {}
+    entries = data.get('items')
+    
+    if not isinstance(entries, list) or not entries:
+        return jsonify({"error": "items must be a non-empty list"}), 400
+    
+    if len(entries) > MAX_CART_BATCH_ITEMS:
+        return jsonify({"error": f"A batch can contain at most {MAX_CART_BATCH_ITEMS} items"}), 400
+    
+    snapshot = price_book.snapshot()
+    items = []
+    errors = []
+    for index, entry in enumerate(entries):
+        try:
+            items.append(build_cart_item(entry, snapshot=snapshot))
+        except (KeyError, TypeError, ValueError) as e:
+            errors.append({"index": index, "error": str(e)})
+    
+    if not items:
+        return jsonify({"error": "No valid cart items", "errors": errors}), 400
+    
+    get_cart_store().put(user_id, *items)
     
-    return jsonify([item.serialize() for item in cart_items]), 200
+    return jsonify({
+        "message": f"{len(items)} items added to cart",
+        "items": [serialize_cart_item(item) for item in items],
+        "errors": errors
+    }), 201
 
-@api.route('/cart/<int:booking_id>', methods=['PUT'])
+@api.route('/cart', methods=['GET'])
 @jwt_required()
-def update_cart_item(booking_id):
+def get_cart():
     user_id = get_jwt_identity()
     
-    booking = Booking.query.filter_by(
-        id=booking_id,
-        user_id=user_id,
-        status=BookingStatus.CART
-    ).first()
+    # Con el snapshot de precios caliente no hace consultas
+    items = reprice_cart_items(get_cart_store().items(user_id))
+    return jsonify([serialize_cart_item(item) for item in items]), 200
+
+@api.route('/cart/<item_id>', methods=['PUT'])
+@jwt_required()
+def update_cart_item(item_id):
+    user_id = get_jwt_identity()
+    store = get_cart_store()
     
-    if not booking:
+    item = store.get(user_id, item_id)
+    if not item:
         return jsonify({"error": "Cart item not found"}), 404
     
     data = request.get_json()
     
+    changes = {key: data[key] for key in ('number_of_guests', 'special_requests', 'extras') if key in data}
     try:
-        if data.get('number_of_guests'):
-            booking.number_of_guests = int(data['number_of_guests'])
-        
-        if 'special_requests' in data:
-            booking.special_requests = data['special_requests']
-        
-        if data.get('extras'):
-            BookingExtra.query.filter_by(booking_id=booking.id).delete()
-            
-            total_price = 0
-            
-            if booking.experience:
-                total_price += booking.experience.price * booking.number_of_guests
-            
-            if booking.package:
-                total_price += booking.package.price
-            
-            for booking_room in booking.rooms:
-                total_price += booking_room.price
-            
-            for extra_data in data['extras']:
-                extra = Extra.query.get(extra_data['extra_id'])
-                if extra and extra.is_active:
-                    quantity = extra_data.get('quantity', 1)
-                    
-                    if extra.type == ExtraType.PER_BOOKING:
-                        extra_price = extra.price
-                    else:
-                        extra_price = extra.price * booking.number_of_guests * quantity
-                    
-                    total_price += extra_price
-                    
-                    booking_extra = BookingExtra(
-                        booking_id=booking.id,
-                        extra_id=extra.id,
-                        quantity=quantity,
-                        price=extra_price
-                    )
-                    db.session.add(booking_extra)
-            
-            booking.total_price = total_price
-        
-        booking.cart_expires_at = datetime.utcnow() + timedelta(minutes=30)
-        booking.updated_at = datetime.utcnow()
-        
-        db.session.commit()
-        
-        return jsonify({
-            "message": "Cart item updated",
-            "booking": booking.serialize()
-        }), 200
-        
-    except Exception as e:
-        db.session.rollback()
-        return jsonify({"error": str(e)}), 500
+        item = build_cart_item({**item, **changes}, item_id)
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+    
+    store.put(user_id, item)
+    
+    return jsonify({
+        "message": "Cart item updated",
+        "item": serialize_cart_item(item)
+    }), 200
 
-@api.route('/cart/<int:booking_id>', methods=['DELETE'])
+@api.route('/cart/<item_id>', methods=['DELETE'])
 @jwt_required()
-def remove_from_cart(booking_id):
+def remove_from_cart(item_id):
     user_id = get_jwt_identity()
     
-    booking = Booking.query.filter_by(
-        id=booking_id,
-        user_id=user_id,
-        status=BookingStatus.CART
-    ).first()
-    
-    if not booking:
+    if not get_cart_store().remove(user_id, item_id):
         return jsonify({"error": "Cart item not found"}), 404
     
-    db.session.delete(booking)
-    db.session.commit()
-    
     return jsonify({"message": "Item removed from cart"}), 200
 
 @api.route('/cart/clear', methods=['DELETE'])
@@ -751,15 +941,7 @@ def remove_from_cart(booking_id):
 def clear_cart():
     user_id = get_jwt_identity()
     
-    cart_items = Booking.query.filter_by(
-        user_id=user_id,
-        status=BookingStatus.CART
-    ).all()
-    
-    for item in cart_items:
-        db.session.delete(item)
-    
-    db.session.commit()
+    get_cart_store().clear(user_id)
     
     return jsonify({"message": "Cart cleared"}), 200
 
@@ -809,135 +991,45 @@ def guest_checkout():
             temp_password = None
             user_created = False
         
-        # Procesar booking (similar a add_to_cart pero directo a PENDING)
+        # Procesar booking (como un item del carrito pero directo a PENDING)
         booking_data = data.get('booking_data', {})
         
-        number_of_guests = int(booking_data['number_of_guests'])
-        total_price = 0
-        
-        # Parsear fechas
-        experience_date = None
-        experience_time = None
-        if booking_data.get('experience_date'):
-            experience_date = datetime.strptime(booking_data['experience_date'], '%Y-%m-%d').date()
-            if booking_data.get('experience_time'):
-                experience_time = datetime.strptime(booking_data['experience_time'], '%H:%M').time()
-        
-        check_in = None
-        check_out = None
-        check_in_time = None
-        check_out_time = None
-        
-        if booking_data.get('check_in') and booking_data.get('check_out'):
-            check_in = datetime.strptime(booking_data['check_in'], '%Y-%m-%d').date()
-            check_out = datetime.strptime(booking_data['check_out'], '%Y-%m-%d').date()
-            
-            if booking_data.get('check_in_time'):
-                check_in_time = datetime.strptime(booking_data['check_in_time'], '%H:%M').time()
-            if booking_data.get('check_out_time'):
-                check_out_time = datetime.strptime(booking_data['check_out_time'], '%H:%M').time()
-        
-        # Validar experiencia
-        experience = None
-        if booking_data.get('experience_id'):
-            experience = Experience.query.get(booking_data['experience_id'])
-            if not experience or not experience.is_active:
-                db.session.rollback()
-                return jsonify({"error": "Invalid experience"}), 400
-            total_price += experience.price * number_of_guests
-        
-        # Validar paquete
-        package = None
-        if booking_data.get('package_id'):
-            package = Package.query.get(booking_data['package_id'])
-            if not package or not package.is_active:
-                db.session.rollback()
-                return jsonify({"error": "Invalid package"}), 400
-            total_price += package.price
-        
-        confirmation_number = Booking.generate_confirmation_number()
-        
-        booking = Booking(
-            user_id=user.id,
-            confirmation_number=confirmation_number,
-            experience_id=booking_data.get('experience_id'),
-            package_id=booking_data.get('package_id'),
-            experience_date=experience_date,
-            experience_time=experience_time,
-            check_in=check_in,
-            check_out=check_out,
-            check_in_time=check_in_time,
-            check_out_time=check_out_time,
-            number_of_guests=number_of_guests,
-            status=BookingStatus.PENDING,
-            payment_status=PaymentStatus.PENDING,
-            total_price=0,
-            special_requests=booking_data.get('special_requests')
-        )
+        try:
+            item = build_cart_item(booking_data)
+            booking = materialize_cart_items(user.id, [item])[0]
+        except (KeyError, TypeError, ValueError) as e:
+            db.session.rollback()
+            return jsonify({"error": str(e)}), 400
         
         db.session.add(booking)
         db.session.flush()
         
-        # Agregar habitaciones
-        if booking_data.get('rooms') and check_in and check_out:
-            nights = (check_out - check_in).days
-            
-            for room_data in booking_data['rooms']:
-                room = Room.query.get(room_data['room_id'])
-                if not room or not room.is_active:
-                    db.session.rollback()
-                    return jsonify({"error": f"Invalid room {room_data['room_id']}"}), 400
-                
-                room_price = room.price_per_night * nights
-                total_price += room_price
-                
-                booking_room = BookingRoom(
-                    booking_id=booking.id,
-                    room_id=room.id,
-                    check_in=check_in,
-                    check_out=check_out,
-                    nights=nights,
-                    price=room_price
-                )
-                db.session.add(booking_room)
-        
-        # Agregar extras
-        if booking_data.get('extras'):
-            for extra_data in booking_data['extras']:
-                extra = Extra.query.get(extra_data['extra_id'])
-                if not extra or not extra.is_active:
-                    db.session.rollback()
-                    return jsonify({"error": f"Invalid extra {extra_data['extra_id']}"}), 400
-                
-                quantity = extra_data.get('quantity', 1)
-                
-                if extra.type == ExtraType.PER_BOOKING:
-                    extra_price = extra.price
-                else:
-                    extra_price = extra.price * number_of_guests * quantity
-                
-                total_price += extra_price
-                
-                booking_extra = BookingExtra(
-                    booking_id=booking.id,
-                    extra_id=extra.id,
-                    quantity=quantity,
-                    price=extra_price
-                )
-                db.session.add(booking_extra)
-        
-        booking.total_price = total_price
+        # Reservar y confirmar enseguida: los bloqueos de fila duran lo que
+        # tarda el commit, no la llamada a Stripe
+        hold_inventory(booking)
+        db.session.commit()
         
         # Crear Payment Intent
-        intent = stripe.PaymentIntent.create(
-            amount=int(total_price * 100),
-            currency='usd',
-            metadata={
-                'user_id': user.id,
-                'booking_ids': str(booking.id),
-                'is_guest': str(user_created)
-            }
-        )
+        try:
+            intent = stripe.PaymentIntent.create(
+                amount=booking.total_price_cents,
+                currency=booking.currency.lower(),
+                metadata={
+                    'user_id': user.id,
+                    'booking_ids': str(booking.id),
+                    'is_guest': str(user_created)
+                }
+            )
+        except Exception as e:
+            db.session.rollback()
+            # Liberar el inventario y borrar la reserva (y el usuario guest
+            # recién creado, para que un reintento reciba sus credenciales)
+            release_inventory(booking)
+            delete_bookings([booking.id])
+            if user_created:
+                User.query.filter_by(id=user.id).delete(synchronize_session=False)
+            db.session.commit()
+            return jsonify({"error": str(e)}), 500
         
         booking.stripe_payment_intent_id = intent.id
         booking.stripe_payment_status = intent.status
@@ -958,6 +1050,9 @@ def guest_checkout():
             "temporary_password": temp_password if user_created else None
         }), 200
         
+    except InventoryConflict as e:
+        db.session.rollback()
+        return jsonify({"error": e.message}), 400
     except Exception as e:
         db.session.rollback()
         return jsonify({"error": str(e)}), 500
@@ -966,66 +1061,60 @@ def guest_checkout():
 @api.route('/checkout', methods=['POST'])
 @jwt_required()
 def checkout():
-    """Procesar checkout - convierte items del carrito a PENDING"""
+    """Procesar checkout - convierte los items del carrito en reservas PENDING"""
     user_id = get_jwt_identity()
     data = request.get_json()
+    store = get_cart_store()
     
-    if not data.get('booking_ids'):
-        return jsonify({"error": "No booking IDs provided"}), 400
+    if not data.get('item_ids'):
+        return jsonify({"error": "No cart item IDs provided"}), 400
     
-    booking_ids = data['booking_ids']
-    
-    bookings = Booking.query.filter(
-        Booking.id.in_(booking_ids),
-        Booking.user_id == user_id,
-        Booking.status == BookingStatus.CART
-    ).all()
+    item_ids = set(data['item_ids'])
+    items = [item for item in store.items(user_id) if item['id'] in item_ids]
     
-    if not bookings:
+    if not items:
         return jsonify({"error": "No valid cart items found"}), 404
     
-    # Validar disponibilidad
-    for booking in bookings:
-        if booking.experience_id and booking.experience_date:
-            confirmed_bookings = Booking.query.filter(
-                Booking.experience_id == booking.experience_id,
-                Booking.experience_date == booking.experience_date,
-                Booking.status.in_([BookingStatus.CONFIRMED, BookingStatus.PENDING]),
-                Booking.id != booking.id
-            ).all()
-            
-            booked_spots = sum([b.number_of_guests for b in confirmed_bookings])
-            available_spots = booking.experience.max_capacity - booked_spots
-            
-            if available_spots < booking.number_of_guests:
-                return jsonify({
-                    "error": f"Experience '{booking.experience.name}' no longer has enough spots available"
-                }), 400
-        
-        for booking_room in booking.rooms:
-            current_date = booking_room.check_in
-            while current_date < booking_room.check_out:
-                existing = BookingRoom.query.join(Booking).filter(
-                    BookingRoom.room_id == booking_room.room_id,
-                    BookingRoom.check_in <= current_date,
-                    BookingRoom.check_out > current_date,
-                    Booking.status.in_([BookingStatus.CONFIRMED, BookingStatus.PENDING]),
-                    Booking.id != booking.id
-                ).first()
-                
-                if existing:
-                    return jsonify({
-                        "error": f"Room '{booking_room.room.name}' is no longer available for selected dates"
-                    }), 400
-                
-                current_date += timedelta(days=1)
+    try:
+        # Los items tasados con precios que ya cambiaron se vuelven a tasar
+        items = reprice_cart_items(items)
+        bookings = materialize_cart_items(user_id, items)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    # Validar disponibilidad de todo el carrito (una consulta por tipo de recurso)
+    conflicts = find_cart_conflicts(bookings, [item['id'] for item in items])
+    if conflicts:
+        return jsonify({
+            "error": conflicts[0]['message'],
+            "conflicts": conflicts
+        }), 400
     
-    total_amount = sum([b.total_price for b in bookings])
+    total_cents = sum(b.total_price_cents for b in bookings)
+    
+    # Insertar las reservas de una vez, reservar plazas y noches de forma
+    # atómica y confirmar enseguida: los bloqueos de fila duran lo que
+    # tarda el commit, no la llamada a Stripe
+    try:
+        db.session.add_all(bookings)
+        db.session.flush()
+        # Las reservas del carrito que aún no han ocupado plazas no cuentan
+        # al crear un contador que falta
+        batch_ids = [b.id for b in bookings]
+        for booking in bookings:
+            hold_inventory(booking, exclude_booking_ids=batch_ids)
+        db.session.commit()
+    except InventoryConflict as e:
+        db.session.rollback()
+        return jsonify({"error": e.message}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 500
     
     try:
         intent = stripe.PaymentIntent.create(
-            amount=int(total_amount * 100),
-            currency='usd',
+            amount=total_cents,
+            currency=bookings[0].currency.lower(),
             metadata={
                 'user_id': user_id,
                 'booking_ids': ','.join([str(b.id) for b in bookings])
@@ -1033,24 +1122,28 @@ def checkout():
         )
         
         for booking in bookings:
-            booking.status = BookingStatus.PENDING
             booking.payment_status = PaymentStatus.PROCESSING
             booking.stripe_payment_intent_id = intent.id
             booking.stripe_payment_status = intent.status
-            booking.cart_expires_at = None
         
         db.session.commit()
+        store.remove(user_id, *[item['id'] for item in items])
         
         return jsonify({
             "message": "Checkout initiated",
             "client_secret": intent.client_secret,
             "payment_intent_id": intent.id,
-            "total_amount": total_amount,
+            "total_amount": from_cents(total_cents),
             "bookings": [b.serialize() for b in bookings]
         }), 200
         
     except Exception as e:
         db.session.rollback()
+        # Los items siguen en el carrito: liberar el inventario y borrar las reservas
+        for booking in bookings:
+            release_inventory(booking)
+        delete_bookings([b.id for b in bookings])
+        db.session.commit()
         return jsonify({"error": str(e)}), 500
 
 # ============= WEBHOOK STRIPE CON ENVÍO DE EMAILS =============
@@ -1076,7 +1169,11 @@ def stripe_webhook():
             booking = Booking.query.get(int(booking_id))
             if booking:
                 booking.payment_status = PaymentStatus.SUCCEEDED
-                booking.status = BookingStatus.CONFIRMED
+                try:
+                    set_booking_status(booking, BookingStatus.CONFIRMED)
+                except InventoryConflict as e:
+                    # Pago recibido para una reserva que ya no tiene inventario
+                    print(f"Error confirming booking {booking.id}: {e.message}")
                 booking.stripe_payment_status = payment_intent['status']
                 
                 # ENVIAR EMAIL DE CONFIRMACIÓN
@@ -1130,44 +1227,67 @@ def search_booking_by_confirmation(confirmation_number):
 def get_booking(booking_id):
     user_id = get_jwt_identity()
     user = User.query.get(user_id)
+    fields, expand = parse_shape_args(request.args)
     
-    booking = Booking.query.get(booking_id)
+    booking = Booking.query.options(*Booking.serialize_options(fields, expand)).get(booking_id)
     if not booking:
         return jsonify({"error": "Booking not found"}), 404
     
     if booking.user_id != user_id and not user.is_admin():
         return jsonify({"error": "Unauthorized"}), 403
     
-    return jsonify(booking.serialize()), 200
+    return jsonify(booking.serialize(fields, expand)), 200
 
 @api.route('/bookings/my-bookings', methods=['GET'])
 @jwt_required()
 def get_my_bookings():
+    """
+    Resumen de las reservas del usuario, de la más reciente a la más antigua
+    Query params: ?limit=50&cursor=<next_cursor de la página anterior>
+                  &view=full (serialize() completo, admite &fields=&expand=)
+    """
     user_id = get_jwt_identity()
     
-    bookings = Booking.query.filter(
+    try:
+        cursor, limit = parse_page_args(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    if request.args.get('view') != 'full':
+        query = booking_summary_query().filter(
+            Booking.user_id == user_id,
+            Booking.status != BookingStatus.CART
+        )
+        rows, next_cursor = paginate_keyset(query, Booking, cursor, limit)
+        return jsonify({"bookings": summarize_bookings(rows), "next_cursor": next_cursor}), 200
+    
+    fields, expand = parse_shape_args(request.args)
+    query = Booking.query.options(*Booking.serialize_options(fields, expand)).filter(
         Booking.user_id == user_id,
         Booking.status != BookingStatus.CART
-    ).order_by(Booking.created_at.desc()).all()
+    )
+    bookings, next_cursor = paginate_keyset(query, Booking, cursor, limit)
     
-    return jsonify([booking.serialize() for booking in bookings]), 200
+    return jsonify({
+        "bookings": [booking.serialize(fields, expand) for booking in bookings],
+        "next_cursor": next_cursor
+    }), 200
 
 # ============= ADMIN ROUTES =============
-@api.route('/admin/bookings', methods=['GET'])
-@admin_required()
-def admin_get_all_bookings():
-    status = request.args.get('status')
-    payment_status = request.args.get('payment_status')
-    start_date = request.args.get('start_date')
-    end_date = request.args.get('end_date')
+def filter_admin_bookings(query, args):
+    """Filtros de ?status=&payment_status=&start_date=&end_date= sobre reservas (sin carritos)"""
+    status = args.get('status')
+    payment_status = args.get('payment_status')
+    start_date = args.get('start_date')
+    end_date = args.get('end_date')
     
-    query = Booking.query.filter(Booking.status != BookingStatus.CART)
+    query = query.filter(Booking.status != BookingStatus.CART)
     
     if status:
-        query = query.filter_by(status=BookingStatus[status.upper()])
+        query = query.filter(Booking.status == BookingStatus[status.upper()])
     
     if payment_status:
-        query = query.filter_by(payment_status=PaymentStatus[payment_status.upper()])
+        query = query.filter(Booking.payment_status == PaymentStatus[payment_status.upper()])
     
     if start_date:
         start = datetime.strptime(start_date, '%Y-%m-%d').date()
@@ -1177,9 +1297,61 @@ def admin_get_all_bookings():
         end = datetime.strptime(end_date, '%Y-%m-%d').date()
         query = query.filter(Booking.created_at <= end)
     
-    bookings = query.order_by(Booking.created_at.desc()).all()
+    return query
+
+@api.route('/admin/bookings', methods=['GET'])
+@admin_required()
+def admin_get_all_bookings():
+    """
+    Resumen de todas las reservas con filtros, de la más reciente a la más antigua
+    Query params: ?status=&payment_status=&start_date=&end_date=&limit=50&cursor=
+                  &view=full (serialize_admin() completo, admite &fields=&expand=)
+    """
+    try:
+        cursor, limit = parse_page_args(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     
-    return jsonify([booking.serialize_admin() for booking in bookings]), 200
+    if request.args.get('view') != 'full':
+        query = filter_admin_bookings(booking_summary_query(include_user=True), request.args)
+        rows, next_cursor = paginate_keyset(query, Booking, cursor, limit)
+        return jsonify({"bookings": summarize_bookings(rows), "next_cursor": next_cursor}), 200
+    
+    fields, expand = parse_shape_args(request.args)
+    query = Booking.query.options(*Booking.serialize_options(fields, expand))
+    query = filter_admin_bookings(query, request.args)
+    
+    bookings, next_cursor = paginate_keyset(query, Booking, cursor, limit)
+    
+    return jsonify({
+        "bookings": [booking.serialize_admin(fields, expand) for booking in bookings],
+        "next_cursor": next_cursor
+    }), 200
+
+@api.route('/admin/bookings/export', methods=['GET'])
+@admin_required()
+def admin_export_bookings():
+    """
+    Exportar reservas en streaming
+    Query params: ?format=csv|ndjson&status=&payment_status=&start_date=&end_date=
+    """
+    export_format = request.args.get('format', 'csv')
+    if export_format not in ('csv', 'ndjson'):
+        return jsonify({"error": "format must be csv or ndjson"}), 400
+    
+    query = filter_admin_bookings(export_query(), request.args)
+    filename = f"bookings-{datetime.utcnow().strftime('%Y%m%d%H%M%S')}.{export_format}"
+    
+    if export_format == 'csv':
+        body, mimetype = stream_csv(query), 'text/csv'
+    else:
+        body, mimetype = stream_ndjson(query), 'application/x-ndjson'
+    
+    return Response(
+        stream_with_context(body),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
 
 @api.route('/admin/bookings/<int:booking_id>', methods=['PUT'])
 @admin_required()
@@ -1191,7 +1363,11 @@ def admin_update_booking(booking_id):
     data = request.get_json()
     
     if data.get('status'):
-        booking.status = BookingStatus[data['status'].upper()]
+        try:
+            set_booking_status(booking, BookingStatus[data['status'].upper()])
+        except InventoryConflict as e:
+            db.session.rollback()
+            return jsonify({"error": e.message}), 400
     
     if data.get('payment_status'):
         booking.payment_status = PaymentStatus[data['payment_status'].upper()]
@@ -1213,7 +1389,8 @@ def admin_get_stats():
     confirmed_bookings = Booking.query.filter_by(status=BookingStatus.CONFIRMED).count()
     pending_bookings = Booking.query.filter_by(status=BookingStatus.PENDING).count()
     
-    total_revenue = db.session.query(func.sum(Booking.total_price)).filter(
+    # SUM entero y exacto sobre los céntimos
+    total_revenue_cents = db.session.query(func.sum(Booking.total_price_cents)).filter(
         Booking.payment_status == PaymentStatus.SUCCEEDED
     ).scalar() or 0
     
@@ -1221,7 +1398,17 @@ def admin_get_stats():
         "total_bookings": total_bookings,
         "confirmed_bookings": confirmed_bookings,
         "pending_bookings": pending_bookings,
-        "total_revenue": float(total_revenue)
+        "total_revenue": from_cents(int(total_revenue_cents))
+    }), 200
+
+@api.route('/admin/cache/stats', methods=['GET'])
+@admin_required()
+def admin_get_cache_stats():
+    """Contadores de aciertos y fallos de las cachés en memoria"""
+    return jsonify({
+        "availability": availability_cache.stats(),
+        "catalog": catalog_cache.stats(),
+        "pricing": price_book.stats()
     }), 200
 
 @api.route('/hello', methods=['POST', 'GET'])
@@ -1272,6 +1459,20 @@ stripe.api_key = os.getenv('STRIPE_SECRET_KEY')
 
 print(f"🔑 STRIPE KEY: {stripe.api_key[:20]}...")
 
+def checkout_line_item(item):
+    """Item del carrito del frontend ({type, id, guests, date|check_in/check_out, extras}) -> item tarificable"""
+    line_item = {
+        'number_of_guests': item['guests'],
+        'extras': [{'extra_id': extra['id']} for extra in item.get('extras') or []]
+    }
+    if item['type'] == 'experience':
+        line_item.update(experience_id=item['id'], experience_date=item.get('date'))
+    elif item['type'] == 'room':
+        line_item.update(rooms=[{'room_id': item['id']}], check_in=item['check_in'], check_out=item['check_out'])
+    else:
+        raise ValueError(f"Unknown item type {item['type']}")
+    return line_item
+
 @api.route('/create-checkout-session', methods=['POST', 'OPTIONS'])
 def create_checkout_session():
     # Manejar preflight request
@@ -1281,10 +1482,16 @@ def create_checkout_session():
     try:
         data = request.json
         
+        # Los importes los calcula el motor de precios, no el subtotal del cliente
+        try:
+            quote = price_line_items([checkout_line_item(item) for item in data['items']])
+        except (KeyError, TypeError, ValueError) as e:
+            return jsonify({'error': str(e)}), 400
+        
         # Crear line items para Stripe
         line_items = []
         
-        for item in data['items']:
+        for item, item_quote in zip(data['items'], quote['items']):
             line_items.append({
                 'price_data': {
                     'currency': 'eur',
@@ -1292,7 +1499,7 @@ def create_checkout_session():
                         'name': item['name'],
                         'description': f"{item['type'].capitalize()} - CaliaFarm Booking",
                     },
-                    'unit_amount': int(item['subtotal'] * 100),
+                    'unit_amount': item_quote['total_price_cents'],
                 },
                 'quantity': 1,
             })
@@ -1376,7 +1583,7 @@ def verify_payment():
             confirmation_number=confirmation_number,
             user_id=user.id,  # REQUERIDO según tu modelo
             number_of_guests=int(metadata.get('guests', 1)),
-            total_price=session.amount_total / 100,
+            total_price_cents=session.amount_total,
             payment_status=PaymentStatus.SUCCEEDED,
             stripe_payment_intent_id=session_id,  # Campo correcto
             stripe_payment_status='paid',
@@ -0,0 +1,232 @@
+# src/api/snapshots.py
+"""
+Disponibilidad precalculada para los próximos días.
+
+`flask precompute-availability` guarda en AvailabilitySnapshot, para cada
+habitación y experiencia activa y cada fecha del horizonte, la
+disponibilidad y la próxima fecha disponible. Los endpoints de lectura usan
+esas filas y solo calculan en vivo los recursos sin instantánea completa o
+marcados como obsoletos.
+
+Las filas de un recurso se marcan obsoletas en la misma transacción que
+cambia sus reservas, bloqueos o catálogo (antes del commit), así que nunca
+se sirve una instantánea desactualizada.
+"""
+from datetime import date, datetime, timedelta
+from sqlalchemy import event, insert, update
+from sqlalchemy.orm import Session, selectinload
+from api.models import db, Room, Experience, AvailabilitySnapshot
+from api.availability import build_room_calendar
+from api.capacity import build_capacity_matrix, expand_schedules
+from api.changes import pending_changes, RoomChange, ExperienceChange, CatalogChange
+
+ROOM = 'room'
+EXPERIENCE = 'experience'
+
+# Tipo de recurso cuyas filas quedan obsoletas al cambiar cada tabla de catálogo
+CATALOG_RESOURCES = {
+    'rooms': ROOM,
+    'experiences': EXPERIENCE,
+    'experience_schedules': EXPERIENCE
+}
+
+DEFAULT_HORIZON_DAYS = 90
+
+
+def _snapshot_rows(resource_type, resource_id, days, spots):
+    """Filas de un recurso con la próxima fecha disponible calculada hacia atrás"""
+    rows = []
+    next_available = None
+    computed_at = datetime.utcnow()
+    for day, available in reversed(list(zip(days, spots))):
+        if available:
+            next_available = day
+        rows.append({
+            'resource_type': resource_type,
+            'resource_id': resource_id,
+            'date': day,
+            'available_spots': available,
+            'next_available_date': next_available,
+            'is_stale': False,
+            'computed_at': computed_at
+        })
+    return rows
+
+
+def precompute_availability(horizon_days=DEFAULT_HORIZON_DAYS, start_date=None):
+    """
+    Regenerar la instantánea de [start_date, start_date + horizon_days).
+
+    Devuelve (filas de habitaciones, filas de experiencias).
+    """
+    start_date = start_date or date.today()
+    end_date = start_date + timedelta(days=horizon_days - 1)
+    days = [start_date + timedelta(days=i) for i in range(horizon_days)]
+
+    rooms = Room.query.filter_by(is_active=True).all()
+    calendar = build_room_calendar([room.id for room in rooms], start_date, end_date)
+    room_rows = []
+    for room_id, nights in calendar.items():
+        room_rows.extend(_snapshot_rows(ROOM, room_id, days, [int(free) for free in nights]))
+
+    experiences = Experience.query.options(
+        selectinload(Experience.schedules)
+    ).filter_by(is_active=True).all()
+    capacity = build_capacity_matrix(experiences, start_date, end_date)
+    experience_rows = []
+    for experience_id, row in capacity.items():
+        spots = [max(row[day][0], 0) if day in row else None for day in days]
+        experience_rows.extend(_snapshot_rows(EXPERIENCE, experience_id, days, spots))
+
+    db.session.query(AvailabilitySnapshot).delete(synchronize_session=False)
+    if room_rows or experience_rows:
+        db.session.execute(insert(AvailabilitySnapshot), room_rows + experience_rows)
+    db.session.commit()
+    return len(room_rows), len(experience_rows)
+
+
+def _fresh_snapshots(resource_type, resource_ids, start_date, end_date):
+    """
+    {resource_id: {fecha: plazas}} de los recursos con instantánea completa
+    y vigente para [start_date, end_date]. El resto se calcula en vivo.
+    """
+    if not resource_ids:
+        return {}
+
+    rows = db.session.query(
+        AvailabilitySnapshot.resource_id,
+        AvailabilitySnapshot.date,
+        AvailabilitySnapshot.available_spots,
+        AvailabilitySnapshot.is_stale
+    ).filter(
+        AvailabilitySnapshot.resource_type == resource_type,
+        AvailabilitySnapshot.resource_id.in_(resource_ids),
+        AvailabilitySnapshot.date >= start_date,
+        AvailabilitySnapshot.date <= end_date
+    ).all()
+
+    snapshots = {}
+    stale = set()
+    for resource_id, day, spots, is_stale in rows:
+        if is_stale:
+            stale.add(resource_id)
+        snapshots.setdefault(resource_id, {})[day] = spots
+
+    total_days = (end_date - start_date).days + 1
+    return {
+        resource_id: days for resource_id, days in snapshots.items()
+        if resource_id not in stale and len(days) == total_days
+    }
+
+
+def snapshot_room_calendar(room_ids, start_date, end_date):
+    """build_room_calendar() servido desde la instantánea cuando es posible"""
+    snapshots = _fresh_snapshots(ROOM, room_ids, start_date, end_date)
+    calendar = {
+        room_id: [bool(spots) for _, spots in sorted(snapshots[room_id].items())]
+        for room_id in room_ids if room_id in snapshots
+    }
+    missing = [room_id for room_id in room_ids if room_id not in snapshots]
+    if missing:
+        calendar.update(build_room_calendar(missing, start_date, end_date))
+    return calendar
+
+
+def snapshot_capacity_matrix(experiences, start_date, end_date):
+    """build_capacity_matrix() servido desde la instantánea cuando es posible"""
+    snapshots = _fresh_snapshots(EXPERIENCE, [e.id for e in experiences], start_date, end_date)
+
+    matrix = {}
+    for experience in experiences:
+        if experience.id not in snapshots:
+            continue
+        spots = snapshots[experience.id]
+        matrix[experience.id] = {
+            day: (spots[day], schedule)
+            for day, schedule in expand_schedules(experience.schedules, start_date, end_date).items()
+            if spots[day] is not None
+        }
+
+    missing = [e for e in experiences if e.id not in snapshots]
+    if missing:
+        matrix.update(build_capacity_matrix(missing, start_date, end_date))
+    return matrix
+
+
+def get_next_available_dates(resource_type, resource_ids, horizon_days=DEFAULT_HORIZON_DAYS):
+    """
+    {resource_id: próxima fecha disponible desde hoy (o None)}.
+
+    Una consulta a la instantánea; los recursos sin fila vigente para hoy se
+    calculan en vivo dentro del horizonte.
+    """
+    if not resource_ids:
+        return {}
+
+    today = date.today()
+    rows = db.session.query(
+        AvailabilitySnapshot.resource_id,
+        AvailabilitySnapshot.next_available_date
+    ).filter(
+        AvailabilitySnapshot.resource_type == resource_type,
+        AvailabilitySnapshot.resource_id.in_(resource_ids),
+        AvailabilitySnapshot.date == today,
+        AvailabilitySnapshot.is_stale.is_(False)
+    ).all()
+    result = dict(rows)
+
+    missing = [resource_id for resource_id in resource_ids if resource_id not in result]
+    if missing:
+        end_date = today + timedelta(days=horizon_days - 1)
+        if resource_type == ROOM:
+            for room_id, nights in build_room_calendar(missing, today, end_date).items():
+                result[room_id] = next(
+                    (today + timedelta(days=i) for i, free in enumerate(nights) if free), None
+                )
+        else:
+            experiences = Experience.query.options(
+                selectinload(Experience.schedules)
+            ).filter(Experience.id.in_(missing)).all()
+            for experience_id, row in build_capacity_matrix(experiences, today, end_date).items():
+                result[experience_id] = next(
+                    (day for day, (spots, _) in row.items() if spots > 0), None
+                )
+    return result
+
+
+def _stale_targets(changes):
+    """{tipo de recurso: ids afectados, o None si son todos}"""
+    targets = {}
+    for change in changes:
+        if isinstance(change, CatalogChange):
+            resource_type = CATALOG_RESOURCES.get(change.table)
+            if resource_type:
+                targets[resource_type] = None
+        elif isinstance(change, RoomChange):
+            if targets.get(ROOM, set()) is not None:
+                targets.setdefault(ROOM, set()).add(change.room_id)
+        elif isinstance(change, ExperienceChange):
+            if targets.get(EXPERIENCE, set()) is not None:
+                targets.setdefault(EXPERIENCE, set()).add(change.experience_id)
+    return targets
+
+
+def _mark_stale(session):
+    """Marcar obsoletas las filas de los recursos cambiados, dentro de la transacción"""
+    if session.in_nested_transaction():
+        return
+    session.flush()
+    for resource_type, resource_ids in _stale_targets(pending_changes(session)).items():
+        statement = update(AvailabilitySnapshot).where(
+            AvailabilitySnapshot.resource_type == resource_type,
+            AvailabilitySnapshot.is_stale.is_(False)
+        )
+        if resource_ids is not None:
+            statement = statement.where(AvailabilitySnapshot.resource_id.in_(resource_ids))
+        session.execute(
+            statement.values(is_stale=True),
+            execution_options={'synchronize_session': False}
+        )
+
+
+event.listen(Session, 'before_commit', _mark_stale)
@@ -0,0 +1,62 @@
+# src/api/summaries.py
+"""
+Resumen plano de reservas para los listados.
+
+Los listados no necesitan el árbol completo de Booking.serialize(): se
+leen solo las columnas del resumen (con los nombres de experiencia y
+paquete por JOIN) sin crear objetos ORM, y los nombres de habitaciones de
+la página en una segunda consulta. El detalle completo sigue en
+/bookings/<id>.
+"""
+from api.models import db, Booking, BookingRoom, User, Experience, Package, Room, from_cents
+
+SUMMARY_COLUMNS = (
+    Booking.id,
+    Booking.confirmation_number,
+    Booking.status,
+    Booking.payment_status,
+    Booking.experience_date,
+    Booking.check_in,
+    Booking.check_out,
+    Booking.number_of_guests,
+    Booking.total_price_cents,
+    Booking.currency,
+    Booking.created_at,
+    Booking.cart_expires_at,
+    Experience.name.label('experience_name'),
+    Package.name.label('package_name'),
+)
+
+
+def booking_summary_query(include_user=False):
+    """Proyección de columnas del resumen; se filtra y pagina como Booking.query"""
+    columns = SUMMARY_COLUMNS + ((User.email.label('user_email'),) if include_user else ())
+    query = db.session.query(*columns).select_from(Booking).outerjoin(
+        Experience, Booking.experience_id == Experience.id
+    ).outerjoin(
+        Package, Booking.package_id == Package.id
+    )
+    if include_user:
+        query = query.join(User, Booking.user_id == User.id)
+    return query
+
+
+def summarize_bookings(rows):
+    """Filas de booking_summary_query() -> lista de dicts con room_names"""
+    room_names = {}
+    if rows:
+        room_rows = db.session.query(BookingRoom.booking_id, Room.name).join(
+            Room, BookingRoom.room_id == Room.id
+        ).filter(
+            BookingRoom.booking_id.in_([row.id for row in rows])
+        ).order_by(BookingRoom.id).all()
+        for booking_id, name in room_rows:
+            room_names.setdefault(booking_id, []).append(name)
+
+    summaries = []
+    for row in rows:
+        summary = row._asdict()
+        summary['total_price'] = from_cents(summary.pop('total_price_cents'))
+        summary['room_names'] = room_names.get(row.id, [])
+        summaries.append(summary)
+    return summaries
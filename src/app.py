@@ -2,7 +2,7 @@
 This module takes care of starting the API Server, Loading the DB and Adding the endpoints
 """
 import os
-from flask import Flask, request, jsonify, url_for, send_from_directory
+from flask import Flask, request, jsonify, url_for
 from flask_migrate import Migrate
 from flask_swagger import swagger
 from flask_jwt_extended import JWTManager
@@ -13,12 +13,20 @@ from api.routes import api
 from api.admin import setup_admin
 from api.commands import setup_commands
 from api.email_service import init_mail
+from api.occupancy import init_room_index
+from api.cache import init_availability_cache
+from api.json_provider import FastJSONProvider
+from api.compression import init_compression, send_precompressed
+from api.carts import init_cart_reaper
+from api.cart_store import init_cart_store
+from api.pricing import init_pricing
 
 ENV = "development" if os.getenv("FLASK_DEBUG") == "1" else "production"
 static_file_dir = os.path.join(os.path.dirname(
     os.path.realpath(__file__)), '../dist/')
 app = Flask(__name__)
 app.url_map.strict_slashes = False
+app.json = FastJSONProvider(app)  # orjson si está instalado
 
 # 👇 CONFIGURAR CORS (AGREGAR ESTO AQUÍ)
 CORS(app, resources={
@@ -51,11 +59,45 @@ app.config['MAIL_USERNAME'] = os.getenv('MAIL_USERNAME')
 app.config['MAIL_PASSWORD'] = os.getenv('MAIL_PASSWORD')
 app.config['MAIL_DEFAULT_SENDER'] = os.getenv('MAIL_DEFAULT_SENDER', os.getenv('MAIL_USERNAME'))
 
+# ROOM AVAILABILITY INDEX (in-memory)
+app.config['ROOM_INDEX_HORIZON_DAYS'] = int(os.getenv('ROOM_INDEX_HORIZON_DAYS', 730))
+app.config['ROOM_INDEX_MAX_AGE'] = int(os.getenv('ROOM_INDEX_MAX_AGE', 300))
+
+# AVAILABILITY CACHE
+app.config['AVAILABILITY_CACHE_SIZE'] = int(os.getenv('AVAILABILITY_CACHE_SIZE', 1024))
+app.config['AVAILABILITY_CACHE_TTL'] = int(os.getenv('AVAILABILITY_CACHE_TTL', 60))
+app.config['CATALOG_CACHE_TTL'] = int(os.getenv('CATALOG_CACHE_TTL', 3600))
+
+# AVAILABILITY SNAPSHOT (flask precompute-availability)
+app.config['AVAILABILITY_SNAPSHOT_DAYS'] = int(os.getenv('AVAILABILITY_SNAPSHOT_DAYS', 90))
+
+# PRICE SNAPSHOT (precios de catálogo en memoria; api.pricing)
+app.config['PRICE_SNAPSHOT_TTL'] = int(os.getenv('PRICE_SNAPSHOT_TTL', 300))
+
+# CART STORE ('memory://' para un solo nodo, 'redis://...' para varios)
+app.config['CART_STORE_URL'] = os.getenv('CART_STORE_URL', 'memory://')
+app.config['CART_TTL'] = int(os.getenv('CART_TTL', 30 * 60))
+
+# CART REAPER (borra carritos caducados en segundo plano; 0 = desactivado)
+app.config['CART_REAPER_INTERVAL'] = int(os.getenv('CART_REAPER_INTERVAL', 60))
+app.config['CART_REAPER_BATCH_SIZE'] = int(os.getenv('CART_REAPER_BATCH_SIZE', 500))
+
+# RESPONSE COMPRESSION (gzip / brotli)
+app.config['COMPRESS_MIN_SIZE'] = int(os.getenv('COMPRESS_MIN_SIZE', 500))
+app.config['COMPRESS_LEVEL'] = int(os.getenv('COMPRESS_LEVEL', 6))
+app.config['COMPRESS_BR_LEVEL'] = int(os.getenv('COMPRESS_BR_LEVEL', 4))
+
 # Initialize extensions
 MIGRATE = Migrate(app, db, compare_type=True)
 db.init_app(app)
 jwt = JWTManager(app)
 init_mail(app)
+init_room_index(app)
+init_availability_cache(app)
+init_compression(app)
+init_pricing(app)
+init_cart_store(app)
+init_cart_reaper(app)
 
 # add the admin
 setup_admin(app)
@@ -76,14 +118,14 @@ def handle_invalid_usage(error):
 def sitemap():
     if ENV == "development":
         return generate_sitemap(app)
-    return send_from_directory(static_file_dir, 'index.html')
+    return send_precompressed(static_file_dir, 'index.html')
 
 # any other endpoint will try to serve it like a static file
 @app.route('/<path:path>', methods=['GET'])
 def serve_any_other_file(path):
     if not os.path.isfile(os.path.join(static_file_dir, path)):
         path = 'index.html'
-    response = send_from_directory(static_file_dir, path)
+    response = send_precompressed(static_file_dir, path)
     response.cache_control.max_age = 0  # avoid cache memory
     return response
 
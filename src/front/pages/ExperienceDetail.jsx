@@ -42,11 +42,19 @@ export const ExperienceDetail = () => {
     };
 
     const loadExtras = async () => {
+        // Los extras llegan con el catálogo; solo se pide si aún no está cargado
+        if (store.extras.length > 0) {
+            setExtras(store.extras);
+            return;
+        }
         try {
             const backendUrl = import.meta.env.VITE_BACKEND_URL;
-            const response = await fetch(`${backendUrl}/api/extras`);
+            const response = await fetch(`${backendUrl}/api/catalog`);
             const data = await response.json();
-            if (response.ok) setExtras(data);
+            if (response.ok) {
+                dispatch({ type: "set_catalog", payload: data });
+                setExtras(data.extras);
+            }
         } catch (error) {
             console.error("Error loading extras:", error);
         }
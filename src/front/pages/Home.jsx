@@ -16,18 +16,11 @@ export const Home = () => {
         try {
             const backendUrl = import.meta.env.VITE_BACKEND_URL;
             
-            // Cargar experiencias
-            const expResponse = await fetch(`${backendUrl}/api/experiences`);
-            const expData = await expResponse.json();
-            if (expResponse.ok) {
-                dispatch({ type: "set_experiences", payload: expData });
-            }
-
-            // Cargar habitaciones
-            const roomResponse = await fetch(`${backendUrl}/api/rooms`);
-            const roomData = await roomResponse.json();
-            if (roomResponse.ok) {
-                dispatch({ type: "set_rooms", payload: roomData });
+            // Cargar todo el catálogo en una sola petición
+            const response = await fetch(`${backendUrl}/api/catalog`);
+            const data = await response.json();
+            if (response.ok) {
+                dispatch({ type: "set_catalog", payload: data });
             }
 
             setLoading(false);
@@ -42,11 +42,19 @@ export const RoomDetail = () => {
     };
 
     const loadExtras = async () => {
+        // Los extras llegan con el catálogo; solo se pide si aún no está cargado
+        if (store.extras.length > 0) {
+            setExtras(store.extras);
+            return;
+        }
         try {
             const backendUrl = import.meta.env.VITE_BACKEND_URL;
-            const response = await fetch(`${backendUrl}/api/extras`);
+            const response = await fetch(`${backendUrl}/api/catalog`);
             const data = await response.json();
-            if (response.ok) setExtras(data);
+            if (response.ok) {
+                dispatch({ type: "set_catalog", payload: data });
+                setExtras(data.extras);
+            }
         } catch (error) {
             console.error("Error loading extras:", error);
         }
@@ -77,8 +85,9 @@ export const RoomDetail = () => {
         let total = room.price_per_night * nights;
         
         selectedExtras.forEach(extra => {
+            // Mismo cálculo que el backend: por huésped, una vez por estancia
             if (extra.type === 'per_guest') {
-                total += extra.price * room.capacity * nights;
+                total += extra.price * room.capacity;
             } else {
                 total += extra.price;
             }
@@ -283,7 +292,7 @@ export const RoomDetail = () => {
                                                     <span>{extra.name}</span>
                                                     <span className="text-muted">
                                                         €{extra.price}
-                                                        {extra.type === 'per_guest' && ' /person/night'}
+                                                        {extra.type === 'per_guest' && ' /person'}
                                                     </span>
                                                 </div>
                                             </label>
@@ -304,7 +313,7 @@ export const RoomDetail = () => {
                                             <span>{extra.name}</span>
                                             <span>
                                                 €{extra.type === 'per_guest' 
-                                                    ? (extra.price * room.capacity * nights).toFixed(2)
+                                                    ? (extra.price * room.capacity).toFixed(2)
                                                     : extra.price.toFixed(2)
                                                 }
                                             </span>
@@ -23,16 +23,13 @@ export const SearchResults = () => {
             const backendUrl = import.meta.env.VITE_BACKEND_URL;
             
             // Por ahora mostramos todo (luego implementaremos filtrado por disponibilidad)
-            const expResponse = await fetch(`${backendUrl}/api/experiences`);
-            const expData = await expResponse.json();
-            
-            const roomResponse = await fetch(`${backendUrl}/api/rooms`);
-            const roomData = await roomResponse.json();
+            const response = await fetch(`${backendUrl}/api/catalog`);
+            const data = await response.json();
 
-            if (expResponse.ok && roomResponse.ok) {
+            if (response.ok) {
                 setResults({
-                    experiences: expData,
-                    rooms: roomData
+                    experiences: data.experiences,
+                    rooms: data.rooms
                 });
             }
 
@@ -14,6 +14,7 @@ export const initialStore = () => {
         // Datos de la aplicación
         experiences: [],
         rooms: [],
+        extras: [],
         packages: [],
         
         // Reserva en proceso
@@ -44,6 +45,16 @@ export default function storeReducer(store, action = {}) {
                 rooms: action.payload
             };
 
+        // ============= CATÁLOGO COMPLETO (/api/catalog) =============
+        case 'set_catalog':
+            return {
+                ...store,
+                experiences: action.payload.experiences,
+                rooms: action.payload.rooms,
+                extras: action.payload.extras,
+                packages: action.payload.packages
+            };
+
         // ============= PAQUETES =============
         case 'set_packages':
             return {
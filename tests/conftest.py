@@ -0,0 +1,110 @@
+# tests/conftest.py
+"""
+Fixtures comunes: la app contra una base SQLite temporal, sembrada con
+api.seed antes de cada test, y las cachés en memoria vacías.
+"""
+import contextlib
+import io
+import os
+import sys
+import tempfile
+from types import SimpleNamespace
+
+import pytest
+import stripe
+
+_DB_DIR = tempfile.mkdtemp(prefix='react-booking-tests-')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_DB_DIR, 'test.db')}"
+os.environ.setdefault('STRIPE_SECRET_KEY', 'sk_test_dummy')
+os.environ['CART_REAPER_INTERVAL'] = '0'
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+with contextlib.redirect_stdout(io.StringIO()):
+    from app import app as flask_app  # noqa: E402
+
+from api.models import db, User, UserRole, Booking, BookingRoom, BookingStatus, PaymentStatus  # noqa: E402
+from api.seed import seed_database  # noqa: E402
+from api.cache import availability_cache, catalog_cache  # noqa: E402
+from api.occupancy import room_index  # noqa: E402
+from api.pricing import price_book  # noqa: E402
+from api.cart_store import init_cart_store  # noqa: E402
+from api.availability import ACTIVE_BOOKING_STATUSES  # noqa: E402
+from api.inventory import hold_inventory  # noqa: E402
+from flask_jwt_extended import create_access_token  # noqa: E402
+
+
+@pytest.fixture
+def app():
+    flask_app.config['TESTING'] = True
+    with flask_app.app_context():
+        db.drop_all()
+        db.create_all()
+        with contextlib.redirect_stdout(io.StringIO()):
+            seed_database()
+        availability_cache.clear()
+        catalog_cache.clear()
+        price_book.invalidate()
+        room_index.built_at = None
+        init_cart_store(flask_app)
+        yield flask_app
+        db.session.remove()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def user(app):
+    user = User(
+        email='guest@example.com', password='x', role=UserRole.USER,
+        is_active=True, email_verified=True, is_guest=False
+    )
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+@pytest.fixture
+def auth_headers(user):
+    return {'Authorization': f"Bearer {create_access_token(identity=str(user.id))}"}
+
+
+@pytest.fixture
+def make_booking(user):
+    """Crear una reserva (de experiencia y/o habitación) y ocupar su inventario si está activa"""
+    def make(status=BookingStatus.CONFIRMED, guests=2, experience_id=None, experience_date=None,
+             room_id=None, check_in=None, check_out=None):
+        booking = Booking(
+            user_id=user.id, confirmation_number=Booking.generate_confirmation_number(),
+            number_of_guests=guests, status=status, payment_status=PaymentStatus.PENDING,
+            total_price_cents=0, experience_id=experience_id, experience_date=experience_date,
+            check_in=check_in, check_out=check_out
+        )
+        db.session.add(booking)
+        db.session.flush()
+        if room_id:
+            db.session.add(BookingRoom(
+                booking_id=booking.id, room_id=room_id, check_in=check_in, check_out=check_out,
+                nights=(check_out - check_in).days, price_cents=0
+            ))
+            db.session.flush()
+        if status in ACTIVE_BOOKING_STATUSES:
+            hold_inventory(booking)
+        db.session.commit()
+        return booking
+    return make
+
+
+@pytest.fixture
+def payment_intents(monkeypatch):
+    """Sustituir stripe.PaymentIntent.create; devuelve los argumentos de cada llamada"""
+    created = []
+
+    def create(**kwargs):
+        created.append(kwargs)
+        return SimpleNamespace(id=f"pi_test_{len(created)}", status='requires_payment_method', client_secret='secret')
+
+    monkeypatch.setattr(stripe.PaymentIntent, 'create', create)
+    return created
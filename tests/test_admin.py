@@ -0,0 +1,93 @@
+# tests/test_admin.py
+from datetime import date, timedelta
+
+import pytest
+
+from api.admin import BookingView
+from api.models import db, Booking, BookingStatus, PaymentStatus, Room, RoomNight, ExperienceAvailability
+
+
+class FakeForm:
+    """Formulario mínimo: populate_obj copia los campos como hace WTForms"""
+
+    def __init__(self, **fields):
+        self.fields = fields
+
+    def populate_obj(self, obj):
+        for name, value in self.fields.items():
+            setattr(obj, name, value)
+
+
+@pytest.fixture
+def booking_view(app):
+    # Los errores de validación se muestran con flash(): hace falta una petición
+    with app.test_request_context():
+        yield next(view for view in app.extensions['admin'][0]._views if isinstance(view, BookingView))
+
+
+def _nights(booking_id):
+    return RoomNight.query.filter_by(booking_id=booking_id).count()
+
+
+def test_cancelling_releases_room_nights(booking_view, make_booking):
+    check_in = date.today() + timedelta(days=10)
+    booking = make_booking(room_id=1, check_in=check_in, check_out=check_in + timedelta(days=3))
+    assert _nights(booking.id) == 3
+
+    assert booking_view.update_model(FakeForm(status=BookingStatus.CANCELLED), booking)
+    assert db.session.get(Booking, booking.id).status == BookingStatus.CANCELLED
+    assert _nights(booking.id) == 0
+
+
+def test_reactivating_over_a_taken_room_is_rejected(booking_view, make_booking):
+    check_in = date.today() + timedelta(days=10)
+    check_out = check_in + timedelta(days=2)
+    cancelled = make_booking(status=BookingStatus.CANCELLED, room_id=1, check_in=check_in, check_out=check_out)
+    make_booking(room_id=1, check_in=check_in + timedelta(days=1), check_out=check_out + timedelta(days=1))
+
+    assert not booking_view.update_model(FakeForm(status=BookingStatus.CONFIRMED), cancelled)
+    assert db.session.get(Booking, cancelled.id).status == BookingStatus.CANCELLED
+    assert _nights(cancelled.id) == 0
+
+
+def test_create_and_delete_hold_and_release_spots(booking_view, user):
+    day = date.today() + timedelta(days=4)
+    form = FakeForm(
+        user_id=user.id, confirmation_number='BKADMIN0001', number_of_guests=3,
+        status=BookingStatus.CONFIRMED, payment_status=PaymentStatus.SUCCEEDED,
+        total_price_cents=0, experience_id=1, experience_date=day
+    )
+    booking = booking_view.create_model(form)
+    assert booking and booking.status == BookingStatus.CONFIRMED
+    counter = ExperienceAvailability.query.filter_by(experience_id=1, date=day).one()
+    assert counter.available_spots == 5
+
+    assert booking_view.delete_model(booking)
+    db.session.refresh(counter)
+    assert counter.available_spots == 8
+
+
+def _room_form(**fields):
+    return {
+        'name': 'Limone', 'capacity': '2', 'check_in_time': '15:00', 'check_out_time': '11:00',
+        'is_active': 'y', **fields
+    }
+
+
+def test_room_form_takes_the_price_in_euros(client):
+    response = client.get('/admin/room/new/')
+    assert b'name="price_per_night"' in response.data
+    assert b'name="price_per_night_cents"' not in response.data
+
+    client.post('/admin/room/new/', data=_room_form(price_per_night='149.90'))
+    room = Room.query.filter_by(name='Limone').one()
+    assert room.price_per_night_cents == 14990
+
+    response = client.get(f'/admin/room/edit/?id={room.id}')
+    assert b'value="149.90"' in response.data
+
+
+def test_room_form_requires_a_price(client):
+    response = client.post('/admin/room/new/', data=_room_form())
+    assert response.status_code == 200
+    assert Room.query.filter_by(name='Limone').count() == 0
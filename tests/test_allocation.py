@@ -0,0 +1,80 @@
+# tests/test_allocation.py
+import itertools
+import random
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+from api.allocation import rank_room_combinations
+
+
+def _rooms(*specs):
+    return [
+        SimpleNamespace(id=index + 1, capacity=capacity, price_per_night_cents=price)
+        for index, (capacity, price) in enumerate(specs)
+    ]
+
+
+def _brute_force(rooms, guests, nights, limit):
+    """Todas las combinaciones mínimas por fuerza bruta, ordenadas como rank_room_combinations"""
+    ranked = []
+    for size in range(1, len(rooms) + 1):
+        for chosen in itertools.combinations(rooms, size):
+            capacities = [room.capacity for room in chosen]
+            if sum(capacities) >= guests and sum(capacities) - min(capacities) < guests:
+                ranked.append((sum(room.price_per_night_cents for room in chosen) * nights, size))
+    return sorted(ranked)[:limit]
+
+
+def test_cheapest_combinations_first():
+    rooms = _rooms((2, 15000), (2, 10000), (2, 10000), (3, 14000))
+    ranked = rank_room_combinations(rooms, guests=5, nights=2, limit=3)
+
+    assert [(cost, [room.id for room in chosen]) for cost, chosen in ranked] == [
+        (48000, [2, 4]),
+        (48000, [3, 4]),
+        (58000, [1, 4]),
+    ]
+
+
+def test_no_redundant_rooms():
+    rooms = _rooms((4, 1000), (1, 1), (1, 1))
+    ranked = rank_room_combinations(rooms, guests=4, nights=1, limit=5)
+    assert [[room.id for room in chosen] for _, chosen in ranked] == [[1]]
+
+
+def test_group_that_does_not_fit():
+    assert rank_room_combinations(_rooms((2, 100), (2, 100)), guests=5, nights=1) == []
+    assert rank_room_combinations(_rooms((2, 100)), guests=0, nights=1) == []
+
+
+def test_matches_brute_force():
+    rng = random.Random(7)
+    for _ in range(50):
+        rooms = _rooms(*[(rng.randint(1, 4), rng.choice((8000, 10000, 12000, 15000))) for _ in range(rng.randint(1, 8))])
+        guests = rng.randint(1, 10)
+        ranked = rank_room_combinations(rooms, guests, nights=2, limit=5)
+        assert [(cost, len(chosen)) for cost, chosen in ranked] == _brute_force(rooms, guests, 2, 5)
+
+
+def test_party_mode_skips_booked_rooms(client, make_booking):
+    check_in = date.today() + timedelta(days=20)
+    check_out = check_in + timedelta(days=2)
+    make_booking(room_id=2, check_in=check_in, check_out=check_out)
+
+    response = client.post('/api/rooms/available', json={
+        'check_in': check_in.isoformat(), 'check_out': check_out.isoformat(), 'mode': 'party', 'guests': 5
+    })
+    assert response.status_code == 200
+    combinations = response.get_json()['combinations']
+    assert combinations[0] == {
+        'room_ids': [3, 4], 'rooms': combinations[0]['rooms'], 'capacity': 5, 'total_price': 480.0
+    }
+    assert all(2 not in combination['room_ids'] for combination in combinations)
+
+
+def test_party_mode_requires_guests(client):
+    check_in = date.today() + timedelta(days=20)
+    response = client.post('/api/rooms/available', json={
+        'check_in': check_in.isoformat(), 'check_out': (check_in + timedelta(days=1)).isoformat(), 'mode': 'party'
+    })
+    assert response.status_code == 400
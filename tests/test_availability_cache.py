@@ -0,0 +1,65 @@
+# tests/test_availability_cache.py
+from datetime import date, timedelta
+
+from api.models import db, Booking, BookingStatus, PaymentStatus
+from api.cache import availability_cache, EXPERIENCES
+from api.changes import subscribe, _subscribers
+from api.inventory import hold_inventory
+
+
+def _available_spots(client, day, experience_id=1):
+    response = client.post('/api/experiences/available', json={
+        'start_date': day.isoformat(), 'end_date': day.isoformat(), 'guests': 1
+    })
+    assert response.status_code == 200
+    for experience in response.get_json():
+        if experience['id'] == experience_id:
+            return experience['available_dates'][0]['available_spots']
+    return 0
+
+
+def _pending_booking(user, day, guests):
+    booking = Booking(
+        user_id=user.id, confirmation_number=Booking.generate_confirmation_number(),
+        number_of_guests=guests, status=BookingStatus.PENDING,
+        payment_status=PaymentStatus.PENDING, total_price_cents=0,
+        experience_id=1, experience_date=day
+    )
+    db.session.add(booking)
+    db.session.flush()
+    return booking
+
+
+def test_cache_is_invalidated_only_after_outer_commit(client, user):
+    day = date.today() + timedelta(days=5)
+    assert _available_spots(client, day) == 8
+    key = availability_cache.key(EXPERIENCES, day, day, 1)
+    assert availability_cache.get(key) is not None
+
+    dispatched = []
+    callback = subscribe(dispatched.append)
+    try:
+        # hold_inventory usa savepoints: liberarlos no debe publicar nada
+        hold_inventory(_pending_booking(user, day, 3))
+        assert dispatched == []
+        assert availability_cache.get(key) is not None
+
+        db.session.commit()
+        assert len(dispatched) == 1
+    finally:
+        _subscribers.remove(callback)
+
+    assert availability_cache.get(key) is None
+    assert _available_spots(client, day) == 5
+
+
+def test_rollback_after_savepoint_discards_changes(client, user):
+    day = date.today() + timedelta(days=6)
+    assert _available_spots(client, day) == 8
+    key = availability_cache.key(EXPERIENCES, day, day, 1)
+
+    hold_inventory(_pending_booking(user, day, 2))
+    db.session.rollback()
+
+    assert availability_cache.get(key) is not None
+    assert _available_spots(client, day) == 8
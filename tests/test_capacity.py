@@ -0,0 +1,68 @@
+# tests/test_capacity.py
+from datetime import date, timedelta
+
+import pytest
+
+from api.models import db, BookingStatus, Experience, ExperienceAvailability
+from api.capacity import build_capacity_matrix, rebuild_counters, reserve_spots
+from api.inventory import hold_inventory, release_inventory, InventoryConflict
+
+DAY = date.today() + timedelta(days=4)
+
+
+def _spots(experience_id=1, day=DAY):
+    counter = ExperienceAvailability.query.filter_by(experience_id=experience_id, date=day).one_or_none()
+    return counter.available_spots if counter else None
+
+
+def test_hold_and_release_round_trip(make_booking):
+    booking = make_booking(guests=3, experience_id=1, experience_date=DAY)
+    assert _spots() == 5
+
+    release_inventory(booking)
+    db.session.commit()
+    assert _spots() == 8
+
+    hold_inventory(booking)
+    db.session.commit()
+    assert _spots() == 5
+
+
+def test_hold_without_spots_is_rejected(make_booking):
+    make_booking(guests=6, experience_id=1, experience_date=DAY)
+
+    with pytest.raises(InventoryConflict):
+        make_booking(guests=3, experience_id=1, experience_date=DAY)
+    db.session.rollback()
+    assert _spots() == 2
+
+
+def test_reserve_spots_is_conditional(app):
+    experience = db.session.get(Experience, 1)
+    assert reserve_spots(experience, DAY, 8)
+    assert not reserve_spots(experience, DAY, 1)
+    assert _spots() == 0
+
+
+def test_missing_counter_reads_as_max_capacity(make_booking):
+    make_booking(guests=3, experience_id=1, experience_date=DAY)
+    experience = db.session.get(Experience, 1)
+
+    matrix = build_capacity_matrix([experience], DAY, DAY + timedelta(days=1))
+    assert matrix[1][DAY][0] == 5
+    assert matrix[1][DAY + timedelta(days=1)][0] == 8
+
+
+def test_rebuild_counters_from_bookings(make_booking):
+    make_booking(guests=3, experience_id=1, experience_date=DAY)
+    make_booking(status=BookingStatus.CANCELLED, guests=4, experience_id=1, experience_date=DAY)
+    ExperienceAvailability.query.delete()
+    db.session.commit()
+
+    assert rebuild_counters() == 1
+    assert _spots() == 5
+
+    ExperienceAvailability.query.update({'available_spots': 0})
+    db.session.commit()
+    rebuild_counters(start_date=DAY)
+    assert _spots() == 5
@@ -0,0 +1,27 @@
+# tests/test_cart.py
+from datetime import date, timedelta
+
+import pytest
+
+
+def _room_item(**fields):
+    check_in = date.today() + timedelta(days=7)
+    return {
+        'rooms': [{'room_id': 1}], 'check_in': check_in.isoformat(),
+        'check_out': (check_in + timedelta(days=2)).isoformat(), 'number_of_guests': 2, **fields
+    }
+
+
+@pytest.mark.parametrize('fields', [{'rooms': 5}, {'extras': 5}, {'extras': [{'extra_id': 1, 'quantity': []}]}])
+def test_add_to_cart_rejects_malformed_items(client, auth_headers, fields):
+    response = client.post('/api/cart', json=_room_item(**fields), headers=auth_headers)
+    assert response.status_code == 400
+    assert client.get('/api/cart', headers=auth_headers).get_json() == []
+
+
+def test_update_cart_item_rejects_malformed_extras(client, auth_headers):
+    item = client.post('/api/cart', json=_room_item(), headers=auth_headers).get_json()['item']
+
+    response = client.put(f"/api/cart/{item['id']}", json={'extras': 5}, headers=auth_headers)
+    assert response.status_code == 400
+    assert client.get('/api/cart', headers=auth_headers).get_json()[0]['extras'] == []
@@ -0,0 +1,84 @@
+# tests/test_cart_reaper.py
+from datetime import datetime, timedelta
+
+import pytest
+
+from api import carts
+from api.models import db, Booking, BookingStatus
+from api.carts import reap_expired_carts, CartReaper, init_cart_reaper
+from api.cart_store import get_cart_store
+
+NOW = datetime(2026, 3, 1, 12, 0, 0)
+
+
+@pytest.fixture
+def make_cart(make_booking):
+    def make(expires_in, now=NOW):
+        booking = make_booking(status=BookingStatus.CART)
+        booking.cart_expires_at = now + expires_in
+        db.session.commit()
+        return booking.id
+    return make
+
+
+def _remaining():
+    return {booking_id for (booking_id,) in db.session.query(Booking.id).filter_by(status=BookingStatus.CART)}
+
+
+def test_reaps_only_expired_carts(app, make_cart, make_booking):
+    expired = [make_cart(timedelta(minutes=-i)) for i in range(1, 4)]
+    live = make_cart(timedelta(minutes=5))
+    confirmed = make_booking().id
+
+    assert reap_expired_carts(now=NOW) == len(expired)
+    assert _remaining() == {live}
+    assert db.session.get(Booking, confirmed) is not None
+
+
+def test_reaps_in_batches(app, monkeypatch, make_cart):
+    for i in range(1, 6):
+        make_cart(timedelta(minutes=-i))
+    batches = []
+    delete_bookings = carts.delete_bookings
+    monkeypatch.setattr(carts, 'delete_bookings', lambda ids: batches.append(len(ids)) or delete_bookings(ids))
+
+    assert reap_expired_carts(batch_size=2, now=NOW) == 5
+    assert batches == [2, 2, 1]
+    assert _remaining() == set()
+    assert reap_expired_carts(batch_size=2, now=NOW) == 0
+
+
+class _Stop(Exception):
+    pass
+
+
+def test_reaper_cycle(app, monkeypatch, make_cart):
+    expired = make_cart(timedelta(minutes=-1), now=datetime.utcnow())
+    purged = []
+    monkeypatch.setattr(type(get_cart_store()), 'purge', lambda store: purged.append(store) or 0)
+
+    def stop(seconds):
+        raise _Stop(seconds)
+    monkeypatch.setattr(carts._time, 'sleep', stop)
+
+    # Una vuelta del bucle del hilo, en este mismo hilo
+    with pytest.raises(_Stop):
+        CartReaper(app, interval=30)._run()
+
+    assert expired not in _remaining()
+    assert len(purged) == 1
+
+
+def test_reaper_start_is_idempotent(app, monkeypatch):
+    runs = []
+    monkeypatch.setattr(CartReaper, '_run', lambda reaper: runs.append(reaper))
+    reaper = CartReaper(app)
+    reaper.start()
+    reaper.start()
+    reaper._thread.join(timeout=5)
+    assert len(runs) == 1
+
+
+def test_interval_zero_disables_reaper(app, monkeypatch):
+    monkeypatch.setitem(app.config, 'CART_REAPER_INTERVAL', 0)
+    assert init_cart_reaper(app) is None
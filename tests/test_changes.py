@@ -0,0 +1,40 @@
+# tests/test_changes.py
+from datetime import date, timedelta
+
+import pytest
+
+from api.models import db, Booking, BookingRoom, BookingStatus, PaymentStatus, Room, Experience
+from api.changes import subscribe, _subscribers, CatalogChange, RoomChange
+
+
+@pytest.fixture
+def published():
+    changes = []
+    callback = subscribe(changes.extend)
+    yield changes
+    _subscribers.remove(callback)
+
+
+def test_booking_through_relationships_is_not_a_catalog_change(user, published):
+    check_in = date.today() + timedelta(days=3)
+    booking = Booking(
+        user_id=user.id, confirmation_number='BKCHANGES001', number_of_guests=2,
+        status=BookingStatus.PENDING, payment_status=PaymentStatus.PENDING, total_price_cents=0,
+        experience=db.session.get(Experience, 1), experience_date=check_in
+    )
+    booking.rooms.append(BookingRoom(
+        room=db.session.get(Room, 1), check_in=check_in, check_out=check_in + timedelta(days=1),
+        nights=1, price_cents=0
+    ))
+    db.session.add(booking)
+    db.session.commit()
+
+    assert RoomChange(1, check_in, check_in + timedelta(days=1)) in published
+    assert not any(isinstance(change, CatalogChange) for change in published)
+
+
+def test_column_edit_is_a_catalog_change(app, published):
+    db.session.get(Room, 1).price_per_night_cents += 100
+    db.session.commit()
+
+    assert CatalogChange('rooms') in published
@@ -0,0 +1,109 @@
+# tests/test_checkout.py
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+import pytest
+import sqlalchemy as sa
+import stripe
+
+from api.models import db, Booking, ExperienceAvailability, PaymentStatus, User
+from api.cache import availability_cache, EXPERIENCES
+from api.occupancy import room_index
+
+DAY = date.today() + timedelta(days=4)
+
+
+def _add_items(client, auth_headers, *items):
+    response = client.post('/api/cart/batch', json={'items': list(items)}, headers=auth_headers)
+    assert response.status_code == 201, response.get_json()
+    return [item['id'] for item in response.get_json()['items']]
+
+
+def _spots(experience_id=1, day=DAY):
+    return ExperienceAvailability.query.filter_by(experience_id=experience_id, date=day).one().available_spots
+
+
+@pytest.mark.parametrize('guests, left', [((2, 2), 4), ((3, 3), 2), ((4, 4), 0)])
+def test_items_for_the_same_experience_and_date_count_once(client, auth_headers, payment_intents, guests, left):
+    item_ids = _add_items(client, auth_headers, *[
+        {'experience_id': 1, 'experience_date': DAY.isoformat(), 'number_of_guests': n} for n in guests
+    ])
+
+    response = client.post('/api/checkout', json={'item_ids': item_ids}, headers=auth_headers)
+    assert response.status_code == 200, response.get_json()
+    assert _spots() == left
+
+
+def test_cart_over_capacity_is_rejected(client, auth_headers, payment_intents):
+    item_ids = _add_items(client, auth_headers, *[
+        {'experience_id': 1, 'experience_date': DAY.isoformat(), 'number_of_guests': 5} for _ in range(2)
+    ])
+
+    response = client.post('/api/checkout', json={'item_ids': item_ids}, headers=auth_headers)
+    assert response.status_code == 400
+    assert payment_intents == []
+
+
+def _guest_checkout(client, guests=3):
+    return client.post('/api/guest-checkout', json={
+        'email': 'new.guest@example.com', 'name': 'New Guest',
+        'booking_data': {'experience_id': 1, 'experience_date': DAY.isoformat(), 'number_of_guests': guests}
+    })
+
+
+def test_guest_checkout_commits_the_hold_before_calling_stripe(client, monkeypatch):
+    seen = []
+
+    def create(**kwargs):
+        # Otra conexión ya ve las plazas ocupadas: no hay bloqueos abiertos
+        with db.engine.connect() as connection:
+            seen.append(connection.execute(sa.text(
+                "SELECT available_spots FROM experience_availability WHERE experience_id = 1"
+            )).scalar())
+        return SimpleNamespace(id='pi_guest', status='requires_payment_method', client_secret='secret')
+
+    monkeypatch.setattr(stripe.PaymentIntent, 'create', create)
+    response = _guest_checkout(client)
+    assert response.status_code == 200, response.get_json()
+    assert seen == [5]
+    assert Booking.query.one().payment_status == PaymentStatus.PROCESSING
+
+
+def test_guest_checkout_releases_inventory_when_stripe_fails(client, monkeypatch):
+    def create(**kwargs):
+        raise stripe.StripeError('card network down')
+
+    monkeypatch.setattr(stripe.PaymentIntent, 'create', create)
+    response = _guest_checkout(client)
+    assert response.status_code == 500
+    assert _spots() == 8
+    assert Booking.query.count() == 0
+    assert User.query.filter_by(email='new.guest@example.com').count() == 0
+
+
+def test_failed_payment_republishes_released_inventory(client, auth_headers, monkeypatch):
+    check_in = DAY + timedelta(days=3)
+    check_out = check_in + timedelta(days=2)
+    cache_key = availability_cache.key(EXPERIENCES, DAY, DAY, 1)
+    busy = []
+
+    def create(**kwargs):
+        # Un lector concurrente ve la reserva ya confirmada y la guarda en caché
+        busy.append(room_index.busy_room_ids(check_in, check_out))
+        availability_cache.set(cache_key, [])
+        raise stripe.StripeError('card network down')
+
+    monkeypatch.setattr(stripe.PaymentIntent, 'create', create)
+    item_ids = _add_items(
+        client, auth_headers,
+        {'experience_id': 1, 'experience_date': DAY.isoformat(), 'number_of_guests': 2},
+        {'rooms': [{'room_id': 3}], 'check_in': check_in.isoformat(), 'check_out': check_out.isoformat(),
+         'number_of_guests': 2}
+    )
+    response = client.post('/api/checkout', json={'item_ids': item_ids}, headers=auth_headers)
+    assert response.status_code == 500
+
+    assert busy == [{3}]
+    assert room_index.busy_room_ids(check_in, check_out) == set()
+    assert availability_cache.get(cache_key) is None
+    assert _spots() == 8
@@ -0,0 +1,83 @@
+# tests/test_compression.py
+import gzip
+import json
+
+import pytest
+
+from api import compression
+from api.compression import send_precompressed, precompress_directory
+
+
+def test_gzip_when_accepted(client):
+    plain = client.get('/api/rooms')
+    response = client.get('/api/rooms', headers={'Accept-Encoding': 'gzip, deflate'})
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.vary
+    assert json.loads(gzip.decompress(response.get_data())) == plain.get_json()
+
+
+def test_identity_without_accept_encoding(client):
+    response = client.get('/api/rooms')
+    assert 'Content-Encoding' not in response.headers
+    assert 'Accept-Encoding' in response.vary
+
+
+def test_rejected_encodings_are_not_used(client):
+    response = client.get('/api/rooms', headers={'Accept-Encoding': 'gzip;q=0, identity'})
+    assert 'Content-Encoding' not in response.headers
+
+
+def test_small_responses_are_not_compressed(app, client):
+    app.config['COMPRESS_MIN_SIZE'] = 10 ** 6
+    response = client.get('/api/rooms', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in response.headers
+
+
+def test_brotli_preferred_when_installed(client):
+    brotli = pytest.importorskip('brotli')
+    response = client.get('/api/rooms', headers={'Accept-Encoding': 'gzip, br'})
+    assert response.headers['Content-Encoding'] == 'br'
+    assert json.loads(brotli.decompress(response.get_data()))
+
+
+@pytest.fixture
+def dist(tmp_path):
+    (tmp_path / 'app.js').write_text('console.log("hola");\n' * 200)
+    (tmp_path / 'logo.png').write_bytes(b'\x89PNG' + b'\0' * 2000)
+    return tmp_path
+
+
+@pytest.mark.parametrize('accept, encoding', [
+    ('gzip, br', 'br'),
+    ('gzip', 'gzip'),
+    ('identity', None),
+])
+def test_send_precompressed(app, dist, accept, encoding):
+    (dist / 'app.js.gz').write_bytes(gzip.compress((dist / 'app.js').read_bytes()))
+    (dist / 'app.js.br').write_bytes(b'br-bytes')
+
+    with app.test_request_context(headers={'Accept-Encoding': accept}):
+        response = send_precompressed(str(dist), 'app.js')
+        response.direct_passthrough = False
+        body = response.get_data()
+
+    assert response.headers.get('Content-Encoding') == encoding
+    assert response.mimetype in ('application/javascript', 'text/javascript')
+    assert 'Accept-Encoding' in response.vary
+    expected = {'br': b'br-bytes', 'gzip': (dist / 'app.js.gz').read_bytes(), None: (dist / 'app.js').read_bytes()}
+    assert body == expected[encoding]
+
+
+def test_send_precompressed_without_siblings(app, dist):
+    with app.test_request_context(headers={'Accept-Encoding': 'gzip, br'}):
+        response = send_precompressed(str(dist), 'logo.png')
+
+    assert 'Content-Encoding' not in response.headers
+    assert 'Accept-Encoding' not in response.vary
+
+
+def test_precompress_directory(dist):
+    assert precompress_directory(str(dist)) == (2 if compression.brotli else 1)
+    assert gzip.decompress((dist / 'app.js.gz').read_bytes()) == (dist / 'app.js').read_bytes()
+    assert not (dist / 'logo.png.gz').exists()
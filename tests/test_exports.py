@@ -0,0 +1,69 @@
+# tests/test_exports.py
+import csv
+import io
+import json
+
+import pytest
+
+from api import exports
+from api.models import User, BookingStatus
+from api.exports import export_query, stream_csv, stream_ndjson, EXPORT_HEADERS
+from flask_jwt_extended import create_access_token
+
+
+@pytest.fixture
+def admin_headers(app):
+    admin = User.query.filter_by(email='admin@caliafarm.com').one()
+    return {'Authorization': f"Bearer {create_access_token(identity=str(admin.id))}"}
+
+
+@pytest.fixture
+def bookings(make_booking):
+    return {
+        'confirmed': [make_booking(experience_id=1) for _ in range(3)],
+        'cancelled': [make_booking(status=BookingStatus.CANCELLED)],
+        'cart': [make_booking(status=BookingStatus.CART)],
+    }
+
+
+def test_csv_export(client, admin_headers, bookings):
+    response = client.get('/api/admin/bookings/export', headers=admin_headers)
+    assert response.status_code == 200
+    assert response.mimetype == 'text/csv'
+    assert response.headers['Content-Disposition'].startswith('attachment; filename=bookings-')
+
+    rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    expected = bookings['confirmed'] + bookings['cancelled']
+    assert [int(row['id']) for row in rows] == [booking.id for booking in expected]
+    assert rows[0]['status'] == 'confirmed'
+    assert rows[0]['user_email'] == 'guest@example.com'
+    assert rows[0]['experience'] and rows[-1]['experience'] == ''
+
+
+def test_ndjson_export_with_filter(client, admin_headers, bookings):
+    response = client.get('/api/admin/bookings/export?format=ndjson&status=cancelled', headers=admin_headers)
+    assert response.mimetype == 'application/x-ndjson'
+
+    lines = response.get_data(as_text=True).splitlines()
+    records = [json.loads(line) for line in lines]
+    assert [record['id'] for record in records] == [booking.id for booking in bookings['cancelled']]
+    assert list(records[0]) == EXPORT_HEADERS
+
+
+def test_export_requires_admin(client, auth_headers):
+    assert client.get('/api/admin/bookings/export', headers=auth_headers).status_code == 403
+
+
+def test_export_rejects_unknown_format(client, admin_headers):
+    assert client.get('/api/admin/bookings/export?format=xml', headers=admin_headers).status_code == 400
+
+
+def test_streams_one_chunk_per_batch(app, monkeypatch, bookings):
+    monkeypatch.setattr(exports, 'EXPORT_BATCH_SIZE', 2)
+
+    csv_chunks = list(stream_csv(export_query()))
+    ndjson_chunks = list(stream_ndjson(export_query()))
+
+    # 5 reservas en lotes de 2: la cabecera va con el primer lote
+    assert [chunk.count('\n') for chunk in csv_chunks] == [3, 2, 1]
+    assert [chunk.count('\n') for chunk in ndjson_chunks] == [2, 2, 1]
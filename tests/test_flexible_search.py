@@ -0,0 +1,82 @@
+# tests/test_flexible_search.py
+from datetime import date, timedelta
+
+import pytest
+
+from api.models import db, Room
+from api.occupancy import free_check_ins, find_flexible_stays
+
+
+def _starts(bitmap):
+    return [i for i in range(bitmap.bit_length()) if bitmap >> i & 1]
+
+
+def _brute_force(busy, total_nights, nights):
+    return [
+        start for start in range(total_nights - nights + 1)
+        if not any(busy >> night & 1 for night in range(start, start + nights))
+    ]
+
+
+def test_free_check_ins_skips_busy_nights():
+    # Noches 2 y 3 ocupadas en una ventana de 7
+    busy = 0b0001100
+    assert _starts(free_check_ins(busy, 7, 1)) == [0, 1, 4, 5, 6]
+    assert _starts(free_check_ins(busy, 7, 2)) == [0, 4, 5]
+    assert _starts(free_check_ins(busy, 7, 3)) == [4]
+    assert free_check_ins(busy, 7, 4) == 0
+    assert free_check_ins(0, 3, 4) == 0
+
+
+@pytest.mark.parametrize('busy', [0, 0b1, 0b1010101, 0b1110000111, 0b100000000001])
+def test_free_check_ins_matches_brute_force(busy):
+    for nights in range(1, 13):
+        assert _starts(free_check_ins(busy, 12, nights)) == _brute_force(busy, 12, nights)
+
+
+@pytest.mark.parametrize('offset', [10, 1000])
+def test_find_flexible_stays_around_booking(app, make_booking, offset):
+    # offset 1000 cae fuera del horizonte del índice: calendario de la base de datos
+    start = date.today() + timedelta(days=offset)
+    make_booking(room_id=1, check_in=start + timedelta(days=2), check_out=start + timedelta(days=4))
+
+    with app.app_context():
+        rooms = [db.session.get(Room, 1)]
+        stays = find_flexible_stays(rooms, start, start + timedelta(days=7), 2, 3)
+
+    assert sorted(((check_in - start).days, nights) for _, check_in, nights in stays) == [
+        (0, 2), (4, 2), (4, 3), (5, 2)
+    ]
+
+
+def test_flexible_route(client, make_booking):
+    start = date.today() + timedelta(days=30)
+    make_booking(room_id=4, check_in=start, check_out=start + timedelta(days=3))
+
+    response = client.post('/api/rooms/flexible', json={
+        'from': start.isoformat(), 'to': (start + timedelta(days=4)).isoformat(),
+        'min_nights': 3, 'max_nights': 5, 'guests': 3
+    })
+    assert response.status_code == 200
+    assert response.get_json()['stays'] == []
+
+    response = client.post('/api/rooms/flexible', json={
+        'from': start.isoformat(), 'to': (start + timedelta(days=4)).isoformat(),
+        'min_nights': 3, 'guests': 2
+    })
+    stays = response.get_json()['stays']
+    assert {(stay['room_id'], stay['check_in']) for stay in stays} == {
+        (room_id, (start + timedelta(days=day)).isoformat()) for room_id in (1, 2, 3) for day in (0, 1)
+    }
+    assert {stay['total_price'] for stay in stays if stay['room_id'] == 1} == {450.0}
+
+
+@pytest.mark.parametrize('body', [
+    {'from': '2030-01-10', 'to': '2030-01-10', 'min_nights': 1},
+    {'from': '2030-01-01', 'to': '2030-06-01', 'min_nights': 1},
+    {'from': '2030-01-01', 'to': '2030-01-10', 'min_nights': 0},
+    {'from': '2030-01-01', 'to': '2030-01-10', 'min_nights': 3, 'max_nights': 2},
+    {'from': '2030-01-01', 'min_nights': 3},
+])
+def test_flexible_route_validation(client, body):
+    assert client.post('/api/rooms/flexible', json=body).status_code == 400
@@ -0,0 +1,95 @@
+# tests/test_inventory.py
+from datetime import date, timedelta
+
+import pytest
+
+from api.models import db, BookingStatus, ExperienceAvailability, RoomNight
+from api.availability import rebuild_room_nights
+from api.inventory import hold_inventory, release_inventory, set_booking_status, InventoryConflict
+
+DAY = date.today() + timedelta(days=4)
+CHECK_IN = date.today() + timedelta(days=10)
+CHECK_OUT = CHECK_IN + timedelta(days=3)
+
+
+def _spots(experience_id=1, day=DAY):
+    counter = ExperienceAvailability.query.filter_by(experience_id=experience_id, date=day).one_or_none()
+    return counter.available_spots if counter else None
+
+
+def _nights(**filters):
+    return sorted(night for night, in db.session.query(RoomNight.night).filter_by(**filters))
+
+
+def test_room_hold_and_release_round_trip(make_booking):
+    booking = make_booking(room_id=1, check_in=CHECK_IN, check_out=CHECK_OUT)
+    assert _nights(booking_id=booking.id) == [CHECK_IN + timedelta(days=i) for i in range(3)]
+
+    release_inventory(booking)
+    db.session.commit()
+    assert _nights(room_id=1) == []
+
+    hold_inventory(booking)
+    db.session.commit()
+    assert len(_nights(booking_id=booking.id)) == 3
+
+
+def test_overlapping_stay_is_rejected_without_holding_spots(make_booking):
+    make_booking(room_id=1, check_in=CHECK_IN, check_out=CHECK_OUT)
+
+    with pytest.raises(InventoryConflict):
+        make_booking(
+            guests=2, experience_id=1, experience_date=DAY,
+            room_id=1, check_in=CHECK_OUT - timedelta(days=1), check_out=CHECK_OUT + timedelta(days=1)
+        )
+    # Las plazas reservadas antes de fallar la habitación se devuelven
+    assert _spots() == 8
+    db.session.rollback()
+    assert len(_nights(room_id=1)) == 3
+
+
+def test_adjacent_stays_share_the_changeover_day(make_booking):
+    make_booking(room_id=1, check_in=CHECK_IN, check_out=CHECK_OUT)
+    make_booking(room_id=1, check_in=CHECK_OUT, check_out=CHECK_OUT + timedelta(days=2))
+    assert len(_nights(room_id=1)) == 5
+
+
+def test_set_booking_status_round_trip(make_booking):
+    booking = make_booking(
+        status=BookingStatus.PENDING, guests=2, experience_id=1, experience_date=DAY,
+        room_id=2, check_in=CHECK_IN, check_out=CHECK_OUT
+    )
+
+    set_booking_status(booking, BookingStatus.CONFIRMED)
+    db.session.commit()
+    assert _spots() == 6 and len(_nights(room_id=2)) == 3
+
+    set_booking_status(booking, BookingStatus.CANCELLED)
+    db.session.commit()
+    assert _spots() == 8 and _nights(room_id=2) == []
+
+    set_booking_status(booking, BookingStatus.PENDING)
+    db.session.commit()
+    assert _spots() == 6 and len(_nights(room_id=2)) == 3
+
+
+def test_failed_reactivation_keeps_status(make_booking):
+    booking = make_booking(status=BookingStatus.CANCELLED, room_id=1, check_in=CHECK_IN, check_out=CHECK_OUT)
+    make_booking(room_id=1, check_in=CHECK_IN, check_out=CHECK_IN + timedelta(days=1))
+
+    with pytest.raises(InventoryConflict):
+        set_booking_status(booking, BookingStatus.CONFIRMED)
+    assert booking.status == BookingStatus.CANCELLED
+
+
+def test_rebuild_room_nights_matches_the_held_ledger(make_booking):
+    first = make_booking(room_id=1, check_in=CHECK_IN, check_out=CHECK_OUT)
+    make_booking(status=BookingStatus.CANCELLED, room_id=1, check_in=CHECK_IN, check_out=CHECK_OUT)
+    nights = _nights(booking_id=first.id)
+
+    RoomNight.query.delete()
+    db.session.commit()
+
+    assert rebuild_room_nights() == (3, [])
+    assert _nights(booking_id=first.id) == nights
+    assert rebuild_room_nights() == (3, [])
@@ -0,0 +1,63 @@
+# tests/test_money.py
+from decimal import Decimal
+
+import pytest
+import sqlalchemy as sa
+
+from api.models import db, Room, to_cents, from_cents
+from api.money import backfill_money_column, backfill_money_columns
+
+
+@pytest.mark.parametrize('amount, cents', [
+    (None, None),
+    (0, 0),
+    (19.99, 1999),
+    (0.1 + 0.2, 30),
+    (2.675, 268),
+    (0.005, 1),
+    (-0.005, -1),
+    ('12.345', 1235),
+    (Decimal('100'), 10000),
+])
+def test_to_cents_rounds_half_up(amount, cents):
+    assert to_cents(amount) == cents
+
+
+def test_from_cents():
+    assert from_cents(1999) == 19.99
+    assert from_cents(None) is None
+
+
+def test_money_property(app):
+    room = db.session.get(Room, 1)
+    room.price_per_night = 149.995
+    assert room.price_per_night_cents == 15000
+    assert room.price_per_night == 150.0
+    assert db.session.query(Room.id).filter(Room.price_per_night == 150.0).scalar() == 1
+
+
+@pytest.fixture
+def legacy_prices(app):
+    """Columna Float antigua como antes de la migración, con los céntimos vacíos"""
+    db.session.execute(sa.text("ALTER TABLE rooms ADD COLUMN price_per_night FLOAT"))
+    db.session.execute(sa.text("UPDATE rooms SET price_per_night = 19.99 * id, price_per_night_cents = NULL"))
+    db.session.commit()
+    return {room_id: 1999 * room_id for room_id, in db.session.query(Room.id)}
+
+
+def _cents():
+    return dict(db.session.query(Room.id, Room.price_per_night_cents))
+
+
+def test_backfill_in_batches_and_is_idempotent(legacy_prices):
+    assert backfill_money_column('rooms', 'price_per_night', 'price_per_night_cents', batch_size=3) == 4
+    assert _cents() == legacy_prices
+
+    db.session.execute(sa.text("UPDATE rooms SET price_per_night = 0"))
+    db.session.commit()
+    assert backfill_money_column('rooms', 'price_per_night', 'price_per_night_cents') == 0
+    assert _cents() == legacy_prices
+
+
+def test_backfill_skips_tables_without_legacy_column(legacy_prices):
+    assert backfill_money_columns() == {'rooms.price_per_night_cents': 4}
@@ -0,0 +1,79 @@
+# tests/test_pagination.py
+from datetime import datetime, timedelta
+
+import pytest
+from werkzeug.datastructures import MultiDict
+
+from api.models import db, BookingStatus
+from api.pagination import (
+    encode_cursor, decode_cursor, parse_page_args, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+)
+
+CREATED_AT = datetime(2026, 1, 15, 12, 0, 0)
+
+
+@pytest.fixture
+def bookings(make_booking):
+    """Siete reservas; las cinco primeras comparten created_at"""
+    created = []
+    for i in range(7):
+        booking = make_booking(status=BookingStatus.CANCELLED)
+        booking.created_at = CREATED_AT if i < 5 else CREATED_AT - timedelta(days=i)
+        created.append(booking)
+    db.session.commit()
+    return created
+
+
+def _pages(client, auth_headers, limit):
+    pages, cursor = [], None
+    while True:
+        url = f'/api/bookings/my-bookings?limit={limit}' + (f'&cursor={cursor}' if cursor else '')
+        response = client.get(url, headers=auth_headers)
+        assert response.status_code == 200
+        body = response.get_json()
+        pages.append([booking['id'] for booking in body['bookings']])
+        cursor = body['next_cursor']
+        if cursor is None:
+            return pages
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor(CREATED_AT, 42)) == (CREATED_AT, 42)
+
+
+@pytest.mark.parametrize('cursor', ['not-a-cursor', encode_cursor(CREATED_AT, 1)[:-3], 'W10'])
+def test_invalid_cursor(cursor):
+    with pytest.raises(ValueError, match='Invalid cursor'):
+        decode_cursor(cursor)
+
+
+def test_page_args():
+    assert parse_page_args(MultiDict()) == (None, DEFAULT_PAGE_SIZE)
+    assert parse_page_args(MultiDict({'limit': '5000'})) == (None, MAX_PAGE_SIZE)
+    for limit in ('0', '-1', 'ten'):
+        with pytest.raises(ValueError):
+            parse_page_args(MultiDict({'limit': limit}))
+
+
+def test_pages_cover_ties_without_gaps_or_duplicates(client, auth_headers, bookings):
+    pages = _pages(client, auth_headers, limit=2)
+
+    assert [len(page) for page in pages] == [2, 2, 2, 1]
+    ids = [booking_id for page in pages for booking_id in page]
+    # created_at descendente y, en los empates, id descendente
+    assert ids == [5, 4, 3, 2, 1, 6, 7]
+
+
+def test_last_full_page_has_no_next_cursor(client, auth_headers, bookings):
+    assert [len(page) for page in _pages(client, auth_headers, limit=7)] == [7]
+    assert _pages(client, auth_headers, limit=100) == [[5, 4, 3, 2, 1, 6, 7]]
+
+
+def test_empty_result(client, auth_headers):
+    assert _pages(client, auth_headers, limit=10) == [[]]
+
+
+def test_invalid_page_args_return_400(client, auth_headers):
+    for query in ('limit=0', 'limit=abc', 'cursor=%25%25%25'):
+        response = client.get(f'/api/bookings/my-bookings?{query}', headers=auth_headers)
+        assert response.status_code == 400
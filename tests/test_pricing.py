@@ -0,0 +1,53 @@
+# tests/test_pricing.py
+from datetime import date, timedelta
+
+import pytest
+
+from api.pricing import price_line_item
+
+CHECK_IN = date.today() + timedelta(days=10)
+
+
+def _room_item(nights=2, guests=2, **fields):
+    return {
+        'rooms': [{'room_id': 1}], 'check_in': CHECK_IN.isoformat(),
+        'check_out': (CHECK_IN + timedelta(days=nights)).isoformat(), 'number_of_guests': guests, **fields
+    }
+
+
+def test_room_with_extras(app):
+    quote = price_line_item(_room_item(extras=[{'extra_id': 1}, {'extra_id': 2, 'quantity': 2}]))
+
+    room, = quote['rooms']
+    assert room['nights'] == 2
+    assert room['price_cents'] == room['price_per_night_cents'] * 2
+    transfer, breakfast = quote['extras']
+    assert transfer['price_cents'] == 8000
+    # PER_GUEST: precio × huéspedes × cantidad, una vez por estancia
+    assert breakfast['price_cents'] == 1500 * 2 * 2
+    assert quote['total_price_cents'] == room['price_cents'] + 8000 + 6000
+
+
+@pytest.mark.parametrize('item, message', [
+    (_room_item(nights=0), 'check_out must be after check_in'),
+    (_room_item(nights=-3), 'check_out must be after check_in'),
+    (_room_item(guests=-3), 'number_of_guests must be at least 1'),
+    (_room_item(extras=[{'extra_id': 2, 'quantity': -1}]), 'quantity must be at least 1'),
+    (_room_item(extras=[{'extra_id': 2, 'quantity': 0}]), 'quantity must be at least 1'),
+    (_room_item(rooms={'room_id': 1}), 'rooms must be a list'),
+    (_room_item(extras={'extra_id': 1}), 'extras must be a list'),
+])
+def test_invalid_items_are_rejected(app, item, message):
+    with pytest.raises(ValueError, match=message):
+        price_line_item(item)
+
+
+def test_invalid_items_return_400(client, auth_headers):
+    response = client.post('/api/cart', json=_room_item(nights=-1), headers=auth_headers)
+    assert response.status_code == 400
+
+    response = client.post('/api/create-checkout-session', json={'items': [{
+        'type': 'room', 'id': 1, 'guests': -3,
+        'check_in': CHECK_IN.isoformat(), 'check_out': (CHECK_IN + timedelta(days=1)).isoformat()
+    }]})
+    assert response.status_code == 400
@@ -0,0 +1,77 @@
+# tests/test_snapshots.py
+from datetime import date, timedelta
+
+import pytest
+
+from api.models import AvailabilitySnapshot
+from api.pricing import price_book
+from api.snapshots import precompute_availability, ROOM, EXPERIENCE
+
+
+def _checkout(client, auth_headers, *items):
+    item_ids = []
+    for item in items:
+        response = client.post('/api/cart', json=item, headers=auth_headers)
+        assert response.status_code == 201, response.get_json()
+        item_ids.append(response.get_json()['item']['id'])
+    response = client.post('/api/checkout', json={'item_ids': item_ids}, headers=auth_headers)
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()
+
+
+def _stale_ids(resource_type):
+    return {
+        row.resource_id for row in
+        AvailabilitySnapshot.query.filter_by(resource_type=resource_type, is_stale=True)
+    }
+
+
+def test_checkout_marks_snapshots_stale(client, auth_headers, payment_intents):
+    today = date.today()
+    day = today + timedelta(days=3)
+    check_in = today + timedelta(days=5)
+    check_out = check_in + timedelta(days=2)
+    precompute_availability(30)
+
+    _checkout(
+        client, auth_headers,
+        {'experience_id': 1, 'experience_date': day.isoformat(), 'number_of_guests': 3},
+        {'rooms': [{'room_id': 2}], 'check_in': check_in.isoformat(), 'check_out': check_out.isoformat(),
+         'number_of_guests': 2}
+    )
+    assert len(payment_intents) == 1
+
+    assert 1 in _stale_ids(EXPERIENCE)
+    assert 2 in _stale_ids(ROOM)
+
+    calendar = client.get(f'/api/experiences/calendar?from={day}&to={day}&experience_ids=1').get_json()
+    assert calendar['experiences'][0]['dates'][day.isoformat()]['available_spots'] == 5
+
+    available = client.post('/api/experiences/available', json={
+        'start_date': day.isoformat(), 'end_date': day.isoformat(), 'guests': 1
+    }).get_json()
+    experience = next(e for e in available if e['id'] == 1)
+    assert experience['available_dates'][0]['available_spots'] == 5
+
+    calendar = client.get(f'/api/rooms/calendar?from={check_in}&to={check_out}&room_ids=2').get_json()
+    assert calendar['rooms'][0]['available'] == [False, False, True]
+
+
+@pytest.mark.filterwarnings('error::sqlalchemy.exc.SAWarning')
+def test_checkout_only_invalidates_booked_resources(client, auth_headers, payment_intents):
+    check_in = date.today() + timedelta(days=5)
+    precompute_availability(30)
+    client.get('/api/cart', headers=auth_headers)
+    invalidations = price_book.stats()['invalidations']
+
+    _checkout(
+        client, auth_headers,
+        {'experience_id': 2, 'experience_date': check_in.isoformat(), 'number_of_guests': 2},
+        {'rooms': [{'room_id': 2}], 'check_in': check_in.isoformat(),
+         'check_out': (check_in + timedelta(days=2)).isoformat(), 'number_of_guests': 2}
+    )
+
+    assert _stale_ids(ROOM) == {2}
+    assert _stale_ids(EXPERIENCE) == {2}
+    assert price_book.stats()['invalidations'] == invalidations
+    assert price_book.stats()['loaded']